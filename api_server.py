@@ -1,14 +1,38 @@
 #!/usr/bin/env python3
+import argparse
 import asyncio
+import json
 import os
-from typing import List, Dict, Any, Optional
+import socket
+import subprocess
+import sys
+import time
+from collections import OrderedDict
+from contextlib import AsyncExitStack
+from contextvars import ContextVar
+from typing import List, Dict, Any, Awaitable, Callable, Optional, Set, Tuple
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+try:
+    # orjson이 설치되어 있으면 큰 응답(카드 검색, 이벤트 목록)을 더 빠르게 직렬화합니다.
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as FastJSONResponse
+except ImportError:
+    from fastapi.responses import JSONResponse as FastJSONResponse
 from pydantic import BaseModel
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from langgraph.prebuilt import create_react_agent
 from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.messages import HumanMessage, AIMessage
+from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
+from langchain_core.tools import BaseTool
+from metrics import MetricsRegistry, COUNT_BUCKETS, LATENCY_BUCKETS
+from mcp_connections import ADMIN_TOOL_NAMES, BASE_DIR, build_mcp_servers, mcp_state_available, resolve_tools
+from tracing import Span, Trace, TraceCallbackHandler, TRACE_LOG_PATH, attach_scrape_phases, write_trace
+from session_store import build_session_store
+from chat_batch import CHAT_BATCH_CONCURRENCY, CHAT_BATCH_MAX_CONCURRENCY, CHAT_BATCH_MAX_ITEMS, batch_answerer, parse_batch_items, run_batch, to_jsonl
+from tool_wrappers import CURRENT_TOOL_MEMO, ToolCallMemo, with_injected_arg, with_memo
+from http_cache import ResponseCache, make_etag, etag_matches
 
 # .env 파일 로드
 load_dotenv()
@@ -23,19 +47,91 @@ app = FastAPI(
 # 전역 변수로 클라이언트와 에이전트 저장
 client = None
 agent = None
+llm = None
 
-# 대화 히스토리 저장소 (세션별로 관리)
-conversation_sessions = {}
+# 이름별 MCP 도구 핸들 (시작할 때 한 번 불러와 모든 요청이 함께 사용)
+tool_handles: Dict[str, BaseTool] = {}
+
+# MCP_PERSISTENT_SESSIONS일 때 열어 둔 MCP 서버 세션 (종료 시 닫음)
+mcp_sessions = AsyncExitStack()
+
+# 시작 직후 warmup 진행 상태 (/readyz)
+warmup_state: Dict[str, Any] = {"status": "pending", "steps": {}}
+warmup_task: Optional[asyncio.Task] = None
+# 진행 중인 warmup 단계 (WARMUP_TIMEOUT이 지나도 끝날 때까지 백그라운드에서 진행하고, 종료 시 취소)
+warmup_step_tasks: Set[asyncio.Task] = set()
+
+# 대화 히스토리 저장소 (세션별로 관리, SESSION_STORE=sqlite이면 여러 워커가 공유)
+session_store = build_session_store()
+
+# 세션 범위 도구 호출 메모 (TOOL_MEMO_SCOPE=session일 때만 사용). 세션 ID -> (마지막 사용 시각, 메모), 최근 사용 순서
+session_tool_memos: "OrderedDict[str, Tuple[float, ToolCallMemo]]" = OrderedDict()
+
+# MCP 서버별 메트릭 조회 도구
+METRICS_TOOL_NAMES = ["get_card_metrics", "get_event_metrics"]
+
+# 리소스 종류별 데이터 세대 조회 도구
+GENERATION_TOOL_NAMES = {
+    "card": "get_card_data_generation",
+    "event": "get_event_data_generation",
+}
+
+# 메트릭 저장소
+METRICS = MetricsRegistry("api_server")
+
+# /chat 요청 한 건의 기본 처리 시간 한도 (초). 요청의 deadline_ms가 우선합니다.
+CHAT_DEADLINE_SECONDS = float(os.getenv("CHAT_DEADLINE_SECONDS", "60"))
+
+# 처리 중인 요청의 마감 시각 (time.monotonic() 기준). 도구 호출 시 남은 시간을 MCP 도구에 전달합니다.
+REQUEST_DEADLINE: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+# 여러 워커가 함께 사용할 MCP 서버(main.py) 주소. 설정하면 워커마다 MCP 서버 프로세스를 띄우지 않습니다.
+MCP_BACKEND_URL = os.getenv("MCP_BACKEND_URL")
+
+# 남은 처리 시간(deadline_ms)을 받는 MCP 도구
+DEADLINE_TOOL_NAMES = {"get_card_info"}
+
+# 에이전트 도구 호출 메모 범위: request(요청 안에서만, 기본), session(같은 세션의 이전 요청까지), off
+TOOL_MEMO_SCOPE = os.getenv("TOOL_MEMO_SCOPE", "request")
+# 세션 범위 메모 유지 시간 (초). 이 시간 동안 요청이 없던 세션의 메모는 지웁니다.
+TOOL_MEMO_TTL = float(os.getenv("TOOL_MEMO_TTL", "300"))
+# 세션 범위 메모를 유지할 최대 세션 수 (넘으면 가장 오래 쓰이지 않은 세션부터 지움)
+TOOL_MEMO_MAX_SESSIONS = int(os.getenv("TOOL_MEMO_MAX_SESSIONS", "1000"))
+
+# 리소스 데이터 세대를 다시 확인하기 전까지 재사용할 시간 (초). 세대가 바뀐 뒤 이 시간 안에는 이전 ETag가 쓰일 수 있습니다.
+DATA_VERSION_TTL = float(os.getenv("DATA_VERSION_TTL", "2"))
+
+# 리소스 종류별 (확인 시각, 세대 문자열)과 동시 조회를 하나로 묶는 잠금
+data_versions: Dict[str, tuple] = {}
+data_version_locks: Dict[str, asyncio.Lock] = {}
+
+# 직렬화·압축해 둔 정적 데이터 응답 (/events, /benefit-keywords, /cards/search)
+RESPONSE_CACHE = ResponseCache()
+
+# 시작 직후 warmup 설정. warmup이 끝날 때까지 /readyz는 503을 반환합니다.
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "1") == "1"
+WARMUP_TOP_CARDS = int(os.getenv("WARMUP_TOP_CARDS", "10"))  # 상세 정보를 미리 불러올 카드 수 (0이면 건너뜀)
+WARMUP_BROWSER = os.getenv("WARMUP_BROWSER", "1") == "1"  # 카드 MCP 서버의 Playwright 브라우저를 미리 띄움
+WARMUP_LLM = os.getenv("WARMUP_LLM", "1") == "1"  # LLM에 짧은 요청을 보내 연결을 미리 엶
+WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT", "120"))  # 이 시간(초)이 지나면 warmup을 끝내고 준비 완료로 전환
+
+# 대화 히스토리 조회 한 페이지의 기본/최대 메시지 수
+HISTORY_PAGE_LIMIT = int(os.getenv("HISTORY_PAGE_LIMIT", "50"))
+HISTORY_PAGE_MAX_LIMIT = int(os.getenv("HISTORY_PAGE_MAX_LIMIT", "500"))
 
 # Pydantic 모델 정의
 class ChatRequest(BaseModel):
     message: str
     session_id: Optional[str] = "default"
+    debug: Optional[bool] = False  # True이면 요청 트레이스(span 트리)를 응답에 포함
+    deadline_ms: Optional[int] = None  # 요청 처리 시간 한도 (밀리초). 없으면 CHAT_DEADLINE_SECONDS
+    include_history: Optional[bool] = False  # True이면 세션의 전체 대화 히스토리를 응답에 포함
 
 class ChatResponse(BaseModel):
     response: str
     session_id: str
-    conversation_history: List[Dict[str, str]]
+    conversation_history: Optional[List[Dict[str, Any]]] = None
+    trace: Optional[Dict[str, Any]] = None
 
 class CardSearchRequest(BaseModel):
     benefit_keyword: Optional[str] = None
@@ -45,40 +141,72 @@ class CardSearchRequest(BaseModel):
 class EventRequest(BaseModel):
     pass
 
-# API 초기화 함수
-async def initialize_services():
-    """MCP 클라이언트와 에이전트를 초기화합니다."""
-    global client, agent
-    
+def build_llm():
+    """에이전트가 사용할 LLM을 생성합니다. (벤치마크에서는 가짜 모델로 교체합니다.)"""
     google_api_key = os.getenv("GOOGLE_API_KEY")
     if not google_api_key:
         raise Exception("GOOGLE_API_KEY가 설정되지 않았습니다.")
     
-    # MCP 클라이언트 초기화
-    client = MultiServerMCPClient(
-        {
-            "event": {
-                "command": "python",
-                "args": ["/Users/a80128121/Desktop/mac_mini/project/aicc/event_mcp.py"],
-                "transport": "stdio",
-            },
-            "card": {
-                "command": "python",
-                "args": ["/Users/a80128121/Desktop/mac_mini/project/aicc/card_mcp.py"],
-                "transport": "stdio",
-            }
-        }
-    )
-    
-    # 도구 로드
-    tools = await client.get_tools()
-    
-    # LLM 초기화
-    llm = ChatGoogleGenerativeAI(
+    return ChatGoogleGenerativeAI(
         model="gemini-2.5-flash",
         google_api_key=google_api_key,
         temperature=0.1
     )
+
+def remaining_deadline_ms() -> Optional[int]:
+    """현재 요청의 남은 처리 시간(밀리초)을 반환합니다. 요청 밖에서 호출되면 None입니다."""
+    deadline_at = REQUEST_DEADLINE.get()
+    if deadline_at is None:
+        return None
+    return max(0, int((deadline_at - time.monotonic()) * 1000))
+
+def new_tool_memo(session_id: str) -> Optional[ToolCallMemo]:
+    """요청 하나에 쓸 도구 호출 메모를 만듭니다. 세션 범위이면 세션 메모를 parent로 연결합니다."""
+    if TOOL_MEMO_SCOPE == "off":
+        return None
+    parent = None
+    if TOOL_MEMO_SCOPE == "session":
+        parent = session_tool_memo(session_id)
+    return ToolCallMemo(parent)
+
+def session_tool_memo(session_id: str) -> ToolCallMemo:
+    """세션 메모를 반환합니다.
+
+    세션 메모는 최근 사용 순서로 TOOL_MEMO_MAX_SESSIONS개까지 두고, TOOL_MEMO_TTL 동안 쓰이지 않은 세션은 지웁니다.
+    """
+    now = time.monotonic()
+    entry = session_tool_memos.pop(session_id, None)
+    memo = entry[1] if entry is not None else ToolCallMemo(ttl=TOOL_MEMO_TTL)
+    while session_tool_memos:
+        last_used, _ = next(iter(session_tool_memos.values()))
+        if now - last_used <= TOOL_MEMO_TTL and len(session_tool_memos) < TOOL_MEMO_MAX_SESSIONS:
+            break
+        session_tool_memos.popitem(last=False)
+    session_tool_memos[session_id] = (now, memo)
+    return memo
+
+def record_tool_memo(tool_name: str, outcome: str):
+    METRICS.counter("tool_memo_total", "에이전트 도구 호출 메모 조회 결과", ("tool", "result")).inc(
+        tool=tool_name, result=outcome
+    )
+
+# API 초기화 함수
+async def initialize_services():
+    """MCP 클라이언트와 에이전트를 초기화합니다."""
+    global client, agent, llm, tool_handles
+    
+    # LLM 초기화
+    llm = build_llm()
+    
+    # MCP 클라이언트 초기화
+    client = MultiServerMCPClient(build_mcp_servers())
+    
+    # 도구 로드 (이름별 핸들을 만들어 두고 API 엔드포인트에서 재사용)
+    tools = await resolve_tools(client, mcp_sessions)
+    if not mcp_state_available():
+        print("⚠️ MCP_PERSISTENT_SESSIONS=0이고 MCP_BACKEND_URL이 없어 도구 호출마다 MCP 서버 프로세스를 새로 띄웁니다. "
+              "MCP 서버의 메트릭, 데이터 세대, 스크래핑 기록, 브라우저는 호출 사이에 유지되지 않습니다.")
+    tool_handles = {tool.name: tool for tool in tools}
     
     # 프롬프트 정의
     prompt = '''당신은 신한카드 전문 어시스턴트입니다. 사용자 질문에 대한 친절하고 정확한 답변을 해야합니다.
@@ -99,154 +227,442 @@ async def initialize_services():
     '''
     
     # 에이전트 생성
-    agent = create_react_agent(llm, tools, prompt=prompt)
+    # deadline_ms는 에이전트에 노출하지 않고 요청의 남은 시간으로 채워 넣습니다.
+    # 같은 인자의 반복 호출은 메모된 결과(또는 이전 결과 참조)로 응답합니다.
+    agent_tools = [
+        with_memo(
+            with_injected_arg(tool, "deadline_ms", remaining_deadline_ms) if tool.name in DEADLINE_TOOL_NAMES else tool,
+            record_tool_memo,
+        )
+        for tool in tools if tool.name not in ADMIN_TOOL_NAMES
+    ]
+    agent = create_react_agent(llm, agent_tools, prompt=prompt)
     
     print("✅ API 서비스 초기화 완료")
 
+def tool_result_text(result: Any) -> str:
+    """MCP 도구 결과를 문자열로 반환합니다. (어댑터 버전에 따라 문자열 또는 텍스트 블록 목록으로 옵니다.)"""
+    if isinstance(result, str):
+        return result
+    if isinstance(result, list):
+        return "".join(block.get("text", "") if isinstance(block, dict) else str(block) for block in result)
+    return str(result)
+
+async def data_version(kind: str) -> Optional[str]:
+    """리소스 종류(card/event)의 현재 데이터 세대를 나타내는 값(리소스 파일 fingerprint)을 반환합니다.
+
+    세대 번호는 MCP 서버 프로세스마다 1부터 시작하므로, 파일 수정 시각으로 만든 fingerprint를 사용합니다.
+    DATA_VERSION_TTL 동안은 MCP 서버에 다시 묻지 않으며, 세대 조회 도구가 없으면 None입니다.
+    """
+    cached = data_versions.get(kind)
+    if cached is not None and time.monotonic() - cached[0] < DATA_VERSION_TTL:
+        return cached[1]
+    
+    async with data_version_locks.setdefault(kind, asyncio.Lock()):
+        cached = data_versions.get(kind)
+        if cached is not None and time.monotonic() - cached[0] < DATA_VERSION_TTL:
+            return cached[1]
+        
+        generation_tool = tool_handles.get(GENERATION_TOOL_NAMES[kind])
+        version = None
+        if generation_tool is not None:
+            status = json.loads(tool_result_text(await generation_tool.ainvoke({})))
+            version = status.get("fingerprint")
+        data_versions[kind] = (time.monotonic(), version)
+        return version
+
+async def cached_json_response(
+    http_request: Request, endpoint: str, kind: str, key: str, build: Callable[[], Awaitable[Any]], conditional: bool = True
+) -> Response:
+    """데이터 세대로 만든 ETag로 정적 데이터 응답을 캐시합니다.
+
+    - 같은 세대의 같은 쿼리는 직렬화·압축해 둔 본문을 그대로 보냅니다. (Accept-Encoding에 따라 br/gzip)
+    - 그 밖에는 build()로 응답 내용을 만들어 캐시에 넣습니다.
+    - If-None-Match가 현재 ETag와 같으면 본문 없이 304를 반환합니다. 304의 ETag는 200으로 보냈을 표현(압축 여부)의
+      ETag와 같아야 하므로, 캐시에 없으면 응답을 먼저 만들어 넣습니다.
+    - 304는 GET/HEAD에만 쓸 수 있으므로 (RFC 9110) POST 엔드포인트는 conditional=False로 If-None-Match를 무시합니다.
+    """
+    cache_lookups = METRICS.counter("response_cache_total", "정적 데이터 응답 캐시 조회 결과", ("endpoint", "result"))
+    accept_encoding = http_request.headers.get("accept-encoding")
+    version = await data_version(kind)
+    if version is None:
+        # 세대를 알 수 없으면 캐시하지 않습니다.
+        cache_lookups.inc(endpoint=endpoint, result="bypass")
+        return FastJSONResponse(await build())
+    
+    etag = make_etag(version, f"{endpoint}:{key}")
+    cache_key = f"{endpoint}:{key}"
+    cached = RESPONSE_CACHE.get(cache_key, etag)
+    result = "hit"
+    if cached is None:
+        result = "miss"
+        cached = RESPONSE_CACHE.put(cache_key, etag, FastJSONResponse(await build()).body)
+
+    if conditional and etag_matches(http_request.headers.get("if-none-match"), etag):
+        cache_lookups.inc(endpoint=endpoint, result="not_modified")
+        return cached.not_modified(accept_encoding)
+    cache_lookups.inc(endpoint=endpoint, result=result)
+    return cached.to_response(accept_encoding)
+
+async def collect_scrape_phases(trace: Trace):
+    """트레이스에 get_card_info 호출이 있으면 카드 MCP 서버의 스크래핑 단계별 시간을 붙입니다."""
+    if not any(span.name == "get_card_info" for span in trace.spans("tool")):
+        return
+    if not mcp_state_available():
+        # 호출마다 새로 뜬 카드 MCP 서버에는 이전 호출의 스크래핑 기록이 없습니다.
+        return
+    
+    try:
+        scrape_tool = tool_handles.get("get_recent_scrapes")
+        if scrape_tool is None:
+            return
+        scrapes = json.loads(tool_result_text(await scrape_tool.ainvoke({"since": trace.root.started_at})))
+        attach_scrape_phases(trace, scrapes)
+    except Exception as e:
+        print(f"⚠️ 스크래핑 단계 시간 조회 실패: {e}")
+
+async def timed_step(name: str, step: Callable[[], Awaitable[Any]]):
+    """warmup 단계 하나를 실행하고 결과와 소요 시간을 warmup_state에 기록합니다. 실패해도 다음 단계로 넘어갑니다."""
+    started = time.perf_counter()
+    try:
+        result = await step()
+        warmup_state["steps"][name] = {"status": "ok", "result": result}
+    except Exception as e:
+        print(f"⚠️ warmup 단계 {name} 실패: {e}")
+        warmup_state["steps"][name] = {"status": "error", "error": str(e) or type(e).__name__}
+    warmup_state["steps"][name]["duration_ms"] = round((time.perf_counter() - started) * 1000, 3)
+
+async def warm_card_details() -> Any:
+    warm_tool = tool_handles.get("warm_card_details")
+    if warm_tool is None:
+        return None
+    result = await warm_tool.ainvoke({"top_n": WARMUP_TOP_CARDS, "browser": WARMUP_BROWSER})
+    return json.loads(tool_result_text(result))
+
+async def warm_data_versions() -> Dict[str, Optional[str]]:
+    return {kind: await data_version(kind) for kind in GENERATION_TOOL_NAMES}
+
+async def warm_llm() -> None:
+    await llm.ainvoke([HumanMessage(content="ping")])
+
+async def run_warmup():
+    """첫 사용자 요청이 느려지지 않도록 데이터, 브라우저, 캐시, LLM 연결을 미리 준비합니다.
+
+    카드 상세 정보와 브라우저 warmup은 카드 MCP 서버 프로세스가 유지될 때(MCP_PERSISTENT_SESSIONS 또는
+    MCP_BACKEND_URL)만 이후 요청에 효과가 있으므로, 그렇지 않으면 건너뜁니다.
+    """
+    warmup_state["status"] = "warming"
+    started = time.perf_counter()
+    # 도구 핸들은 initialize_services에서 이미 만들었습니다.
+    warmup_state["steps"]["tools"] = {"status": "ok", "result": len(tool_handles), "duration_ms": 0.0}
+    
+    steps = {"data_versions": warm_data_versions}
+    if (WARMUP_TOP_CARDS > 0 or WARMUP_BROWSER) and mcp_state_available():
+        steps["card_details"] = warm_card_details
+    if WARMUP_LLM:
+        steps["llm"] = warm_llm
+    tasks = {asyncio.create_task(timed_step(name, step)): name for name, step in steps.items()}
+    for task in tasks:
+        warmup_step_tasks.add(task)
+        task.add_done_callback(warmup_step_tasks.discard)
+    _, pending = await asyncio.wait(tasks, timeout=WARMUP_TIMEOUT)
+    if pending:
+        # 끝나지 않은 단계는 취소하지 않고 백그라운드에서 마저 진행하며, 끝나면 timed_step이 결과를 덮어씁니다.
+        names = [tasks[task] for task in pending]
+        print(f"⚠️ warmup 단계 {', '.join(names)}이(가) {WARMUP_TIMEOUT:g}초 안에 끝나지 않아 준비 완료로 전환합니다.")
+        for task in pending:
+            warmup_state["steps"][tasks[task]] = {"status": "timeout"}
+        warmup_state["timed_out"] = True
+    
+    warmup_state["duration_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    warmup_state["status"] = "ready"
+    print(f"🔥 warmup 완료 ({warmup_state['duration_ms']:.0f}ms)")
+
 # 앱 시작 시 초기화
 @app.on_event("startup")
 async def startup_event():
+    global warmup_task
     await initialize_services()
+    
+    # warmup은 백그라운드에서 진행하고, 끝날 때까지 /readyz만 503을 반환합니다. (/healthz는 바로 응답)
+    if WARMUP_ENABLED:
+        warmup_task = asyncio.create_task(run_warmup())
+    else:
+        warmup_state["status"] = "ready"
+
+# 앱 종료 시 정리
+@app.on_event("shutdown")
+async def shutdown_event():
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    for task in list(warmup_step_tasks):
+        task.cancel()
+    await mcp_sessions.aclose()
 
 # 헬스체크 엔드포인트
 @app.get("/")
 async def root():
     return {"message": "신한카드 추천 API 서비스가 실행 중입니다.", "status": "healthy"}
 
+# 활성 상태 확인 (프로세스가 응답하는지만 확인)
+@app.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
+
+# 준비 상태 확인 (초기화와 warmup이 끝나야 200, 그 전에는 503)
+@app.get("/readyz")
+async def readyz():
+    ready = agent is not None and warmup_state["status"] == "ready"
+    body = {"status": "ready" if ready else "not_ready", "warmup": warmup_state}
+    return JSONResponse(body, status_code=200 if ready else 503)
+
+async def run_chat_turn(
+    message: str,
+    session_id: Optional[str],
+    deadline_ms: Optional[int] = None,
+    debug: bool = False,
+    tool_memo: Optional[ToolCallMemo] = None,
+):
+    """대화 한 턴(사용자 메시지 → 에이전트 응답)을 실행하고 (AI 메시지, 트레이스)를 반환합니다.
+
+    session_id가 None이면 이전 대화 없이 실행하고 결과도 저장하지 않습니다.
+    tool_memo를 주지 않으면 TOOL_MEMO_SCOPE에 따라 새 도구 호출 메모를 만듭니다.
+    """
+    if agent is None:
+        raise HTTPException(status_code=500, detail="에이전트가 초기화되지 않았습니다.")
+    
+    # 세션별 대화 히스토리 가져오기
+    conversation_history = await session_store.load(session_id) if session_id is not None else []
+    
+    # 사용자 메시지 추가
+    user_message = HumanMessage(content=message)
+    conversation_history.append(user_message)
+    
+    # 트레이스 설정 (debug 요청이거나 CHAT_TRACE_LOG가 설정된 경우)
+    trace = Trace("POST /chat", session_id=session_id) if debug or TRACE_LOG_PATH else None
+    config = {}
+    if trace is not None:
+        agent_span = Span("agent", "agent", trace.root)
+        config["callbacks"] = [TraceCallbackHandler(trace, agent_span)]
+    
+    # 에이전트 실행 (요청 처리 시간 한도 안에서)
+    deadline_seconds = deadline_ms / 1000 if deadline_ms is not None else CHAT_DEADLINE_SECONDS
+    if tool_memo is None:
+        tool_memo = new_tool_memo(session_id)
+    deadline_token = REQUEST_DEADLINE.set(time.monotonic() + deadline_seconds)
+    memo_token = CURRENT_TOOL_MEMO.set(tool_memo)
+    try:
+        agent_response = await asyncio.wait_for(
+            agent.ainvoke({"messages": conversation_history}, config=config), timeout=deadline_seconds
+        )
+    except asyncio.TimeoutError:
+        # 답변을 받지 못한 메시지는 대화 히스토리에 저장하지 않습니다.
+        raise HTTPException(status_code=504, detail=f"응답 시간({deadline_seconds:.1f}초)을 초과했습니다.")
+    finally:
+        REQUEST_DEADLINE.reset(deadline_token)
+        CURRENT_TOOL_MEMO.reset(memo_token)
+    
+    if trace is not None:
+        agent_span.end()
+        await collect_scrape_phases(trace)
+    
+    # 에이전트 루프 단계 수 기록 (LLM 호출 수, 도구 호출 수)
+    new_messages = agent_response["messages"][len(conversation_history):]
+    METRICS.histogram("agent_steps", "요청당 에이전트 LLM 호출 수", COUNT_BUCKETS).observe(
+        sum(1 for msg in new_messages if isinstance(msg, AIMessage))
+    )
+    METRICS.histogram("agent_tool_calls", "요청당 에이전트 도구 호출 수", COUNT_BUCKETS).observe(
+        sum(1 for msg in new_messages if isinstance(msg, ToolMessage))
+    )
+    
+    # AI 응답 추출
+    ai_message = agent_response["messages"][-1]
+    
+    # 세션에 이번 대화(사용자 메시지, AI 응답) 저장
+    if session_id is not None:
+        await session_store.append(session_id, [user_message, ai_message])
+    
+    trace_dict = None
+    if trace is not None:
+        trace_dict = trace.to_dict()
+        if TRACE_LOG_PATH:
+            await asyncio.to_thread(write_trace, trace_dict)
+    
+    return ai_message, trace_dict
+
 # 채팅 API
 @app.post("/chat", response_model=ChatResponse)
+@METRICS.timed("POST /chat", kind="http_request")
 async def chat(request: ChatRequest):
     """사용자 메시지에 대한 AI 응답을 제공합니다."""
     try:
-        if agent is None:
-            raise HTTPException(status_code=500, detail="에이전트가 초기화되지 않았습니다.")
-        
-        session_id = request.session_id
-        
-        # 세션별 대화 히스토리 가져오기
-        if session_id not in conversation_sessions:
-            conversation_sessions[session_id] = []
-        
-        conversation_history = conversation_sessions[session_id]
-        
-        # 사용자 메시지 추가
-        conversation_history.append(HumanMessage(content=request.message))
-        
-        # 에이전트 실행
-        agent_response = await agent.ainvoke({"messages": conversation_history})
-        
-        # AI 응답 추출
-        ai_message = agent_response["messages"][-1]
-        conversation_history.append(ai_message)
-        
-        # 세션에 대화 히스토리 저장
-        conversation_sessions[session_id] = conversation_history
+        ai_message, trace_dict = await run_chat_turn(
+            request.message, request.session_id, request.deadline_ms, request.debug
+        )
         
-        # 응답 형식으로 변환
-        response_history = []
-        for msg in conversation_history:
-            if isinstance(msg, HumanMessage):
-                response_history.append({"role": "user", "content": msg.content})
-            elif isinstance(msg, AIMessage):
-                response_history.append({"role": "assistant", "content": msg.content})
+        # 전체 히스토리는 요청한 경우에만 포함합니다. (저장소에 응답 형식으로 쌓아둔 항목을 그대로 사용)
+        response_history = None
+        if request.include_history:
+            response_history = (await session_store.history_page(request.session_id))["conversation_history"]
         
         return ChatResponse(
             response=ai_message.content,
-            session_id=session_id,
-            conversation_history=response_history
+            session_id=request.session_id,
+            conversation_history=response_history,
+            trace=trace_dict if request.debug else None
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"채팅 처리 중 오류 발생: {str(e)}")
 
+# 일괄 채팅 API
+@app.post("/chat/batch")
+@METRICS.timed("POST /chat/batch", kind="http_request")
+async def chat_batch(request: Request, concurrency: Optional[int] = None):
+    """JSONL 본문(한 줄에 질문 하나)의 질문들을 동시에 처리하고, 끝나는 순서대로 결과를 JSONL로 스트리밍합니다.
+
+    session_id가 없는 질문은 이전 대화 없이 답하고 히스토리에 저장하지 않습니다.
+    같은 session_id의 질문은 입력 순서대로 하나씩 처리합니다. 마지막 줄은 처리량 요약입니다.
+    """
+    try:
+        if agent is None:
+            raise HTTPException(status_code=500, detail="에이전트가 초기화되지 않았습니다.")
+        items = parse_batch_items((await request.body()).decode("utf-8"))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"JSONL 본문을 읽을 수 없습니다: {str(e)}")
+    
+    if not items:
+        raise HTTPException(status_code=400, detail="질문이 없습니다.")
+    if len(items) > CHAT_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"질문은 한 번에 {CHAT_BATCH_MAX_ITEMS}개까지 보낼 수 있습니다.")
+    concurrency = min(max(1, concurrency or CHAT_BATCH_CONCURRENCY), CHAT_BATCH_MAX_CONCURRENCY)
+    
+    item_latency = METRICS.histogram("chat_batch_item_latency_seconds", "일괄 채팅 질문별 처리 시간(초)", LATENCY_BUCKETS, ("status",))
+    
+    async def answer_turn(message: str, session_id: Optional[str], deadline_ms: Optional[int], tool_memo: Optional[ToolCallMemo]) -> str:
+        ai_message, _ = await run_chat_turn(message, session_id, deadline_ms, tool_memo=tool_memo)
+        return ai_message.content
+    
+    answer = batch_answerer(answer_turn, memoize=TOOL_MEMO_SCOPE != "off")
+    
+    async def stream():
+        async for record in run_batch(items, answer, concurrency):
+            if record["type"] == "result":
+                item_latency.observe(record["latency_ms"] / 1000, status=record["status"])
+            yield to_jsonl(record)
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
 # 카드 검색 API
-@app.post("/cards/search")
-async def search_cards(request: CardSearchRequest):
-    """카드 검색 API"""
+async def card_search_response(request: CardSearchRequest, http_request: Request, conditional: bool) -> Response:
+    """카드 검색 결과 응답을 만듭니다. (GET/POST /cards/search가 같은 캐시를 공유합니다.)"""
     try:
         if client is None:
             raise HTTPException(status_code=500, detail="클라이언트가 초기화되지 않았습니다.")
         
-        tools = await client.get_tools()
-        
-        # 검색 조건에 따른 도구 선택
-        if request.benefit_keyword:
-            # 혜택 키워드로 검색
-            search_tool = next((tool for tool in tools if tool.name == "search_cards_by_benefit"), None)
-            if search_tool:
-                result = await search_tool.ainvoke({"benefit_keyword": request.benefit_keyword})
-                return {"type": "benefit_search", "data": result}
-        
-        elif request.max_annual_fee:
-            # 연회비로 검색
-            search_tool = next((tool for tool in tools if tool.name == "search_cards_by_annual_fee"), None)
-            if search_tool:
-                result = await search_tool.ainvoke({"max_fee": request.max_annual_fee})
-                return {"type": "annual_fee_search", "data": result}
-        
-        elif request.card_name:
-            # 카드 이름으로 검색
-            search_tool = next((tool for tool in tools if tool.name == "get_all_cards_with_name"), None)
-            if search_tool:
-                result = await search_tool.ainvoke({})
-                # 이름으로 필터링
-                filtered_cards = [card for card in result if request.card_name.lower() in card.get("name", "").lower()]
-                return {"type": "name_search", "data": filtered_cards}
-        
-        else:
-            # 모든 카드 반환
-            search_tool = next((tool for tool in tools if tool.name == "get_all_cards_with_name"), None)
-            if search_tool:
-                result = await search_tool.ainvoke({})
-                return {"type": "all_cards", "data": result}
+        async def build():
+            # 검색 조건에 따른 도구 선택
+            if request.benefit_keyword:
+                # 혜택 키워드로 검색
+                search_tool = tool_handles.get("search_cards_by_benefit")
+                if search_tool:
+                    result = await search_tool.ainvoke({"benefit_keyword": request.benefit_keyword})
+                    return {"type": "benefit_search", "data": result}
+            
+            elif request.max_annual_fee:
+                # 연회비로 검색
+                search_tool = tool_handles.get("search_cards_by_annual_fee")
+                if search_tool:
+                    result = await search_tool.ainvoke({"max_fee": request.max_annual_fee})
+                    return {"type": "annual_fee_search", "data": result}
+            
+            elif request.card_name:
+                # 카드 이름으로 검색
+                search_tool = tool_handles.get("get_all_cards_with_name")
+                if search_tool:
+                    result = await search_tool.ainvoke({})
+                    # 이름으로 필터링
+                    filtered_cards = [card for card in result if request.card_name.lower() in card.get("name", "").lower()]
+                    return {"type": "name_search", "data": filtered_cards}
+            
+            else:
+                # 모든 카드 반환
+                search_tool = tool_handles.get("get_all_cards_with_name")
+                if search_tool:
+                    result = await search_tool.ainvoke({})
+                    return {"type": "all_cards", "data": result}
+            
+            raise HTTPException(status_code=404, detail="적절한 검색 도구를 찾을 수 없습니다.")
         
-        raise HTTPException(status_code=404, detail="적절한 검색 도구를 찾을 수 없습니다.")
+        key = json.dumps(request.model_dump(), ensure_ascii=False, sort_keys=True)
+        return await cached_json_response(http_request, "cards/search", "card", key, build, conditional=conditional)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"카드 검색 중 오류 발생: {str(e)}")
 
+@app.get("/cards/search", response_class=FastJSONResponse)
+@METRICS.timed("GET /cards/search", kind="http_request")
+async def search_cards_by_query(
+    http_request: Request,
+    benefit_keyword: Optional[str] = None,
+    max_annual_fee: Optional[int] = None,
+    card_name: Optional[str] = None,
+):
+    """카드 검색 API (쿼리 파라미터). If-None-Match가 현재 ETag와 같으면 304를 반환합니다."""
+    request = CardSearchRequest(benefit_keyword=benefit_keyword, max_annual_fee=max_annual_fee, card_name=card_name)
+    return await card_search_response(request, http_request, conditional=True)
+
+@app.post("/cards/search", response_class=FastJSONResponse)
+@METRICS.timed("POST /cards/search", kind="http_request")
+async def search_cards(request: CardSearchRequest, http_request: Request):
+    """카드 검색 API"""
+    return await card_search_response(request, http_request, conditional=False)
+
 # 이벤트 조회 API
-@app.get("/events")
-async def get_events():
+@app.get("/events", response_class=FastJSONResponse)
+@METRICS.timed("GET /events", kind="http_request")
+async def get_events(http_request: Request):
     """진행중인 이벤트 목록을 조회합니다."""
     try:
         if client is None:
             raise HTTPException(status_code=500, detail="클라이언트가 초기화되지 않았습니다.")
         
-        tools = await client.get_tools()
-        event_tool = next((tool for tool in tools if tool.name == "get_event_data"), None)
+        async def build():
+            event_tool = tool_handles.get("get_event_data")
+            
+            if event_tool:
+                result = await event_tool.ainvoke({})
+                return {"type": "events", "data": result}
+            else:
+                raise HTTPException(status_code=404, detail="이벤트 도구를 찾을 수 없습니다.")
         
-        if event_tool:
-            result = await event_tool.ainvoke({})
-            return {"type": "events", "data": result}
-        else:
-            raise HTTPException(status_code=404, detail="이벤트 도구를 찾을 수 없습니다.")
+        return await cached_json_response(http_request, "events", "event", "", build)
             
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"이벤트 조회 중 오류 발생: {str(e)}")
 
 # 대화 히스토리 조회 API
 @app.get("/chat/history/{session_id}")
-async def get_chat_history(session_id: str):
-    """특정 세션의 대화 히스토리를 조회합니다."""
+@METRICS.timed("GET /chat/history/{session_id}", kind="http_request")
+async def get_chat_history(session_id: str, cursor: int = Query(0, ge=0), limit: int = HISTORY_PAGE_LIMIT):
+    """특정 세션의 대화 히스토리를 오래된 순서로 한 페이지씩 조회합니다.
+
+    응답의 next_cursor를 다음 요청의 cursor로 넘기면 이어지는 페이지를 받습니다. (마지막 페이지이면 null)
+    cursor는 세션 저장소마다 의미가 다른 불투명한 값이므로, 0(처음) 또는 받은 next_cursor만 넘겨야 합니다.
+    """
     try:
-        if session_id not in conversation_sessions:
-            return {"session_id": session_id, "conversation_history": []}
-        
-        conversation_history = conversation_sessions[session_id]
-        
-        # 응답 형식으로 변환
-        response_history = []
-        for msg in conversation_history:
-            if isinstance(msg, HumanMessage):
-                response_history.append({"role": "user", "content": msg.content})
-            elif isinstance(msg, AIMessage):
-                response_history.append({"role": "assistant", "content": msg.content})
+        limit = min(max(1, limit), HISTORY_PAGE_MAX_LIMIT)
+        page = await session_store.history_page(session_id, cursor, limit)
         
         return {
             "session_id": session_id,
-            "conversation_history": response_history,
-            "message_count": len(response_history)
+            "conversation_history": page["conversation_history"],
+            "message_count": page["message_count"],
+            "next_cursor": page["next_cursor"]
         }
         
     except Exception as e:
@@ -254,11 +670,12 @@ async def get_chat_history(session_id: str):
 
 # 대화 히스토리 삭제 API
 @app.delete("/chat/history/{session_id}")
+@METRICS.timed("DELETE /chat/history/{session_id}", kind="http_request")
 async def delete_chat_history(session_id: str):
     """특정 세션의 대화 히스토리를 삭제합니다."""
     try:
-        if session_id in conversation_sessions:
-            del conversation_sessions[session_id]
+        session_tool_memos.pop(session_id, None)
+        if await session_store.delete(session_id):
             return {"message": f"세션 '{session_id}'의 대화 히스토리가 삭제되었습니다."}
         else:
             return {"message": f"세션 '{session_id}'가 존재하지 않습니다."}
@@ -268,16 +685,12 @@ async def delete_chat_history(session_id: str):
 
 # 활성 세션 목록 조회 API
 @app.get("/chat/sessions")
+@METRICS.timed("GET /chat/sessions", kind="http_request")
 async def get_active_sessions():
     """현재 활성화된 세션 목록을 조회합니다."""
     try:
-        sessions = []
-        for session_id, history in conversation_sessions.items():
-            sessions.append({
-                "session_id": session_id,
-                "message_count": len(history),
-                "last_activity": "recent"  # 실제로는 타임스탬프를 저장할 수 있음
-            })
+        # last_activity: 마지막 대화 저장 시각 (epoch 초)
+        sessions = await session_store.sessions()
         
         return {
             "active_sessions": sessions,
@@ -288,25 +701,119 @@ async def get_active_sessions():
         raise HTTPException(status_code=500, detail=f"세션 목록 조회 중 오류 발생: {str(e)}")
 
 # 사용 가능한 혜택 키워드 API
-@app.get("/benefit-keywords")
-async def get_benefit_keywords():
+@app.get("/benefit-keywords", response_class=FastJSONResponse)
+@METRICS.timed("GET /benefit-keywords", kind="http_request")
+async def get_benefit_keywords(http_request: Request):
     """사용 가능한 혜택 키워드 목록을 조회합니다."""
     try:
         if client is None:
             raise HTTPException(status_code=500, detail="클라이언트가 초기화되지 않았습니다.")
         
-        tools = await client.get_tools()
-        keyword_tool = next((tool for tool in tools if tool.name == "get_available_benefit_keysords"), None)
+        async def build():
+            keyword_tool = tool_handles.get("get_available_benefit_keysords")
+            
+            if keyword_tool:
+                result = await keyword_tool.ainvoke({})
+                return {"type": "benefit_keywords", "data": result}
+            else:
+                raise HTTPException(status_code=404, detail="혜택 키워드 도구를 찾을 수 없습니다.")
         
-        if keyword_tool:
-            result = await keyword_tool.ainvoke({})
-            return {"type": "benefit_keywords", "data": result}
-        else:
-            raise HTTPException(status_code=404, detail="혜택 키워드 도구를 찾을 수 없습니다.")
+        return await cached_json_response(http_request, "benefit-keywords", "card", "", build)
             
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"혜택 키워드 조회 중 오류 발생: {str(e)}")
 
-if __name__ == "__main__":
+# 리소스 데이터 세대 조회 API
+@app.get("/data/generation")
+@METRICS.timed("GET /data/generation", kind="http_request")
+async def get_data_generation():
+    """MCP 서버에 현재 적용된 리소스 데이터의 세대 번호와 빌드 시간을 조회합니다."""
+    try:
+        if client is None:
+            raise HTTPException(status_code=500, detail="클라이언트가 초기화되지 않았습니다.")
+        
+        generations = {}
+        for tool in tool_handles.values():
+            if tool.name in GENERATION_TOOL_NAMES.values():
+                if mcp_state_available():
+                    generations[tool.name] = await tool.ainvoke({})
+                else:
+                    # 호출마다 새로 뜬 MCP 서버의 세대 번호는 항상 1이므로 보여주지 않습니다.
+                    generations[tool.name] = {"available": False, "reason": "MCP 서버 세션이 유지되지 않습니다 (MCP_PERSISTENT_SESSIONS=0)."}
+        
+        return {"type": "data_generation", "data": generations}
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"데이터 세대 조회 중 오류 발생: {str(e)}")
+
+# 메트릭 API
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """API 서버와 MCP 서버의 메트릭을 Prometheus 텍스트 형식으로 반환합니다."""
+    output = [METRICS.render()]
+    
+    if client is not None and not mcp_state_available():
+        # 호출마다 새로 뜬 MCP 서버의 메트릭은 항상 비어 있으므로 내보내지 않습니다.
+        output.append("# MCP 서버 메트릭 없음: MCP 서버 세션이 유지되지 않습니다 (MCP_PERSISTENT_SESSIONS=0).\n")
+    elif client is not None:
+        for tool in tool_handles.values():
+            if tool.name in METRICS_TOOL_NAMES:
+                try:
+                    output.append(tool_result_text(await tool.ainvoke({})))
+                except Exception as e:
+                    output.append(f"# {tool.name} 조회 실패: {e}\n")
+    
+    return PlainTextResponse("".join(output), media_type="text/plain; version=0.0.4")
+
+def start_mcp_backend(port: int, timeout: float = 30.0) -> subprocess.Popen:
+    """공유 MCP 서버(main.py)를 하위 프로세스로 실행하고, 포트가 열릴 때까지 기다립니다."""
+    process = subprocess.Popen(
+        [sys.executable, str(BASE_DIR / "main.py")],
+        env={**os.environ, "MCP_BACKEND_HOST": "127.0.0.1", "MCP_BACKEND_PORT": str(port)},
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"MCP 서버가 종료되었습니다 (exit code {process.returncode}).")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"MCP 서버가 {timeout:.0f}초 안에 시작되지 않았습니다.")
+
+def main():
+    parser = argparse.ArgumentParser(description="신한카드 추천 API 서버")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn 워커 프로세스 수")
+    parser.add_argument("--mcp-port", type=int, default=int(os.getenv("MCP_BACKEND_PORT", "8001")),
+                        help="워커가 2개 이상이고 MCP_BACKEND_URL이 없을 때 실행할 공유 MCP 서버 포트")
+    args = parser.parse_args()
+
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
+
+    if args.workers <= 1:
+        uvicorn.run(app, host=args.host, port=args.port)
+        return
+
+    # 여러 워커: 세션은 SQLite에 공유하고, MCP 서버는 하나만 띄워 모든 워커가 HTTP로 연결합니다.
+    os.environ.setdefault("SESSION_STORE", "sqlite")
+    backend = None
+    if not MCP_BACKEND_URL:
+        backend = start_mcp_backend(args.mcp_port)
+        os.environ["MCP_BACKEND_URL"] = f"http://127.0.0.1:{args.mcp_port}/mcp"
+        print(f"✅ 공유 MCP 서버 실행: {os.environ['MCP_BACKEND_URL']}")
+    if os.environ["SESSION_STORE"] == "memory":
+        print("⚠️ SESSION_STORE=memory에서는 워커끼리 대화 히스토리를 공유하지 않습니다.")
+
+    try:
+        uvicorn.run("api_server:app", host=args.host, port=args.port, workers=args.workers, app_dir=str(BASE_DIR))
+    finally:
+        if backend is not None:
+            backend.terminate()
+            backend.wait(timeout=10)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench.fixture_server import start_fixture_server, use_offline_environment
+from bench.stats import print_table, read_rss_kb, summarize_latencies
+
+
+# (도구 이름, 인자) 목록. get_card_info는 브라우저를 띄우므로 따로 반복 횟수를 지정합니다.
+CARD_CASES = [
+    ("get_all_cards_with_name", {}),
+    ("get_available_benefit_keysords", {}),
+    ("search_cards_by_benefit", {"benefit_keyword": "대중교통"}),
+    ("search_cards_by_benefit", {"benefit_keyword": "없는키워드"}),
+    ("search_cards_by_annual_fee", {"max_fee": 10000}),
+]
+EVENT_CASES = [
+    ("get_event_data", {}),
+]
+SCRAPE_CASE = ("get_card_info", {"url": "https://www.card-gorilla.com/card/detail/13"})
+
+
+async def bench_case(client, name, args, iterations, warmup):
+    for _ in range(warmup):
+        await client.call_tool(name, args)
+
+    latencies = []
+    payload_bytes = 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        result = await client.call_tool(name, args, raise_on_error=False)
+        latencies.append((time.perf_counter() - call_started) * 1000)
+        payload_bytes = sum(len(getattr(block, "text", "").encode("utf-8")) for block in result.content)
+    wall = time.perf_counter() - started
+
+    return {
+        "tool": name,
+        "args": json.dumps(args, ensure_ascii=False),
+        **summarize_latencies(latencies, wall),
+        "payload_bytes": payload_bytes,
+    }
+
+
+async def run(args):
+    # card_mcp를 불러오기 전에 상세 페이지 origin을 fixture 서버로 바꿔야 합니다.
+    fixture = start_fixture_server(delay_ms=args.fixture_delay_ms)
+    use_offline_environment(fixture)
+    # 매번 실제로 가져오도록 캐시를 끕니다.
+    os.environ.setdefault("CARD_DETAIL_TTL", "0")
+
+    from fastmcp import Client
+    from card_mcp import card_mcp
+    from event_mcp import event_mcp
+
+    rows = []
+    async with Client(card_mcp) as client:
+        for name, tool_args in CARD_CASES:
+            rows.append(await bench_case(client, name, tool_args, args.iterations, args.warmup))
+        if args.scrape_iterations > 0:
+            name, tool_args = SCRAPE_CASE
+            rows.append(await bench_case(client, name, tool_args, args.scrape_iterations, 0))
+    async with Client(event_mcp) as client:
+        for name, tool_args in EVENT_CASES:
+            rows.append(await bench_case(client, name, tool_args, args.iterations, args.warmup))
+
+    fixture.shutdown()
+    if fixture.unexpected_requests:
+        raise SystemExit(f"❌ fixture가 아닌 외부 요청이 있어 결과가 오프라인 측정이 아닙니다: {fixture.unexpected_requests}")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP 도구 마이크로 벤치마크 (in-memory MCP 클라이언트, 네트워크 없음)")
+    parser.add_argument("--iterations", type=int, default=200, help="도구별 반복 횟수")
+    parser.add_argument("--warmup", type=int, default=10, help="측정 전 워밍업 호출 수")
+    parser.add_argument("--scrape-iterations", type=int, default=3, help="get_card_info 반복 횟수 (0이면 건너뜀)")
+    parser.add_argument("--fixture-delay-ms", type=float, default=0.0, help="fixture 서버 응답 지연 (밀리초)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    rows = asyncio.run(run(args))
+    print_table(rows, ["tool", "args", "count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "throughput_rps", "payload_bytes"])
+    print(f"\nRSS: {read_rss_kb(os.getpid())} kB")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import asyncio
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+
+RESOURCE_DIR = Path(__file__).parent.parent / "resource"
+
+# 질문에 자주 나오는 표현 -> 혜택 키워드
+KEYWORD_ALIASES = {
+    "지하철": "대중교통",
+    "버스": "대중교통",
+    "해외여행": "해외이용",
+}
+
+
+def _approx_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class ScriptedChatModel(BaseChatModel):
+    """질문 내용에 따라 정해진 순서로 도구를 호출하는 가짜 채팅 모델입니다.
+
+    create_react_agent에서 Gemini 대신 사용하며, 같은 질문에는 항상 같은 도구 호출과 답변을 만듭니다.
+    네트워크를 사용하지 않으므로 벤치마크에서는 LLM 이외 구간(MCP stdio, 도구, 스크래핑)만 측정됩니다.
+    """
+
+    # 호출마다 흉내낼 LLM 지연 시간 (밀리초)
+    response_delay_ms: float = 0.0
+    cards: List[Dict[str, Any]] = []
+    benefit_keywords: List[str] = []
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        if not self.cards:
+            with open(RESOURCE_DIR / "shcard.json", "r", encoding="utf-8") as f:
+                self.cards = json.load(f)
+        if not self.benefit_keywords:
+            with open(RESOURCE_DIR / "benefit_keywords.json", "r", encoding="utf-8") as f:
+                # 긴 키워드를 먼저 매칭합니다 (예: '대중교통'이 '교통'보다 우선)
+                self.benefit_keywords = sorted(json.load(f), key=len, reverse=True)
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _find_card(self, question: str) -> Optional[Dict[str, Any]]:
+        for card in self.cards:
+            name = card.get("name", "")
+            if name and name.replace("신한카드 ", "") in question:
+                return card
+        return None
+
+    def _find_keyword(self, question: str) -> Optional[str]:
+        for alias, keyword in KEYWORD_ALIASES.items():
+            if alias in question:
+                return keyword
+        for keyword in self.benefit_keywords:
+            if keyword in question:
+                return keyword
+        return None
+
+    def plan(self, question: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """질문에 대해 호출할 도구 목록(이름, 인자)을 반환합니다."""
+        if "이벤트" in question:
+            return [("get_event_data", {})]
+        if "연회비" in question:
+            return [("search_cards_by_annual_fee", {"max_fee": 10000})]
+
+        card = self._find_card(question)
+        if card is not None:
+            return [("get_all_cards_with_name", {}), ("get_card_info", {"url": card["url"]})]
+
+        keyword = self._find_keyword(question)
+        if keyword is not None:
+            return [("get_available_benefit_keysords", {}), ("search_cards_by_benefit", {"benefit_keyword": keyword})]
+
+        return [("get_all_cards_with_name", {})]
+
+    def _next_message(self, messages: List[BaseMessage]) -> AIMessage:
+        turn_start = max((i for i, msg in enumerate(messages) if isinstance(msg, HumanMessage)), default=0)
+        question = str(messages[turn_start].content) if messages else ""
+        turn = messages[turn_start + 1:]
+        step = sum(1 for msg in turn if isinstance(msg, AIMessage))
+        input_tokens = sum(_approx_tokens(str(msg.content)) for msg in messages)
+
+        plan = self.plan(question)
+        if step < len(plan):
+            name, args = plan[step]
+            return AIMessage(
+                content="",
+                tool_calls=[{"name": name, "args": args, "id": f"call_{step}_{name}", "type": "tool_call"}],
+                usage_metadata={"input_tokens": input_tokens, "output_tokens": 8, "total_tokens": input_tokens + 8},
+            )
+
+        tool_results = [msg for msg in turn if isinstance(msg, ToolMessage)]
+        result_bytes = sum(len(str(msg.content).encode("utf-8")) for msg in tool_results)
+        content = f"'{question}'에 대한 답변입니다. 도구 {len(tool_results)}회 호출 결과({result_bytes}바이트)를 참고했습니다."
+        output_tokens = _approx_tokens(content)
+        return AIMessage(
+            content=content,
+            usage_metadata={"input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens},
+        )
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=self._next_message(messages))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if self.response_delay_ms:
+            await asyncio.sleep(self.response_delay_ms / 1000)
+        return self._generate(messages, stop=stop, **kwargs)
@@ -0,0 +1,142 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures"
+SHCARD_PATH = Path(__file__).parent.parent / "resource" / "shcard.json"
+
+DETAIL_PATH = re.compile(r"^/card/detail/(\d+)/?$")
+
+
+def load_card_names():
+    """상세 페이지 경로(/card/detail/<id>) -> 카드 이름"""
+    with open(SHCARD_PATH, "r", encoding="utf-8") as f:
+        cards = json.load(f)
+    names = {}
+    for card in cards:
+        match = re.search(r"/card/detail/(\d+)", card.get("url", ""))
+        if match:
+            names[match.group(1)] = card.get("name", "")
+    return names
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """저장된 카드 상세 페이지 HTML을 제공합니다.
+
+    bench/fixtures/card_detail_<id>.html이 있으면 그 파일을, 없으면 card_detail.html 템플릿에
+    카드 이름을 채워서 응답합니다. 본문 해시를 ETag로 내려주고, If-None-Match가 같으면 304로 응답합니다.
+    프록시로 들어온 요청(절대 URL, CONNECT)은 fixture가 아닌 외부 요청이므로 502로 거절하고 기록합니다.
+    """
+
+    protocol_version = "HTTP/1.1"
+    delay_ms = 0.0
+    card_names = {}
+    template = ""
+
+    def reject_external(self):
+        self.server.unexpected_requests.append(f"{self.command} {self.path}")
+        print(f"❌ fixture가 아닌 외부 요청을 거절했습니다: {self.command} {self.path}", file=sys.stderr)
+        self.send_error(502, "offline benchmark: external request blocked")
+
+    do_CONNECT = reject_external
+
+    def do_GET(self):
+        if not self.path.startswith("/"):
+            self.reject_external()
+            return
+        match = DETAIL_PATH.match(self.path.split("?", 1)[0])
+        if not match:
+            self.send_error(404)
+            return
+
+        card_id = match.group(1)
+        saved = FIXTURE_DIR / f"card_detail_{card_id}.html"
+        if saved.exists():
+            body = saved.read_text(encoding="utf-8")
+        else:
+            name = self.card_names.get(card_id, f"카드 {card_id}")
+            body = self.template.replace("__CARD_NAME__", name).replace("__CARD_ID__", card_id)
+
+        if self.delay_ms:
+            time.sleep(self.delay_ms / 1000)
+
+        data = body.encode("utf-8")
+        etag = '"' + hashlib.sha1(data).hexdigest()[:16] + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fixture_server(host: str = "127.0.0.1", port: int = 0, delay_ms: float = 0.0) -> ThreadingHTTPServer:
+    """백그라운드 스레드에서 fixture 서버를 시작하고 서버 객체를 반환합니다. (port=0이면 빈 포트 사용)"""
+    FixtureHandler.delay_ms = delay_ms
+    FixtureHandler.card_names = load_card_names()
+    FixtureHandler.template = (FIXTURE_DIR / "card_detail.html").read_text(encoding="utf-8")
+
+    server = ThreadingHTTPServer((host, port), FixtureHandler)
+    server.daemon_threads = True
+    server.unexpected_requests = []
+    threading.Thread(target=server.serve_forever, name="fixture-server", daemon=True).start()
+    return server
+
+
+def server_origin(server: ThreadingHTTPServer) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+
+def use_offline_environment(server: ThreadingHTTPServer):
+    """이 프로세스와 이후 실행하는 MCP 서버 프로세스가 fixture 서버만 사용하도록 환경변수를 설정합니다.
+
+    카드 상세 페이지는 fixture 서버에서 가져오고, JSON API와 상세 정보 저장 파일은 사용하지 않습니다.
+    그 밖의 HTTP(S) 요청은 프록시 설정으로 fixture 서버에 보내 거절되게 하므로, server.unexpected_requests가
+    비어 있지 않으면 측정 중 외부 네트워크를 사용하려 한 것입니다.
+    """
+    origin = server_origin(server)
+    os.environ["CARD_DETAIL_ORIGIN"] = origin
+    os.environ["CARD_DETAIL_API_URL"] = ""
+    # fixture 데이터가 실제 상세 정보 저장 파일에 남지 않도록 합니다.
+    os.environ["CARD_DETAILS_PATH"] = ""
+    for name in ("HTTP_PROXY", "HTTPS_PROXY", "ALL_PROXY"):
+        os.environ[name] = os.environ[name.lower()] = origin
+    os.environ["NO_PROXY"] = os.environ["no_proxy"] = "127.0.0.1,localhost"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="카드 상세 페이지 fixture 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay-ms", type=float, default=0.0, help="응답 전 인위적인 지연 (밀리초)")
+    args = parser.parse_args()
+
+    server = start_fixture_server(args.host, args.port, args.delay_ms)
+    print(f"📄 fixture 서버 실행 중: {server_origin(server)} (CARD_DETAIL_ORIGIN으로 설정하세요)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench.stats import print_table, read_rss_kb, read_tree_rss_kb, summarize_latencies
+
+
+# /chat 질문 (multi_mcp_client의 도움말 예시와 같은 유형)
+CHAT_QUESTIONS = [
+    "지하철 카드 추천해줘",
+    "연회비가 낮은 카드 알려줘",
+    "해외여행 카드 추천해줘",
+    "Mr.Life 카드 혜택 알려줘",
+    "KT 통신 카드 추천해줘",
+    "현재 진행중인 이벤트 알려줘",
+]
+
+# /cards/search 요청 본문
+SEARCH_BODIES = [
+    {"benefit_keyword": "대중교통"},
+    {"benefit_keyword": "카페"},
+    {"max_annual_fee": 10000},
+    {"card_name": "Deep"},
+    {},
+]
+
+
+async def wait_until_up(client: httpx.AsyncClient, base_url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            response = await client.get(f"{base_url}/")
+            if response.status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.5)
+    raise RuntimeError(f"{base_url}가 {timeout}초 안에 응답하지 않습니다.")
+
+
+async def sample_rss(pid: int, interval: float, samples: list, stop: asyncio.Event):
+    started = time.perf_counter()
+    while not stop.is_set():
+        samples.append({"t_s": round(time.perf_counter() - started, 1), "rss_kb": read_rss_kb(pid), "tree_rss_kb": read_tree_rss_kb(pid)})
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_endpoint(client, base_url, endpoint, concurrency, total_requests, duration):
+    """하나의 엔드포인트에 concurrency개의 작업자로 부하를 줍니다."""
+    if endpoint == "chat":
+        bodies = ({"message": question, "session_id": f"load-{i}"} for i, question in enumerate(itertools.cycle(CHAT_QUESTIONS)))
+        path = "/chat"
+    else:
+        bodies = itertools.cycle(SEARCH_BODIES)
+        path = "/cards/search"
+
+    latencies, errors = [], 0
+    issued = 0
+    deadline = time.perf_counter() + duration if duration else None
+
+    async def worker():
+        nonlocal issued, errors
+        while True:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            if deadline is None and issued >= total_requests:
+                return
+            issued += 1
+            body = next(bodies)
+            started = time.perf_counter()
+            try:
+                response = await client.post(f"{base_url}{path}", json=body)
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append((time.perf_counter() - started) * 1000)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    return {"endpoint": path, "concurrency": concurrency, "errors": errors, **summarize_latencies(latencies, wall)}
+
+
+async def run(args):
+    server = None
+    pid = args.pid
+    if args.serve:
+        # 오프라인 api_server를 별도 프로세스로 띄웁니다.
+        server = subprocess.Popen(
+            [sys.executable, str(Path(__file__).parent / "serve_offline.py"),
+             "--port", str(args.port), "--llm-delay-ms", str(args.llm_delay_ms)],
+            env=dict(os.environ),
+        )
+        pid = server.pid
+
+    base_url = f"http://127.0.0.1:{args.port}" if args.serve else args.url
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        try:
+            await wait_until_up(client, base_url)
+            rss_samples, stop = [], asyncio.Event()
+            sampler = asyncio.create_task(sample_rss(pid, args.rss_interval, rss_samples, stop)) if pid else None
+
+            endpoints = ["chat", "search"] if args.endpoint == "both" else [args.endpoint]
+            rows = []
+            for endpoint in endpoints:
+                rows.append(await run_endpoint(client, base_url, endpoint, args.concurrency, args.requests, args.duration))
+
+            stop.set()
+            if sampler is not None:
+                await sampler
+            return rows, rss_samples
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="api_server /chat, /cards/search 부하 테스트")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="api_server 주소")
+    parser.add_argument("--endpoint", choices=["chat", "search", "both"], default="both")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="엔드포인트별 요청 수 (--duration이 없을 때)")
+    parser.add_argument("--duration", type=float, default=0.0, help="엔드포인트별 실행 시간 (초)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="요청 타임아웃 (초)")
+    parser.add_argument("--pid", type=int, default=0, help="RSS를 기록할 서버 프로세스 pid (자식 MCP 프로세스 포함)")
+    parser.add_argument("--rss-interval", type=float, default=1.0, help="RSS 기록 주기 (초)")
+    parser.add_argument("--serve", action="store_true", help="bench/serve_offline.py로 오프라인 서버를 직접 실행")
+    parser.add_argument("--port", type=int, default=8000, help="--serve로 실행할 서버 포트")
+    parser.add_argument("--llm-delay-ms", type=float, default=0.0, help="--serve 시 가짜 LLM 호출당 지연 (밀리초)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    rows, rss_samples = asyncio.run(run(args))
+    print_table(rows, ["endpoint", "concurrency", "count", "errors", "throughput_rps", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"])
+    if rss_samples:
+        print("\nRSS (서버 프로세스):")
+        print_table(rss_samples, ["t_s", "rss_kb", "tree_rss_kb"])
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"results": rows, "rss": rss_samples}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
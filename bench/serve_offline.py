@@ -0,0 +1,34 @@
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench.fake_llm import ScriptedChatModel
+from bench.fixture_server import server_origin, start_fixture_server, use_offline_environment
+
+
+def main():
+    parser = argparse.ArgumentParser(description="가짜 LLM과 로컬 fixture 서버로 api_server를 네트워크 없이 실행합니다.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--llm-delay-ms", type=float, default=0.0, help="가짜 LLM 호출당 지연 (밀리초)")
+    parser.add_argument("--fixture-delay-ms", type=float, default=0.0, help="fixture 서버 응답 지연 (밀리초)")
+    args = parser.parse_args()
+
+    fixture = start_fixture_server(delay_ms=args.fixture_delay_ms)
+    # MCP 서버 프로세스는 api_server가 환경변수를 그대로 물려받아 실행합니다. (외부 요청은 fixture 서버가 거절)
+    use_offline_environment(fixture)
+    os.environ.setdefault("GOOGLE_API_KEY", "offline")
+
+    import api_server
+    import uvicorn
+
+    api_server.build_llm = lambda: ScriptedChatModel(response_delay_ms=args.llm_delay_ms)
+    print(f"🧪 오프라인 api_server 실행: http://{args.host}:{args.port} (fixture: {server_origin(fixture)})")
+    uvicorn.run(api_server.app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
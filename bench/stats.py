@@ -0,0 +1,62 @@
+import math
+import os
+from typing import Dict, List
+
+
+def percentile(values: List[float], q: float) -> float:
+    """nearest-rank 방식의 백분위수를 반환합니다."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def summarize_latencies(latencies_ms: List[float], wall_seconds: float = 0.0) -> Dict[str, float]:
+    """지연 시간(밀리초) 목록을 요약합니다. wall_seconds가 주어지면 처리량도 계산합니다."""
+    summary = {
+        "count": len(latencies_ms),
+        "mean_ms": round(sum(latencies_ms) / len(latencies_ms), 3) if latencies_ms else 0.0,
+        "p50_ms": round(percentile(latencies_ms, 0.50), 3),
+        "p95_ms": round(percentile(latencies_ms, 0.95), 3),
+        "p99_ms": round(percentile(latencies_ms, 0.99), 3),
+        "max_ms": round(max(latencies_ms), 3) if latencies_ms else 0.0,
+    }
+    if wall_seconds > 0:
+        summary["throughput_rps"] = round(len(latencies_ms) / wall_seconds, 2)
+    return summary
+
+
+def read_rss_kb(pid: int) -> int:
+    """/proc/<pid>/status에서 RSS(kB)를 읽습니다. 읽을 수 없으면 0을 반환합니다."""
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def read_tree_rss_kb(pid: int) -> int:
+    """pid와 모든 자손 프로세스(MCP 서버 등)의 RSS 합계(kB)를 반환합니다."""
+    total = 0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        total += read_rss_kb(current)
+        try:
+            for tid in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{tid}/children", "r") as f:
+                    stack.extend(int(child) for child in f.read().split())
+        except OSError:
+            pass
+    return total
+
+
+def print_table(rows: List[Dict], columns: List[str]):
+    """dict 목록을 고정 폭 표로 출력합니다."""
+    widths = {col: max([len(col)] + [len(str(row.get(col, ""))) for row in rows]) for col in columns}
+    print("  ".join(col.ljust(widths[col]) for col in columns))
+    for row in rows:
+        print("  ".join(str(row.get(col, "")).ljust(widths[col]) for col in columns))
@@ -0,0 +1,224 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from resource_watcher import RESOURCE_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+logger = logging.getLogger("card_details")
+
+# 카드 상세 정보 저장 파일. 비워두면 메모리에만 보관합니다.
+CARD_DETAILS_PATH = os.getenv("CARD_DETAILS_PATH", str(RESOURCE_DIR / "card_details.json"))
+
+# 상세 정보가 바뀌지 않아도 요청 횟수만 바뀐 경우 파일에 반영하는 최소 간격 (초)
+CARD_DETAILS_FLUSH_INTERVAL = float(os.getenv("CARD_DETAILS_FLUSH_INTERVAL", "60"))
+
+
+def content_hash(card_name: str, benefits: List[Dict[str, str]]) -> str:
+    """추출한 카드 이름과 혜택 목록(bene_area)의 내용 해시를 반환합니다. 키 순서와 공백에 영향을 받지 않습니다."""
+    canonical = json.dumps([card_name, benefits], ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def body_hash(body: bytes) -> str:
+    """응답 본문의 해시를 반환합니다. 본문이 같으면 다시 파싱하지 않습니다."""
+    return hashlib.sha256(body).hexdigest()
+
+
+@dataclass
+class CardDetail:
+    """한 번 가져온 카드 상세 정보입니다.
+
+    validators에는 경로별 조건부 요청 정보(etag, last_modified)와 응답 본문 해시(body_hash)가 들어 있고,
+    not_modified가 True이면 원본이 바뀌지 않아 저장된 내용을 그대로 사용한 것입니다.
+    """
+    card_name: str
+    benefits: List[Dict[str, str]]
+    path: str
+    validators: Dict[str, Optional[str]] = field(default_factory=dict)
+    not_modified: bool = False
+
+
+class CardDetailStore:
+    """url별 카드 상세 정보와 내용 해시를 보관하고 파일에 저장합니다.
+
+    update()는 내용 해시가 바뀐 카드만 교체하며, 바뀐 카드가 있을 때만 파일을 다시 씁니다.
+    카드별 get_card_info 요청 횟수(requests)도 함께 저장하여 서버 시작 시 자주 찾는 카드를 미리 불러오는 데 씁니다.
+    항목 형식: {"card_name", "benefits", "hash", "validators": {경로: {...}}, "updated_at", "checked_at", "requests"}
+
+    같은 파일을 여러 프로세스(API 서버의 stdio MCP 서버, main.py 등)가 함께 쓸 수 있으므로, 저장할 때는 잠금 파일(.lock)을
+    잡고 파일을 다시 읽어 병합한 뒤 교체합니다. url별로 checked_at이 더 최근인 항목을 남기고, 요청 횟수는 마지막 저장 이후
+    이 프로세스에서 늘어난 만큼만 더합니다. fcntl이 없는 환경(Windows)에서는 잠금 없이 병합하므로 한 프로세스만 쓰도록 하세요.
+    """
+
+    def __init__(self, path: Optional[str] = CARD_DETAILS_PATH):
+        self.path = Path(path) if path else None
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.request_counts: Dict[str, int] = {}
+        # 파일에 이미 반영된 url별 요청 횟수 (다음 저장 때는 이보다 늘어난 만큼만 더합니다)
+        self._synced_counts: Dict[str, int] = {}
+        self._dirty = False
+        self._persisted_at = time.monotonic()
+        # 저장은 한 번에 하나씩, 직렬화한 순서대로 진행합니다.
+        self._persist_lock = asyncio.Lock()
+
+    def _read_file(self) -> Dict[str, Dict[str, Any]]:
+        with open(self.path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        if not isinstance(entries, dict):
+            raise ValueError("카드 상세 정보 파일은 url -> 항목 객체여야 합니다.")
+        return entries
+
+    def load(self):
+        """저장 파일이 있으면 읽어옵니다. 파일이 없거나 올바르지 않으면 빈 상태로 시작합니다."""
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            entries = self._read_file()
+        except (OSError, ValueError) as e:
+            logger.error("❌ 카드 상세 정보 파일 로드 실패 - 빈 상태로 시작: %s", e)
+            return
+        self.entries = entries
+        self.request_counts = {url: entry["requests"] for url, entry in entries.items() if entry.get("requests")}
+        self._synced_counts = dict(self.request_counts)
+        logger.info("✅ 카드 상세 정보 %d건 로드", len(entries))
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        return self.entries.get(url)
+
+    def validators(self, url: str, path: str) -> Dict[str, Optional[str]]:
+        """url의 경로별 조건부 요청 정보를 반환합니다. 저장된 내용이 없으면 빈 dict입니다."""
+        entry = self.entries.get(url)
+        if entry is None:
+            return {}
+        return entry.get("validators", {}).get(path, {})
+
+    def record_request(self, url: str):
+        """url의 요청 횟수를 하나 늘립니다. 다음 저장 때 파일에 반영됩니다."""
+        self.request_counts[url] = self.request_counts.get(url, 0) + 1
+        self._dirty = True
+
+    def top_requested(self, limit: int) -> List[str]:
+        """요청 횟수가 많은 순서로 최대 limit개의 url을 반환합니다."""
+        return sorted(self.request_counts, key=self.request_counts.get, reverse=True)[:limit]
+
+    def update(self, url: str, detail: CardDetail) -> bool:
+        """가져온 상세 정보를 반영하고, 내용이 바뀌었는지(새 카드 포함) 반환합니다."""
+        now = time.time()
+        entry = self.entries.get(url)
+        if entry is not None:
+            validators = entry.setdefault("validators", {})
+            if detail.validators and validators.get(detail.path) != detail.validators:
+                validators[detail.path] = detail.validators
+                self._dirty = True
+            entry["checked_at"] = now
+            if detail.not_modified or entry.get("hash") == content_hash(detail.card_name, detail.benefits):
+                return False
+
+        validators = dict(entry.get("validators", {})) if entry is not None else {}
+        if detail.validators:
+            validators[detail.path] = detail.validators
+        self.entries[url] = {
+            "card_name": detail.card_name,
+            "benefits": detail.benefits,
+            "hash": content_hash(detail.card_name, detail.benefits),
+            "validators": validators,
+            "updated_at": now,
+            "checked_at": now,
+        }
+        self._dirty = True
+        return True
+
+    @contextmanager
+    def _file_lock(self):
+        """다른 프로세스의 저장과 겹치지 않도록 잠금 파일을 잡습니다. (fcntl이 없으면 잠그지 않습니다.)"""
+        if fcntl is None:
+            yield
+            return
+        with open(self.path.with_suffix(self.path.suffix + ".lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _merge_and_write(self, text: str, added: Dict[str, int]) -> Dict[str, Dict[str, Any]]:
+        """파일의 현재 내용과 병합해 저장하고, 저장한 항목을 반환합니다."""
+        entries = json.loads(text)
+        with self._file_lock():
+            try:
+                disk_entries = self._read_file() if self.path.exists() else {}
+            except ValueError as e:
+                logger.error("❌ 카드 상세 정보 파일이 올바르지 않아 덮어씁니다: %s", e)
+                disk_entries = {}
+            for url, disk_entry in disk_entries.items():
+                entry = entries.get(url)
+                if entry is None or disk_entry.get("checked_at", 0) > entry.get("checked_at", 0):
+                    entries[url] = disk_entry
+            for url, entry in entries.items():
+                requests = disk_entries.get(url, {}).get("requests", 0) + added.get(url, 0)
+                if requests:
+                    entry["requests"] = requests
+                else:
+                    entry.pop("requests", None)
+
+            # 같은 디렉터리의 고유한 임시 파일에 쓴 뒤 교체하여, 읽는 쪽이 쓰다 만 파일을 보지 않도록 합니다.
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=self.path.parent, prefix=self.path.name + ".", suffix=".tmp", delete=False
+            ) as f:
+                f.write(json.dumps(entries, ensure_ascii=False))
+            try:
+                os.replace(f.name, self.path)
+            except OSError:
+                os.unlink(f.name)
+                raise
+        return entries
+
+    def _adopt(self, entries: Dict[str, Dict[str, Any]], counts: Dict[str, int]):
+        """저장한 항목 중 다른 프로세스가 더 최근에 가져온 항목과 합산된 요청 횟수를 메모리에 반영합니다."""
+        for url, entry in entries.items():
+            current = self.entries.get(url)
+            if current is None or entry.get("checked_at", 0) > current.get("checked_at", 0):
+                self.entries[url] = entry
+            requests = entry.get("requests", 0)
+            if requests:
+                # 저장하는 동안 늘어난 요청 횟수는 유지합니다.
+                self.request_counts[url] = requests + self.request_counts.get(url, 0) - counts.get(url, 0)
+                self._synced_counts[url] = requests
+
+    async def persist(self) -> bool:
+        """바뀐 내용이 있으면 파일에 저장하고 True를 반환합니다. 파일 병합과 쓰기는 별도 스레드에서 수행합니다."""
+        if self.path is None or not self._dirty:
+            return False
+        self._dirty = False
+        self._persisted_at = time.monotonic()
+        async with self._persist_lock:
+            counts = dict(self.request_counts)
+            added = {url: count - self._synced_counts.get(url, 0) for url, count in counts.items()}
+            text = json.dumps(self.entries, ensure_ascii=False)
+            try:
+                entries = await asyncio.to_thread(self._merge_and_write, text, added)
+            except OSError as e:
+                self._dirty = True
+                logger.error("❌ 카드 상세 정보 저장 실패: %s", e)
+                return False
+            self._adopt(entries, counts)
+        return True
+
+    async def persist_if_due(self, interval: float = CARD_DETAILS_FLUSH_INTERVAL) -> bool:
+        """마지막 저장 후 interval초가 지났을 때만 persist()합니다. (요청 횟수처럼 자주 바뀌는 값용)"""
+        if time.monotonic() - self._persisted_at < interval:
+            return False
+        return await self.persist()
@@ -1,43 +1,115 @@
 import json
 import os
 import sys
+import time
+from collections import deque
 from pathlib import Path
 from fastmcp.server import FastMCP, Context
+from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional
-from playwright.async_api import async_playwright
-from bs4 import BeautifulSoup
+from resource_watcher import RESOURCE_DIR, ResourceWatcher
+from metrics import MetricsRegistry
+from mcp_logging import ToolLogger
+from card_scraper import CardScraper, CARD_REFRESH_CONCURRENCY, PATH_STALE
+from card_details import CardDetailStore
+
+
+# 로거와 메트릭 저장소
+log = ToolLogger("card_mcp")
+METRICS = MetricsRegistry("card_mcp")
+
+# 카드 상세 정보 저장소와 수집기 (HTTP fast path + Playwright fallback)
+DETAIL_STORE = CardDetailStore()
+DETAIL_STORE.load()
+SCRAPER = CardScraper(METRICS, log, DETAIL_STORE)
+
+# 최근 스크래핑 경로와 단계별 시간 기록 (요청별 트레이스에서 조회)
+RECENT_SCRAPES = deque(maxlen=int(os.getenv("CARD_RECENT_SCRAPES", "128")))
+
+# 리소스 파일 경로
+SHCARD_PATH = RESOURCE_DIR / "shcard.json"
+BENEFIT_KEYWORDS_PATH = RESOURCE_DIR / "benefit_keywords.json"
+
+
+@dataclass(frozen=True)
+class CardIndex:
+    """한 세대의 카드 데이터와 파생 인덱스 스냅샷입니다. 만들어진 뒤에는 수정하지 않습니다."""
+    cards: List[dict] = field(default_factory=list)
+    benefit_keywords: List[str] = field(default_factory=list)
+    keyword_set: frozenset = frozenset()
+    cards_with_name: List[dict] = field(default_factory=list)
+    cards_by_url: Dict[str, dict] = field(default_factory=dict)
+    cards_by_keyword: Dict[str, List[dict]] = field(default_factory=dict)
+    # (최소 연회비, 카드) 목록. 연회비 정보가 없으면 None
+    min_fees: List[tuple] = field(default_factory=list)
+
+
+def build_card_index(paths: List[Path]) -> CardIndex:
+    """shcard.json, benefit_keywords.json을 읽어 검증하고 파생 인덱스까지 빌드합니다."""
+    shcard_path, keywords_path = paths
+    with open(shcard_path, "r", encoding="utf-8") as f:
+        cards = json.load(f)
+    with open(keywords_path, "r", encoding="utf-8") as f:
+        benefit_keywords = json.load(f)
+
+    if not isinstance(cards, list):
+        raise ValueError("shcard.json은 카드 목록(list)이어야 합니다.")
+    if not isinstance(benefit_keywords, list) or not all(isinstance(k, str) for k in benefit_keywords):
+        raise ValueError("benefit_keywords.json은 문자열 목록이어야 합니다.")
+
+    cards_with_name = []
+    cards_by_url = {}
+    cards_by_keyword = {keyword: [] for keyword in benefit_keywords}
+    min_fees = []
+    for i, card in enumerate(cards):
+        if not isinstance(card, dict) or not isinstance(card.get("url"), str):
+            raise ValueError(f"{i}번째 카드에 url이 없습니다.")
+
+        cards_with_name.append({
+            "name": card.get("name", ""),
+            "url": card.get("url", ""),
+            "idx": card.get("idx", 0)
+        })
+        cards_by_url.setdefault(card["url"], card)
+
+        for keyword in card.get("benefit_keywords", []):
+            if keyword in cards_by_keyword:
+                cards_by_keyword[keyword].append(card)
+
+        annual_fees = card.get("annual_fees", [])
+        try:
+            min_fee = min(int(fee) for fee in annual_fees) if annual_fees else None
+        except (TypeError, ValueError):
+            raise ValueError(f"'{card.get('name')}' 카드의 연회비 형식이 올바르지 않습니다: {annual_fees}")
+        min_fees.append((min_fee, card))
 
+    return CardIndex(
+        cards=cards,
+        benefit_keywords=benefit_keywords,
+        keyword_set=frozenset(benefit_keywords),
+        cards_with_name=cards_with_name,
+        cards_by_url=cards_by_url,
+        cards_by_keyword=cards_by_keyword,
+        min_fees=min_fees,
+    )
+
+
+CARD_WATCHER = ResourceWatcher("card", [SHCARD_PATH, BENEFIT_KEYWORDS_PATH], build_card_index)
 
-# 전역 데이터 저장
-CARD_DATA = []
-BENEFIT_KEYWORDS = {}
 
 def load_card_data():
     """카드 데이터와 키워드 데이터를 로드합니다."""
-    global CARD_DATA, BENEFIT_KEYWORDS
-    print("🔄 [MCP] 카드 데이터 로딩 시작...")
-    
-    # shcard.json 로드
-    shcard_path = Path(__file__).parent / "resource" / "shcard.json"
-    try:
-        with open(shcard_path, "r", encoding="utf-8") as f:
-            CARD_DATA = json.load(f)
-        print(f"✅ [MCP] 카드 데이터 로드 완료: {len(CARD_DATA)}개 카드")
-    except Exception as e:
-        print(f"❌ [MCP] 카드 데이터 로드 실패: {e}")
-        CARD_DATA = []
-    
-    # benefit_keywords.json 로드
-    keywords_path = Path(__file__).parent / "resource" / "benefit_keywords.json"
-    try:
-        with open(keywords_path, "r", encoding="utf-8") as f:
-            BENEFIT_KEYWORDS = json.load(f)
-        print(f"✅ [MCP] 키워드 데이터 로드 완료: {len(BENEFIT_KEYWORDS)}개 키워드")
-    except Exception as e:
-        print(f"❌ [MCP] 키워드 데이터 로드 실패: {e}")
-        BENEFIT_KEYWORDS = []
+    log.logger.info("🔄 카드 데이터 로딩 시작...")
+    if not CARD_WATCHER.reload() and CARD_WATCHER.snapshot is None:
+        CARD_WATCHER.snapshot = CardIndex()
+
+    index = current_index()
+    log.logger.info("🎉 데이터 로딩 완료 - %d개 카드, %d개 키워드", len(index.cards), len(index.benefit_keywords))
 
-    print(f"🎉 [MCP] 데이터 로딩 완료 - {len(CARD_DATA)}개 카드, {len(BENEFIT_KEYWORDS)}개 키워드")
+
+def current_index() -> CardIndex:
+    """현재 세대의 카드 인덱스를 반환합니다. 도구는 호출 시작 시 한 번만 읽어 사용합니다."""
+    return CARD_WATCHER.snapshot
 
 
 load_card_data()
@@ -75,27 +147,21 @@ card_mcp = FastMCP(
     '''
 )
 
+log.install(card_mcp)
+
 @card_mcp.tool(
         name="get_all_cards_with_name",
         description="모든 카드의 이름을(name, url, idx)를 가져옵니다.",
         tags=["search"],
 )
+@METRICS.timed("get_all_cards_with_name")
 async def get_all_cards_with_name(ctx: Context) -> List[dict]:
     """모든 카드의 기본 정보(name, url, idx)를 가져옵니다."""
-    print(f"🔍 [MCP] get_all_cards_with_name 함수 진입")
-    await ctx.debug(f"🔍 get_all_cards_with_name 함수 진입")
+    await log.debug(ctx, "🔍 get_all_cards_with_name 함수 진입")
     
-    cards_info = []
-    for card in CARD_DATA:
-        cards_info.append({
-            "name": card.get("name", ""),
-            "url": card.get("url", ""),
-            "idx": card.get("idx", 0)
-        })
-    print(cards_info)
+    cards_info = current_index().cards_with_name
 
-    print(f"✅ [MCP] get_all_cards_with_name 완료 - {len(cards_info)}개 카드 반환")
-    await ctx.debug(f"✅ get_all_cards_with_name 완료 - {len(cards_info)}개 카드 반환")
+    await log.debug(ctx, "✅ get_all_cards_with_name 완료 - %d개 카드 반환", len(cards_info))
     return cards_info
 
 @card_mcp.tool(
@@ -103,14 +169,13 @@ async def get_all_cards_with_name(ctx: Context) -> List[dict]:
         description="사용 가능한 모든 혜택 키워드 목록을 반환합니다.",
         tags=["search"],
 )
+@METRICS.timed("get_available_benefit_keysords")
 async def get_available_benefit_keysords(ctx: Context) -> List[str]:
     """사용 가능한 모든 혜택 키워드 목록을 반환합니다."""
-    print(f"🔍 [MCP] get_available_benefit_keysords 함수 진입")
-    await ctx.debug(f"🔍 get_available_benefit_keysords 함수 진입")
+    await log.debug(ctx, "🔍 get_available_benefit_keysords 함수 진입")
     
-    result = BENEFIT_KEYWORDS
-    print(f"✅ [MCP] get_available_benefit_keysords 완료 - {len(result) if isinstance(result, list) else 'dict'} 반환")
-    await ctx.debug(f"✅ get_available_benefit_keysords 완료 - {len(result) if isinstance(result, list) else 'dict'} 반환")
+    result = current_index().benefit_keywords
+    await log.debug(ctx, "✅ get_available_benefit_keysords 완료 - %d개 반환", len(result))
     return result
 
 @card_mcp.tool(
@@ -118,26 +183,21 @@ async def get_available_benefit_keysords(ctx: Context) -> List[str]:
         description="혜택 키워드로 카드를 검색합니다. get_available_benefit_keysords를 이용하여 사용 가능한 혜택 키워드를 얻어오세요.",
         tags=["search"],
 )
+@METRICS.timed("search_cards_by_benefit")
 async def search_cards_by_benefit(benefit_keyword: str, ctx: Context) -> Dict[str, Any]:
     """혜택 키워드로 카드를 검색합니다.
     
     Args:
         benefit_keyword: get_available_benefit_keysords로 얻어온 혜택 키워드 중 하나를 입력하세요.
     """
-    print(f"🔍 [MCP] search_cards_by_benefit 함수 진입 - keyword: '{benefit_keyword}'")
-    await ctx.debug(f"🔍 search_cards_by_benefit 함수 진입 - keyword: '{benefit_keyword}'")
+    await log.debug(ctx, "🔍 search_cards_by_benefit 함수 진입 - keyword: '%s'", benefit_keyword)
 
-    if benefit_keyword not in BENEFIT_KEYWORDS:
-        print(f"❌ [MCP] search_cards_by_benefit - 키워드 '{benefit_keyword}'가 존재하지 않음")
-        await ctx.debug(f"❌ search_cards_by_benefit - 키워드 '{benefit_keyword}'가 존재하지 않음")
+    index = current_index()
+    if benefit_keyword not in index.keyword_set:
+        await log.warning(ctx, "❌ search_cards_by_benefit - 키워드 '%s'가 존재하지 않음", benefit_keyword)
         return {"error": "혜택 키워드가 존재하지 않습니다."}
     
-    matching_cards = []
-    
-    for card in CARD_DATA:
-        if benefit_keyword in card.get('benefit_keywords', []):
-            matching_cards.append(card)
-            continue
+    matching_cards = index.cards_by_keyword.get(benefit_keyword, [])
 
     result = {
         "query": benefit_keyword,
@@ -145,8 +205,7 @@ async def search_cards_by_benefit(benefit_keyword: str, ctx: Context) -> Dict[st
         "cards": matching_cards
     }
     
-    print(f"✅ [MCP] search_cards_by_benefit 완료 - '{benefit_keyword}'로 {len(matching_cards)}개 카드 검색됨")
-    await ctx.debug(f"✅ search_cards_by_benefit 완료 - '{benefit_keyword}'로 {len(matching_cards)}개 카드 검색됨")
+    await log.debug(ctx, "✅ search_cards_by_benefit 완료 - '%s'로 %d개 카드 검색됨", benefit_keyword, len(matching_cards))
     return result
 
 
@@ -155,23 +214,16 @@ async def search_cards_by_benefit(benefit_keyword: str, ctx: Context) -> Dict[st
         description="연회비 기준으로 카드를 검색합니다. 연회비는 최대 연회비를 기준으로 검색합니다.",
         tags=["search"],
 )
+@METRICS.timed("search_cards_by_annual_fee")
 async def search_cards_by_annual_fee(max_fee:int, ctx: Context):
-    print(f"🔍 [MCP] search_cards_by_annual_fee 함수 진입 - max_fee: {max_fee}")
-    await ctx.debug(f"🔍 search_cards_by_annual_fee 함수 진입 - max_fee: {max_fee}")
+    await log.debug(ctx, "🔍 search_cards_by_annual_fee 함수 진입 - max_fee: %s", max_fee)
     
-    filtered_cards = []
-
-    for card in CARD_DATA:
-        annual_fees = card.get('annual_fees', [])
-        if annual_fees:
-            min_fee = min([int(fee) for fee in annual_fees])
-            if min_fee <= max_fee:
-                filtered_cards.append(card)
-        else:
-            filtered_cards.append(card)
-
-    print(f"✅ [MCP] search_cards_by_annual_fee 완료 - {max_fee}원 이하 {len(filtered_cards)}개 카드 검색됨")
-    await ctx.debug(f"✅ search_cards_by_annual_fee 완료 - {max_fee}원 이하 {len(filtered_cards)}개 카드 검색됨")
+    filtered_cards = [
+        card for min_fee, card in current_index().min_fees
+        if min_fee is None or min_fee <= max_fee
+    ]
+
+    await log.debug(ctx, "✅ search_cards_by_annual_fee 완료 - %s원 이하 %d개 카드 검색됨", max_fee, len(filtered_cards))
     return filtered_cards
 
 
@@ -180,7 +232,8 @@ async def search_cards_by_annual_fee(max_fee:int, ctx: Context):
     description="특정 카드의 상세 정보(이름, 혜택)을 URL을 통해 가져옵니다. **중요: 카드 데이터서에 제공되는 url만 사용해야합니다. 임의의 웹사이트 URL은 사용할 수 없습니다.",
     tags=["search"],
 )
-async def get_card_info(url: str, ctx: Context) -> dict:
+@METRICS.timed("get_card_info")
+async def get_card_info(url: str, ctx: Context, deadline_ms: Optional[int] = None) -> dict:
     '''
     카드 상세 정보를 가져오는 도구입니다.
     'CardList' 리소스에서 가져온 URL을 사용하여 카드 상세 정보를 조회할 수 있습니다.
@@ -188,108 +241,123 @@ async def get_card_info(url: str, ctx: Context) -> dict:
 
     parameters:
     - url: 카드 상세 정보 url
+    - deadline_ms: 호출한 요청에 남은 처리 시간(밀리초). API 서버가 채워 넣습니다.
 
     return: json
     {
         "card_name": 카드 이름,
         "url": 카드 상세 정보 url,
-        "benefits": 카드 혜택 정보
+        "benefits": 카드 혜택 정보,
+        "stale": 요청이 실패하여 이전에 가져온 정보를 반환한 경우 true
     }
     '''
-    print(f"🔍 [MCP] get_card_info 함수 진입 - url: {url}")
-    await ctx.debug(f"🔍 get_card_info 함수 진입 - url: {url}")
-    
-    # URL 유효성 검사: CARD_DATA에 해당 URL이 있는지 확인
-    if CARD_DATA is None:
-        print(f"❌ [MCP] get_card_info - 카드 데이터가 로드되지 않음")
-        await ctx.debug(f"❌ get_card_info - 카드 데이터가 로드되지 않음")
-        return {"error": "카드 데이터가 로드되지 않았습니다."}
+    await log.debug(ctx, "🔍 get_card_info 함수 진입 - url: %s", url)
     
-    # CARD_DATA가 리스트인지 확인
-    if not isinstance(CARD_DATA, list):
-        print(f"❌ [MCP] get_card_info - 카드 데이터 형식이 올바르지 않음")
-        await ctx.debug(f"❌ get_card_info - 카드 데이터 형식이 올바르지 않음")
-        return {"error": "카드 데이터 형식이 올바르지 않습니다."}
-    
-    # 입력된 URL이 CARD_DATA에 있는지 확인
-    url_exists = False
-    card_name = ""
-    selected_card = None
-    for card in CARD_DATA:
-        if isinstance(card, dict) and card.get("url") == url:
-            url_exists = True
-            card_name = card.get("name", "알 수 없는 카드")
-            selected_card = card
-            break
-    
-    if not url_exists:
-        print(f"❌ [MCP] get_card_info - URL '{url}'이 카드 데이터에 존재하지 않음")
-        await ctx.debug(f"❌ get_card_info - URL '{url}'이 카드 데이터에 존재하지 않음")
+    # URL 유효성 검사: 카드 데이터에 해당 URL이 있는지 확인
+    selected_card = current_index().cards_by_url.get(url)
+    if selected_card is None:
+        await log.warning(ctx, "❌ get_card_info - URL '%s'이 카드 데이터에 존재하지 않음", url)
         return {"error": f"입력된 URL '{url}'이 카드 데이터에 존재하지 않습니다. 유효한 카드 URL을 입력해주세요."}
     
-    async with async_playwright() as p:
-        browser = await p.chromium.launch()
-        page = await browser.new_page()
+    scrape = {"url": url, "started_at": time.time(), "path": None, "phases": {}}
+    RECENT_SCRAPES.append(scrape)
+    # 서버 시작 시 자주 찾는 카드부터 미리 불러올 수 있도록 요청 횟수를 기록합니다.
+    DETAIL_STORE.record_request(url)
+
+    deadline_at = time.monotonic() + deadline_ms / 1000 if deadline_ms is not None else None
+
+    try:
+        card_name, benefits_data, scrape["path"] = await SCRAPER.fetch(url, ctx, scrape["phases"], deadline_at)
+
+        # 최종 JSON 결과 생성
+        result = {**selected_card, "benefits": benefits_data}
+        if scrape["path"] == PATH_STALE:
+            result["stale"] = True
+        #result = {"card_name": card_name, "url": url, "benefits": benefits_data}
+        
+        await log.debug(ctx, "✅ get_card_info 완료 - '%s' 카드 정보 수집 완료 (%s)", card_name, scrape["path"])
+        await DETAIL_STORE.persist_if_due()
+        
+    except Exception as e:
+        await log.error(ctx, "❌ get_card_info - 데이터 처리 중 오류: %s", e)
+        result = {"error": f"데이터 처리 중 오류 발생: {e}"}
+
+    return result
+
+@card_mcp.tool(
+    name="get_recent_scrapes",
+    description="since(epoch 초) 이후에 시작된 get_card_info 스크래핑의 단계별 시간을 반환합니다.",
+    tags=["admin"],
+)
+async def get_recent_scrapes(since: float = 0) -> List[Dict[str, Any]]:
+    """since 이후에 시작된 스크래핑의 단계별 시간(밀리초) 목록을 반환합니다."""
+    return [scrape for scrape in list(RECENT_SCRAPES) if scrape["started_at"] >= since]
+
+@card_mcp.tool(
+    name="refresh_card_details",
+    description="카드 상세 정보를 다시 가져와 바뀐 카드만 갱신하고, 변경/변경 없음/실패 건수와 처리 시간을 반환합니다.",
+    tags=["admin"],
+)
+async def refresh_card_details(ctx: Context, concurrency: int = CARD_REFRESH_CONCURRENCY, limit: int = 0) -> Dict[str, Any]:
+    """전체(limit > 0이면 앞에서부터 limit개) 카드의 상세 정보를 갱신하고 결과 보고서를 반환합니다."""
+    urls = list(current_index().cards_by_url)
+    if limit > 0:
+        urls = urls[:limit]
+    return await SCRAPER.refresh(urls, concurrency, ctx)
+
+@card_mcp.tool(
+    name="warm_card_details",
+    description="자주 요청된 카드의 상세 정보를 미리 불러오고 Playwright 브라우저를 미리 띄웁니다. (서버 시작 직후 warmup용)",
+    tags=["admin"],
+)
+async def warm_card_details(ctx: Context, top_n: int = 10, browser: bool = True, concurrency: int = CARD_REFRESH_CONCURRENCY) -> Dict[str, Any]:
+    """요청 횟수가 많은 카드 top_n개(기록이 부족하면 카드 목록 순서로 채움)의 상세 정보를 불러오고 결과를 반환합니다."""
+    report: Dict[str, Any] = {}
+    if browser:
+        started = time.perf_counter()
         try:
-            await page.goto(url, wait_until="domcontentloaded", timeout=60000)
-            await page.wait_for_selector("div.bene_area", timeout=30000)
-            await page.wait_for_selector("strong.card", timeout=30000)
-            
-            benefit_buttons_selector = "div.bene_area > dl > dt"
-            buttons = await page.query_selector_all(benefit_buttons_selector)
-            
-
-            print(f"총 {len(buttons)}개의 혜택을 클릭하여 펼칩니다...")
-            for button in buttons:
-                await button.click()
-                await page.wait_for_timeout(500)
-
-            # 4. 모든 정보가 표시된 최종 HTML 컨텐츠 추출
-            html_content = await page.content()
-
-            # 5. BeautifulSoup을 이용해 데이터 정제 및 구조화
-            soup = BeautifulSoup(html_content, "html.parser")
-
-            card_name_element = soup.select_one("strong.card")
-            card_name = card_name_element.text.strip() if card_name_element else "알 수 없는 카드"
-
-            benefits_data = []
-            # # 열려있는 혜택 섹션(li.on)을 순회
-            benefit_sections = soup.select("div.bene_area > dl")
-
-            print(f"총 {len(benefit_sections)}개의 리스트를 가져 왔습니다.")
-            for dl in benefit_sections:
-                category = dl.select_one("p.txt1").text.strip()
-                summary = dl.select_one("i").text.strip()
-                
-
-                # 상세 정보(<dd>)는 있을 수도, 없을 수도 있습니다.
-                details_tag = dl.select_one("dd")
-                details = details_tag.get_text(separator="\n", strip=True) if details_tag else "상세 설명 없음"
-                
-                benefits_data.append({
-                    'category': category,
-                    'summary': summary,
-                    'details': details
-                })
-            
-
-            # 6. 최종 JSON 결과 생성
-            result = {**selected_card, "benefits": benefits_data}
-            #result = {"card_name": card_name, "url": url, "benefits": benefits_data}
-            
-            print(f"✅ [MCP] get_card_info 완료 - '{card_name}' 카드 정보 수집 완료")
-            await ctx.debug(f"✅ get_card_info 완료 - '{card_name}' 카드 정보 수집 완료")
-            
+            await SCRAPER.browser()
+            report["browser_ms"] = round((time.perf_counter() - started) * 1000, 3)
         except Exception as e:
-            print(f"❌ [MCP] get_card_info - 데이터 처리 중 오류: {e}")
-            await ctx.debug(f"❌ get_card_info - 데이터 처리 중 오류: {e}")
-            result = {"error": f"데이터 처리 중 오류 발생: {e}"}
+            # 브라우저가 없어도 HTTP fast path와 저장된 결과로 응답할 수 있으므로 warmup을 계속합니다.
+            await log.warning(ctx, "⚠️ Playwright 브라우저 warmup 실패: %s", e)
+            report["browser_error"] = str(e)
+
+    cards_by_url = current_index().cards_by_url
+    urls = [url for url in DETAIL_STORE.top_requested(top_n) if url in cards_by_url]
+    for url in cards_by_url:
+        if len(urls) >= top_n:
+            break
+        if url not in urls:
+            urls.append(url)
+    report["details"] = await SCRAPER.preload(urls, concurrency, ctx)
+    await DETAIL_STORE.persist()
+    await log.info(ctx, "🔥 카드 상세 정보 warmup 완료 - %d개 (%.0fms)", len(urls), report["details"]["duration_ms"])
+    return report
 
-        finally:
-            await browser.close()
+@card_mcp.tool(
+    name="get_card_data_generation",
+    description="현재 적용된 카드 리소스 데이터의 세대 번호와 빌드 시간을 반환합니다.",
+    tags=["admin"],
+)
+async def get_card_data_generation() -> Dict[str, Any]:
+    """현재 적용된 카드 리소스 데이터의 세대 정보를 반환합니다."""
+    index = current_index()
+    return {
+        **CARD_WATCHER.status(),
+        "card_count": len(index.cards),
+        "keyword_count": len(index.benefit_keywords),
+    }
 
-        return result
+@card_mcp.tool(
+    name="get_card_metrics",
+    description="카드 MCP 서버의 도구별 지연 시간, 응답 크기, 스크래핑 단계별 시간 메트릭을 Prometheus 텍스트 형식으로 반환합니다.",
+    tags=["admin"],
+)
+async def get_card_metrics() -> str:
+    """카드 MCP 서버의 메트릭을 Prometheus 텍스트 형식으로 반환합니다."""
+    return METRICS.render()
 
 if __name__ == "__main__":
+    CARD_WATCHER.start()
     card_mcp.run(transport="stdio")
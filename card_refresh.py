@@ -0,0 +1,42 @@
+import argparse
+import asyncio
+import json
+
+
+async def refresh(concurrency: int, limit: int):
+    # card_mcp를 불러오면 카드 데이터와 저장된 상세 정보(CARD_DETAILS_PATH)를 읽어옵니다.
+    from card_mcp import SCRAPER, current_index
+
+    urls = list(current_index().cards_by_url)
+    if limit > 0:
+        urls = urls[:limit]
+    try:
+        return await SCRAPER.refresh(urls, concurrency)
+    finally:
+        await SCRAPER.aclose()
+
+
+def main():
+    from card_scraper import CARD_REFRESH_CONCURRENCY
+
+    parser = argparse.ArgumentParser(description="카드 상세 정보를 다시 가져와 바뀐 카드만 저장 파일에 반영합니다.")
+    parser.add_argument("--concurrency", type=int, default=CARD_REFRESH_CONCURRENCY, help="동시에 요청할 카드 수")
+    parser.add_argument("--limit", type=int, default=0, help="앞에서부터 갱신할 카드 수 (0이면 전체)")
+    parser.add_argument("--json", help="결과 보고서를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    report = asyncio.run(refresh(args.concurrency, args.limit))
+
+    print(f"🔄 카드 {report['total']}개 갱신 - {report['duration_ms']:.0f}ms (저장 {'함' if report['saved'] else '안 함'})")
+    print(f"  변경: {report['changed']}  변경 없음: {report['unchanged']} (304/동일 본문 {report['not_modified']})  실패: {report['failed']}")
+    print(f"  카드별 p50 {report['card_ms']['p50']}ms  p95 {report['card_ms']['p95']}ms  max {report['card_ms']['max']}ms")
+    for url, error in report["failed_urls"].items():
+        print(f"  ❌ {url}: {error}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,515 @@
+import asyncio
+import importlib.util
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+import httpx
+from bs4 import BeautifulSoup
+from fastmcp.server import Context
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError, async_playwright
+from metrics import MetricsRegistry
+from mcp_logging import ToolLogger
+from card_details import CardDetail, CardDetailStore, body_hash
+from resilience import CircuitBreaker, CircuitBreakerOpen, LatencyTracker, clamp_timeout_ms, hedged, remaining_seconds
+
+
+# 카드 상세 페이지를 실제로 요청할 origin (벤치마크에서는 로컬 fixture 서버로 교체)
+CARD_DETAIL_ORIGIN = os.getenv("CARD_DETAIL_ORIGIN", "").rstrip("/")
+
+# 상세 페이지의 혜택 데이터를 내려주는 JSON API ({card_id} 자리에 카드 번호). 비워두면 사용하지 않습니다.
+CARD_DETAIL_API_URL = os.getenv("CARD_DETAIL_API_URL", "https://api.card-gorilla.com:8080/v1/cards/{card_id}")
+
+# HTTP fast path 설정
+CARD_HTTP_FAST_PATH = os.getenv("CARD_HTTP_FAST_PATH", "1") == "1"
+CARD_HTTP_TIMEOUT = float(os.getenv("CARD_HTTP_TIMEOUT", "10"))
+CARD_HTTP_MAX_CONNECTIONS = int(os.getenv("CARD_HTTP_MAX_CONNECTIONS", "10"))
+# HTTP/2는 h2 패키지가 설치된 경우에만 사용합니다.
+CARD_HTTP2 = os.getenv("CARD_HTTP2", "1") == "1" and importlib.util.find_spec("h2") is not None
+
+# get_card_info 한 번에 쓸 수 있는 최대 시간 (초). 요청에 남은 예산(deadline)이 더 짧으면 그 값을 따릅니다.
+CARD_INFO_TIMEOUT = float(os.getenv("CARD_INFO_TIMEOUT", "30"))
+
+# Playwright 타임아웃 (밀리초). 모두 남은 예산을 넘지 않도록 잘라서 사용합니다.
+CARD_PAGE_TIMEOUT_MS = float(os.getenv("CARD_PAGE_TIMEOUT_MS", "60000"))
+CARD_SELECTOR_TIMEOUT_MS = float(os.getenv("CARD_SELECTOR_TIMEOUT_MS", "30000"))
+CARD_EXPAND_WAIT_MS = float(os.getenv("CARD_EXPAND_WAIT_MS", "500"))
+
+# 헤지 요청: 첫 시도가 지연 시간 p95(표본이 부족하면 CARD_HEDGE_AFTER_MS)를 넘기면 두 번째 시도를 함께 보냅니다.
+CARD_HEDGE = os.getenv("CARD_HEDGE", "1") == "1"
+CARD_HEDGE_AFTER_MS = float(os.getenv("CARD_HEDGE_AFTER_MS", "5000"))
+CARD_HEDGE_MIN_SAMPLES = int(os.getenv("CARD_HEDGE_MIN_SAMPLES", "20"))
+
+# 서킷 브레이커: 연속 실패 횟수와 차단 유지 시간 (초)
+CARD_BREAKER_FAILURES = int(os.getenv("CARD_BREAKER_FAILURES", "5"))
+CARD_BREAKER_RESET = float(os.getenv("CARD_BREAKER_RESET", "30"))
+
+# 상세 정보 캐시: 이 시간(초) 동안은 다시 요청하지 않고, 요청이 실패하면 STALE_TTL까지 이전 결과를 제공합니다.
+CARD_DETAIL_TTL = float(os.getenv("CARD_DETAIL_TTL", "300"))
+CARD_DETAIL_STALE_TTL = float(os.getenv("CARD_DETAIL_STALE_TTL", "86400"))
+
+# 전체 카드 상세 정보 갱신 시 동시에 요청할 카드 수
+CARD_REFRESH_CONCURRENCY = int(os.getenv("CARD_REFRESH_CONCURRENCY", "8"))
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+
+CARD_ID_PATTERN = re.compile(r"/card/detail/(\d+)")
+
+# 카드 상세 정보를 가져온 경로
+PATH_HTTP_HTML = "http_html"
+PATH_HTTP_JSON = "http_json"
+PATH_PLAYWRIGHT = "playwright"
+PATH_CACHE = "cache"
+PATH_STALE = "stale"
+
+
+class InvalidCardDetail(Exception):
+    """가져온 상세 정보가 검증을 통과하지 못했습니다."""
+
+
+def detail_fetch_url(url: str) -> str:
+    """카드 데이터의 상세 페이지 url을 실제로 요청할 url로 바꿉니다."""
+    if not CARD_DETAIL_ORIGIN:
+        return url
+    parts = urlsplit(url)
+    return CARD_DETAIL_ORIGIN + parts.path + (f"?{parts.query}" if parts.query else "")
+
+
+def conditional_headers(validators: Dict[str, Optional[str]]) -> Dict[str, str]:
+    """저장된 ETag/Last-Modified로 조건부 요청 헤더를 만듭니다."""
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+
+def validate_benefits(benefits: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """혜택 목록이 비어 있거나 카테고리/요약이 없으면 InvalidCardDetail을 발생시킵니다."""
+    if not benefits:
+        raise InvalidCardDetail("혜택 정보가 없습니다.")
+    for benefit in benefits:
+        if not benefit.get("category") or not benefit.get("summary"):
+            raise InvalidCardDetail(f"혜택 항목 형식이 올바르지 않습니다: {benefit}")
+    return benefits
+
+
+def parse_benefit_html(html_content: str) -> Tuple[str, List[Dict[str, str]]]:
+    """상세 페이지 HTML에서 카드 이름과 혜택 목록(div.bene_area)을 추출합니다."""
+    soup = BeautifulSoup(html_content, "html.parser")
+
+    card_name_element = soup.select_one("strong.card")
+    card_name = card_name_element.text.strip() if card_name_element else "알 수 없는 카드"
+
+    benefits_data = []
+    # # 열려있는 혜택 섹션(li.on)을 순회
+    benefit_sections = soup.select("div.bene_area > dl")
+    for dl in benefit_sections:
+        category_tag = dl.select_one("p.txt1")
+        summary_tag = dl.select_one("i")
+        if category_tag is None or summary_tag is None:
+            raise InvalidCardDetail("혜택 항목에 카테고리 또는 요약이 없습니다.")
+
+        # 상세 정보(<dd>)는 있을 수도, 없을 수도 있습니다.
+        details_tag = dl.select_one("dd")
+        details = details_tag.get_text(separator="\n", strip=True) if details_tag else "상세 설명 없음"
+
+        benefits_data.append({
+            'category': category_tag.text.strip(),
+            'summary': summary_tag.text.strip(),
+            'details': details
+        })
+
+    return card_name, benefits_data
+
+
+def parse_benefit_json(data: Dict[str, Any]) -> Tuple[str, List[Dict[str, str]]]:
+    """상세 정보 JSON API 응답에서 카드 이름과 혜택 목록(key_benefit)을 추출합니다."""
+    if not isinstance(data, dict) or not isinstance(data.get("key_benefit"), list):
+        raise InvalidCardDetail("JSON 응답에 key_benefit 목록이 없습니다.")
+
+    benefits_data = []
+    for item in data["key_benefit"]:
+        if not isinstance(item, dict):
+            continue
+        category = (item.get("cate") or {}).get("name") if isinstance(item.get("cate"), dict) else None
+        info = item.get("info") or ""
+        details = BeautifulSoup(info, "html.parser").get_text(separator="\n", strip=True) if info else ""
+        benefits_data.append({
+            'category': (category or item.get("title") or "").strip(),
+            'summary': (item.get("comment") or item.get("title") or "").strip(),
+            'details': details or "상세 설명 없음"
+        })
+
+    return (data.get("name") or "알 수 없는 카드").strip(), benefits_data
+
+
+class CardScraper:
+    """카드 상세 페이지의 혜택 정보를 가져옵니다.
+
+    먼저 커넥션 풀을 공유하는 HTTP 클라이언트로 상세 페이지 HTML 또는 JSON API를 직접 요청하고(fast path),
+    결과가 검증을 통과하지 못한 경우에만 Playwright로 페이지를 렌더링합니다.
+    어느 경로가 응답했는지는 card_detail_path_total 메트릭에 기록됩니다.
+
+    모든 요청은 남은 예산(deadline) 안에서만 수행합니다. 첫 시도가 느리면 두 번째 시도를 함께 보내고(hedge),
+    연속으로 실패하면 서킷 브레이커를 열어 잠시 요청을 보내지 않습니다. 요청하지 못했거나 실패한 경우에는
+    저장소에 남아 있는 이전 결과(stale)를 대신 반환합니다.
+
+    가져온 결과는 CardDetailStore에 내용 해시와 함께 저장합니다. 다음 요청에는 ETag/Last-Modified로
+    조건부 요청을 보내고, 304 응답이거나 응답 본문이 같으면 다시 파싱하지 않습니다.
+    """
+
+    def __init__(self, metrics: MetricsRegistry, log: ToolLogger, store: Optional[CardDetailStore] = None):
+        self.metrics = metrics
+        self.log = log
+        self.store = store if store is not None else CardDetailStore(None)
+        self._client: Optional[httpx.AsyncClient] = None
+        # Playwright fallback이 함께 쓰는 Chromium (처음 필요할 때 띄우고 요청마다 페이지만 새로 엽니다)
+        self._playwright = None
+        self._browser = None
+        self._browser_lock = asyncio.Lock()
+        # 마지막으로 성공한 fast path를 먼저 시도합니다.
+        self._fast_paths = [PATH_HTTP_HTML, PATH_HTTP_JSON]
+        self.breaker = CircuitBreaker(CARD_BREAKER_FAILURES, CARD_BREAKER_RESET)
+        self.latency = LatencyTracker()
+        self.path_counter = metrics.counter("card_detail_path_total", "카드 상세 정보를 가져온 경로별 횟수", ("path",))
+        self.fast_path_failures = metrics.counter(
+            "card_detail_fast_path_failures_total", "HTTP fast path 실패 횟수", ("path", "reason")
+        )
+        self.hedge_counter = metrics.counter("card_detail_hedges_total", "헤지 요청(두 번째 시도) 횟수")
+        self.breaker_rejections = metrics.counter(
+            "card_detail_breaker_rejections_total", "서킷 브레이커가 열려 있어 요청하지 않은 횟수"
+        )
+        self.change_counter = metrics.counter(
+            "card_detail_changes_total", "가져온 상세 정보의 변경 여부별 횟수", ("result",)
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=CARD_HTTP2,
+                timeout=CARD_HTTP_TIMEOUT,
+                follow_redirects=True,
+                headers={"User-Agent": USER_AGENT, "Accept-Language": "ko-KR,ko;q=0.9"},
+                limits=httpx.Limits(
+                    max_connections=CARD_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=CARD_HTTP_MAX_CONNECTIONS,
+                    keepalive_expiry=30.0,
+                ),
+            )
+        return self._client
+
+    async def browser(self):
+        """공유 Chromium을 반환합니다. 아직 없거나 연결이 끊겼으면 새로 띄웁니다."""
+        async with self._browser_lock:
+            if self._browser is None or not self._browser.is_connected():
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch()
+            return self._browser
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    def _http_timeout(self, deadline_at: Optional[float]) -> float:
+        return clamp_timeout_ms(CARD_HTTP_TIMEOUT * 1000, deadline_at) / 1000
+
+    async def _http_get(self, url: str, fetch_url: str, path: str, accept: str, phases: Dict[str, float], deadline_at: Optional[float]):
+        """조건부 요청을 보내고 (응답, 새 validators, 변경 없음 여부)를 반환합니다."""
+        validators = self.store.validators(url, path)
+        with self.metrics.phase("http", "fetch", phases):
+            response = await self.client.get(
+                fetch_url,
+                headers={"Accept": accept, **conditional_headers(validators)},
+                timeout=self._http_timeout(deadline_at),
+            )
+            if response.status_code == 304:
+                return response, validators, True
+            response.raise_for_status()
+
+        new_validators = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "body_hash": body_hash(response.content),
+        }
+        return response, new_validators, bool(validators) and validators.get("body_hash") == new_validators["body_hash"]
+
+    def _unchanged(self, url: str, path: str, validators: Dict[str, Optional[str]]) -> CardDetail:
+        entry = self.store.get(url)
+        return CardDetail(entry["card_name"], entry["benefits"], path, validators, not_modified=True)
+
+    async def _fetch_html(self, url: str, fetch_url: str, phases: Dict[str, float], deadline_at: Optional[float]) -> CardDetail:
+        response, validators, not_modified = await self._http_get(url, fetch_url, PATH_HTTP_HTML, "text/html", phases, deadline_at)
+        if not_modified:
+            return self._unchanged(url, PATH_HTTP_HTML, validators)
+        with self.metrics.phase("http", "parse", phases):
+            card_name, benefits = parse_benefit_html(response.text)
+        return CardDetail(card_name, benefits, PATH_HTTP_HTML, validators)
+
+    async def _fetch_json(self, url: str, fetch_url: str, phases: Dict[str, float], deadline_at: Optional[float]) -> CardDetail:
+        match = CARD_ID_PATTERN.search(fetch_url)
+        if not CARD_DETAIL_API_URL or match is None:
+            raise InvalidCardDetail("JSON API를 사용할 수 없습니다.")
+        api_url = CARD_DETAIL_API_URL.format(card_id=match.group(1))
+        response, validators, not_modified = await self._http_get(url, api_url, PATH_HTTP_JSON, "application/json", phases, deadline_at)
+        if not_modified:
+            return self._unchanged(url, PATH_HTTP_JSON, validators)
+        with self.metrics.phase("http", "parse", phases):
+            card_name, benefits = parse_benefit_json(response.json())
+        return CardDetail(card_name, benefits, PATH_HTTP_JSON, validators)
+
+    async def fetch_fast(self, url: str, ctx: Optional[Context], phases: Dict[str, float], deadline_at: Optional[float] = None) -> Optional[CardDetail]:
+        """HTTP fast path로 상세 정보를 가져옵니다. 모두 실패하면 None을 반환합니다."""
+        fetch_url = detail_fetch_url(url)
+        for path in list(self._fast_paths):
+            fetch = self._fetch_html if path == PATH_HTTP_HTML else self._fetch_json
+            try:
+                detail = await fetch(url, fetch_url, phases, deadline_at)
+                validate_benefits(detail.benefits)
+            except InvalidCardDetail as e:
+                self.fast_path_failures.inc(path=path, reason="invalid")
+                await self.log.debug(ctx, "⚠️ %s fast path 검증 실패: %s", path, e)
+                continue
+            except (httpx.HTTPError, ValueError) as e:
+                self.fast_path_failures.inc(path=path, reason="http")
+                await self.log.debug(ctx, "⚠️ %s fast path 요청 실패: %s", path, e)
+                continue
+
+            if self._fast_paths[0] != path:
+                self._fast_paths.remove(path)
+                self._fast_paths.insert(0, path)
+            return detail
+        return None
+
+    async def fetch_playwright(self, url: str, ctx: Optional[Context], phases: Dict[str, float], deadline_at: Optional[float] = None) -> CardDetail:
+        """Chromium으로 페이지를 렌더링하고 혜택을 펼친 뒤 상세 정보를 가져옵니다.
+
+        브라우저는 공유하고 요청마다 새 페이지(컨텍스트)만 엽니다. launch 단계는 브라우저가 이미 떠 있으면 페이지 생성 시간입니다.
+        """
+        with self.metrics.phase("scrape", "launch", phases):
+            browser = await self.browser()
+            page = await browser.new_page()
+        try:
+            with self.metrics.phase("scrape", "goto", phases):
+                await page.goto(
+                    detail_fetch_url(url), wait_until="domcontentloaded",
+                    timeout=clamp_timeout_ms(CARD_PAGE_TIMEOUT_MS, deadline_at),
+                )
+                await page.wait_for_selector("div.bene_area", timeout=clamp_timeout_ms(CARD_SELECTOR_TIMEOUT_MS, deadline_at))
+                await page.wait_for_selector("strong.card", timeout=clamp_timeout_ms(CARD_SELECTOR_TIMEOUT_MS, deadline_at))
+
+            with self.metrics.phase("scrape", "expand", phases):
+                benefit_buttons_selector = "div.bene_area > dl > dt"
+                buttons = await page.query_selector_all(benefit_buttons_selector)
+
+                await self.log.debug(ctx, "총 %d개의 혜택을 클릭하여 펼칩니다...", len(buttons))
+                for button in buttons:
+                    await button.click(timeout=clamp_timeout_ms(CARD_SELECTOR_TIMEOUT_MS, deadline_at))
+                    await page.wait_for_timeout(clamp_timeout_ms(CARD_EXPAND_WAIT_MS, deadline_at))
+
+                # 모든 정보가 표시된 최종 HTML 컨텐츠 추출
+                html_content = await page.content()
+
+            # BeautifulSoup을 이용해 데이터 정제 및 구조화
+            with self.metrics.phase("scrape", "parse", phases):
+                card_name, benefits = parse_benefit_html(html_content)
+            await self.log.debug(ctx, "총 %d개의 리스트를 가져 왔습니다.", len(benefits))
+        finally:
+            # new_page()가 만든 컨텍스트까지 함께 닫습니다.
+            await page.context.close()
+
+        return CardDetail(card_name, benefits, PATH_PLAYWRIGHT)
+
+    async def _attempt(self, url: str, ctx: Optional[Context], phases: Dict[str, float], deadline_at: float) -> CardDetail:
+        """fast path -> Playwright 순으로 한 번 시도합니다. 성공한 시도의 단계별 시간만 phases에 남깁니다."""
+        attempt_phases: Dict[str, float] = {}
+        started = time.perf_counter()
+        detail = await self.fetch_fast(url, ctx, attempt_phases, deadline_at) if CARD_HTTP_FAST_PATH else None
+        if detail is None:
+            detail = await self.fetch_playwright(url, ctx, attempt_phases, deadline_at)
+        self.latency.observe(time.perf_counter() - started)
+        phases.update(attempt_phases)
+        return detail
+
+    def hedge_delay(self) -> float:
+        """두 번째 시도를 보내기 전에 기다릴 시간(초). 표본이 충분하면 최근 지연 시간의 p95를 사용합니다."""
+        if len(self.latency) >= CARD_HEDGE_MIN_SAMPLES:
+            return self.latency.percentile(0.95)
+        return CARD_HEDGE_AFTER_MS / 1000
+
+    async def load_detail(self, url: str, ctx: Optional[Context], phases: Dict[str, float], deadline_at: Optional[float] = None) -> Tuple[CardDetail, bool]:
+        """캐시를 거치지 않고 상세 정보를 가져와 저장소에 반영하고 (상세 정보, 내용 변경 여부)를 반환합니다.
+
+        남은 예산이 없거나 서킷 브레이커가 열려 있으면 요청하지 않고 예외를 발생시킵니다.
+        """
+        budget = min(CARD_INFO_TIMEOUT, remaining_seconds(deadline_at))
+        if budget <= 0:
+            raise TimeoutError("요청 처리 시간이 이미 초과되었습니다.")
+        if not self.breaker.allow():
+            self.breaker_rejections.inc()
+            raise CircuitBreakerOpen("카드사 사이트 응답이 불안정하여 잠시 상세 정보 요청을 중단했습니다.")
+
+        # 호출한 쪽의 마감 때문에 CARD_INFO_TIMEOUT보다 짧아진 예산이면, 타임아웃은 사이트 장애의 근거가 되지 않습니다.
+        truncated = budget < CARD_INFO_TIMEOUT
+        deadline_at = time.monotonic() + budget
+        try:
+            if CARD_HEDGE:
+                detail = await hedged(
+                    lambda: self._attempt(url, ctx, phases, deadline_at),
+                    self.hedge_delay(),
+                    budget,
+                    on_hedge=self.hedge_counter.inc,
+                )
+            else:
+                detail = await asyncio.wait_for(self._attempt(url, ctx, phases, deadline_at), budget)
+        except asyncio.TimeoutError as e:
+            self._record_breaker_failure(e, truncated)
+            raise TimeoutError(f"카드 상세 정보를 {budget:.1f}초 안에 가져오지 못했습니다.")
+        except Exception as e:
+            self._record_breaker_failure(e, truncated)
+            raise
+
+        self.breaker.record_success()
+        changed = self.store.update(url, detail)
+        self.change_counter.inc(result="not_modified" if detail.not_modified else "changed" if changed else "unchanged")
+        self.path_counter.inc(path=detail.path)
+        return detail, changed
+
+    def _record_breaker_failure(self, error: Exception, truncated: bool):
+        """카드사 사이트 장애로 볼 수 있는 오류만 서킷 브레이커에 실패로 기록합니다.
+
+        전체 CARD_INFO_TIMEOUT 안에 응답하지 못한 경우와 전송 오류, 5xx 응답만 실패로 셉니다. 호출한 쪽의 마감으로
+        잘린 타임아웃, 카드별 파싱/검증 오류(InvalidCardDetail), 4xx 응답은 세지 않습니다.
+        """
+        if isinstance(error, (asyncio.TimeoutError, PlaywrightTimeoutError)):
+            site_failure = not truncated
+        elif isinstance(error, InvalidCardDetail):
+            site_failure = False
+        elif isinstance(error, httpx.HTTPStatusError):
+            site_failure = error.response.status_code >= 500
+        else:
+            site_failure = True
+        if site_failure:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_inconclusive()
+
+    async def _stale_or_raise(self, url: str, ctx: Optional[Context], error: Exception):
+        """저장소에 STALE_TTL 이내의 결과가 있으면 반환하고, 없으면 error를 발생시킵니다."""
+        entry = self.store.get(url)
+        if entry is None or time.time() - entry["checked_at"] > CARD_DETAIL_STALE_TTL:
+            raise error
+        await self.log.warning(ctx, "⚠️ 카드 상세 정보 요청 실패 - %.0f초 전 결과를 대신 반환: %s", time.time() - entry["checked_at"], error)
+        self.path_counter.inc(path=PATH_STALE)
+        return entry["card_name"], entry["benefits"], PATH_STALE
+
+    async def fetch(self, url: str, ctx: Optional[Context], phases: Dict[str, float], deadline_at: Optional[float] = None):
+        """카드 상세 정보를 (카드 이름, 혜택 목록, 경로)로 반환합니다.
+
+        deadline_at은 time.monotonic() 기준 마감 시각입니다. 경로가 PATH_STALE이면 저장소에 남아 있던 이전 결과입니다.
+        """
+        entry = self.store.get(url)
+        fresh = entry is not None and time.time() - entry["checked_at"] < CARD_DETAIL_TTL
+        self.metrics.record_cache("card_detail", fresh)
+        if fresh:
+            self.path_counter.inc(path=PATH_CACHE)
+            return entry["card_name"], entry["benefits"], PATH_CACHE
+
+        try:
+            detail, changed = await self.load_detail(url, ctx, phases, deadline_at)
+        except Exception as e:
+            return await self._stale_or_raise(url, ctx, e)
+
+        if changed:
+            await self.store.persist()
+        return detail.card_name, detail.benefits, detail.path
+
+    async def preload(self, urls: List[str], concurrency: int = CARD_REFRESH_CONCURRENCY, ctx: Optional[Context] = None) -> Dict[str, Any]:
+        """여러 카드의 상세 정보를 fetch()와 같은 방식(신선한 저장 결과가 있으면 그대로 사용)으로 미리 불러옵니다."""
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        paths: Dict[str, int] = {}
+        failed: Dict[str, str] = {}
+
+        async def preload_one(url: str):
+            async with semaphore:
+                try:
+                    _, _, path = await self.fetch(url, ctx, {})
+                except Exception as e:
+                    failed[url] = str(e) or type(e).__name__
+                else:
+                    paths[path] = paths.get(path, 0) + 1
+
+        await asyncio.gather(*(preload_one(url) for url in urls))
+        return {
+            "total": len(urls),
+            "paths": paths,
+            "failed": len(failed),
+            "failed_urls": failed,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+
+    async def refresh(self, urls: List[str], concurrency: int = CARD_REFRESH_CONCURRENCY, ctx: Optional[Context] = None) -> Dict[str, Any]:
+        """여러 카드의 상세 정보를 다시 가져와 바뀐 카드만 저장소에 반영하고 결과 보고서를 반환합니다."""
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        changed: List[str] = []
+        unchanged: List[str] = []
+        failed: Dict[str, str] = {}
+        not_modified = 0
+        latencies = LatencyTracker(window=max(1, len(urls)))
+
+        async def refresh_one(url: str):
+            nonlocal not_modified
+            async with semaphore:
+                item_started = time.perf_counter()
+                try:
+                    detail, is_changed = await self.load_detail(url, ctx, {})
+                except Exception as e:
+                    failed[url] = str(e) or type(e).__name__
+                else:
+                    (changed if is_changed else unchanged).append(url)
+                    not_modified += detail.not_modified
+                latencies.observe((time.perf_counter() - item_started) * 1000)
+
+        await asyncio.gather(*(refresh_one(url) for url in urls))
+
+        fetch_ms = (time.perf_counter() - started) * 1000
+        save_started = time.perf_counter()
+        saved = await self.store.persist()
+        save_ms = (time.perf_counter() - save_started) * 1000
+
+        report = {
+            "total": len(urls),
+            "changed": len(changed),
+            "unchanged": len(unchanged),
+            "not_modified": not_modified,
+            "failed": len(failed),
+            "duration_ms": round(fetch_ms + save_ms, 3),
+            "fetch_ms": round(fetch_ms, 3),
+            "save_ms": round(save_ms, 3),
+            "saved": saved,
+            "card_ms": {
+                "p50": round(latencies.percentile(0.5) or 0.0, 3),
+                "p95": round(latencies.percentile(0.95) or 0.0, 3),
+                "max": round(latencies.percentile(1.0) or 0.0, 3),
+            },
+            "changed_urls": changed,
+            "failed_urls": failed,
+        }
+        await self.log.info(
+            ctx, "🔄 카드 상세 정보 갱신 완료 - 변경 %d, 변경 없음 %d, 실패 %d (%.0fms)",
+            len(changed), len(unchanged), len(failed), report["duration_ms"],
+        )
+        return report
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import os
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from resilience import LatencyTracker
+from tool_wrappers import ToolCallMemo
+
+
+# 일괄 질문 기본 동시 실행 수와 최대값
+CHAT_BATCH_CONCURRENCY = int(os.getenv("CHAT_BATCH_CONCURRENCY", "4"))
+CHAT_BATCH_MAX_CONCURRENCY = int(os.getenv("CHAT_BATCH_MAX_CONCURRENCY", "16"))
+
+# 한 번에 받을 수 있는 최대 질문 수
+CHAT_BATCH_MAX_ITEMS = int(os.getenv("CHAT_BATCH_MAX_ITEMS", "1000"))
+
+
+def parse_batch_items(text: str) -> List[Dict[str, Any]]:
+    """JSONL 텍스트를 질문 목록으로 변환합니다.
+
+    한 줄은 {"id", "message", "session_id", "deadline_ms"} 객체이거나 질문 문자열입니다. ("question" 키도 허용)
+    JSON이 아닌 줄은 그 줄 전체를 질문으로 보고, 질문이 없는 줄은 error가 채워진 항목이 됩니다.
+    """
+    items = []
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    for index, line in enumerate(lines):
+        try:
+            value = json.loads(line)
+        except json.JSONDecodeError:
+            value = line
+        if isinstance(value, str):
+            value = {"message": value}
+
+        item = {"index": index, "id": index}
+        if not isinstance(value, dict):
+            item["error"] = "각 줄은 JSON 객체 또는 질문 문자열이어야 합니다."
+            items.append(item)
+            continue
+        message = value.get("message", value.get("question"))
+        item["id"] = value.get("id", index)
+        if not isinstance(message, str) or not message.strip():
+            item["error"] = "message가 없습니다."
+        else:
+            item["message"] = message
+            item["session_id"] = value.get("session_id")
+            item["deadline_ms"] = value.get("deadline_ms")
+        items.append(item)
+    return items
+
+
+def batch_answerer(
+    answer_turn: Callable[[str, Optional[str], Optional[int], Optional[ToolCallMemo]], Awaitable[str]],
+    memoize: bool = True,
+) -> Callable[[Dict[str, Any]], Awaitable[str]]:
+    """run_batch()에 넘길, 질문 하나를 처리하는 answer 함수를 만듭니다.
+
+    answer_turn(message, session_id, deadline_ms, tool_memo)이 실제로 에이전트를 실행해 답변을 반환합니다.
+    - memoize이면 배치 전체가 도구 호출 메모를 공유하고 질문마다 그 아래에 요청 메모를 만듭니다.
+      여러 질문이 같은 도구를 같은 인자로 부르면 MCP 서버는 한 번만 호출합니다.
+    - 같은 session_id의 질문은 입력 순서대로 하나씩 처리합니다.
+    """
+    batch_memo = ToolCallMemo() if memoize else None
+    session_locks: Dict[str, asyncio.Lock] = {}
+
+    async def answer(item: Dict[str, Any]) -> str:
+        session_id = item["session_id"]
+        tool_memo = ToolCallMemo(batch_memo) if batch_memo is not None else None
+        if session_id is None:
+            return await answer_turn(item["message"], None, item["deadline_ms"], tool_memo)
+        async with session_locks.setdefault(session_id, asyncio.Lock()):
+            return await answer_turn(item["message"], session_id, item["deadline_ms"], tool_memo)
+
+    return answer
+
+
+async def run_batch(
+    items: List[Dict[str, Any]],
+    answer: Callable[[Dict[str, Any]], Awaitable[str]],
+    concurrency: int = CHAT_BATCH_CONCURRENCY,
+) -> AsyncIterator[Dict[str, Any]]:
+    """질문을 최대 concurrency개씩 동시에 answer()로 처리하고, 끝나는 순서대로 결과를 내보냅니다.
+
+    결과: {"type": "result", "index", "id", "status": "ok"|"error", "response"|"error", "latency_ms"}
+    마지막에는 전체 처리 시간과 처리량, 질문별 지연 시간 분포를 담은 {"type": "summary", ...}를 내보냅니다.
+    소비하는 쪽이 중간에 멈추면(연결 종료 등) 남은 질문은 취소합니다.
+    """
+    started = time.perf_counter()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    latencies = LatencyTracker(window=max(1, len(items)))
+
+    async def answer_one(item: Dict[str, Any]) -> Dict[str, Any]:
+        result = {"type": "result", "index": item["index"], "id": item["id"]}
+        if "error" in item:
+            result.update(status="error", error=item["error"], latency_ms=0.0)
+            return result
+        async with semaphore:
+            item_started = time.perf_counter()
+            try:
+                response = await answer(item)
+            except Exception as e:
+                # HTTPException이면 detail을, 아니면 예외 메시지를 사용합니다.
+                result.update(status="error", error=getattr(e, "detail", None) or str(e) or type(e).__name__)
+            else:
+                result.update(status="ok", response=response)
+            latency_ms = (time.perf_counter() - item_started) * 1000
+        latencies.observe(latency_ms)
+        result["latency_ms"] = round(latency_ms, 3)
+        return result
+
+    tasks = [asyncio.ensure_future(answer_one(item)) for item in items]
+    succeeded = 0
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            result = await next_result
+            succeeded += result["status"] == "ok"
+            yield result
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    duration_ms = (time.perf_counter() - started) * 1000
+    yield {
+        "type": "summary",
+        "total": len(items),
+        "succeeded": succeeded,
+        "failed": len(items) - succeeded,
+        "concurrency": max(1, concurrency),
+        "duration_ms": round(duration_ms, 3),
+        "throughput_per_sec": round(len(items) / (duration_ms / 1000), 3) if duration_ms > 0 else 0.0,
+        "latency_ms": {
+            "p50": round(latencies.percentile(0.5) or 0.0, 3),
+            "p95": round(latencies.percentile(0.95) or 0.0, 3),
+            "max": round(latencies.percentile(1.0) or 0.0, 3),
+        },
+    }
+
+
+def to_jsonl(record: Dict[str, Any]) -> str:
+    return json.dumps(record, ensure_ascii=False) + "\n"
@@ -4,31 +4,39 @@ import sys
 from pathlib import Path
 from fastmcp.server import FastMCP, Context
 from typing import List, Dict, Any, Optional
+from resource_watcher import RESOURCE_DIR, ResourceWatcher
+from metrics import MetricsRegistry
+from mcp_logging import ToolLogger
+
+# 로거와 메트릭 저장소
+log = ToolLogger("event_mcp")
+METRICS = MetricsRegistry("event_mcp")
+
+# 리소스 파일 경로
+EVENT_PATH = RESOURCE_DIR / "event.json"
+
+
+def build_event_data(paths: List[Path]) -> List[Dict[str, Any]]:
+    """event.json을 읽어 검증합니다."""
+    event_path, = paths
+    with open(event_path, "r", encoding="utf-8") as f:
+        events = json.load(f)
+
+    if not isinstance(events, list) or not all(isinstance(event, dict) for event in events):
+        raise ValueError("event.json은 이벤트(dict) 목록이어야 합니다.")
+    return events
+
+
+EVENT_WATCHER = ResourceWatcher("event", [EVENT_PATH], build_event_data)
 
-# 전역 데이터 저장
-EVENT_DATA = []
 
 def load_event_data():
     """이벤트 데이터를 로드합니다."""
-    global EVENT_DATA
-    print("🔄 [MCP] 이벤트 데이터 로딩 시작...")
-    
-    event_path = Path(__file__).parent / "resource" / "event.json"
-    print(f"📁 이벤트 파일 경로: {event_path}")
-    
-    try:
-        with open(event_path, "r", encoding="utf-8") as f:
-            EVENT_DATA = json.load(f)
-        print(f"✅ [MCP] 이벤트 데이터 로드 완료: {len(EVENT_DATA)}개 이벤트")
-    except FileNotFoundError:
-        print(f"❌ [MCP] 이벤트 파일을 찾을 수 없습니다: {event_path}")
-        EVENT_DATA = []
-    except json.JSONDecodeError as e:
-        print(f"❌ [MCP] JSON 파싱 오류: {e}")
-        EVENT_DATA = []
-    except Exception as e:
-        print(f"❌ [MCP] 이벤트 데이터 로드 실패: {e}")
-        EVENT_DATA = []
+    log.logger.info("🔄 이벤트 데이터 로딩 시작... (%s)", EVENT_PATH)
+    if not EVENT_WATCHER.reload() and EVENT_WATCHER.snapshot is None:
+        EVENT_WATCHER.snapshot = []
+
+    log.logger.info("✅ 이벤트 데이터 로드 완료: %d개 이벤트", len(EVENT_WATCHER.snapshot))
 
 # 데이터 로드
 load_event_data()
@@ -48,18 +56,39 @@ event_mcp = FastMCP(
     """
 )
 
+log.install(event_mcp)
+
 @event_mcp.tool(
     name="get_event_data",
     description="진행중인 이벤트 데이터를 가져옵니다.",
     tags=["search"],
 )
+@METRICS.timed("get_event_data")
 async def get_event_data(ctx: Context) -> List[Dict[str, Any]]:
     """신한카드 이벤트 데이터를 가져옵니다."""
-    print(f"🔍 [MCP] get_event_data 함수 진입")
-    await ctx.debug(f"🔍 get_event_data 함수 진입")
+    await log.debug(ctx, "🔍 get_event_data 함수 진입")
     
-    return EVENT_DATA
+    return EVENT_WATCHER.snapshot
+
+@event_mcp.tool(
+    name="get_event_data_generation",
+    description="현재 적용된 이벤트 리소스 데이터의 세대 번호와 빌드 시간을 반환합니다.",
+    tags=["admin"],
+)
+async def get_event_data_generation() -> Dict[str, Any]:
+    """현재 적용된 이벤트 리소스 데이터의 세대 정보를 반환합니다."""
+    return {**EVENT_WATCHER.status(), "event_count": len(EVENT_WATCHER.snapshot)}
+
+@event_mcp.tool(
+    name="get_event_metrics",
+    description="이벤트 MCP 서버의 도구별 지연 시간, 응답 크기 메트릭을 Prometheus 텍스트 형식으로 반환합니다.",
+    tags=["admin"],
+)
+async def get_event_metrics() -> str:
+    """이벤트 MCP 서버의 메트릭을 Prometheus 텍스트 형식으로 반환합니다."""
+    return METRICS.render()
 
 if __name__ == "__main__":
-    print("🚀 [DEBUG] MCP 서버 시작 - EventSearchServer")
+    log.logger.info("🚀 MCP 서버 시작 - EventSearchServer")
+    EVENT_WATCHER.start()
     event_mcp.run(transport="stdio")
\ No newline at end of file
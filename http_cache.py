@@ -0,0 +1,149 @@
+import gzip
+import hashlib
+import os
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# 응답의 Cache-Control max-age (초). 기본 0이면 매번 ETag로 재검증합니다.
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "0"))
+
+# 이 크기(바이트) 이상인 응답만 압축합니다.
+HTTP_COMPRESS_MIN_BYTES = int(os.getenv("HTTP_COMPRESS_MIN_BYTES", "1024"))
+
+# 보관할 최대 응답 수 (엔드포인트, 쿼리 키별로 하나)
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256"))
+
+# 서버가 지원하는 압축 방식 (선호 순서)
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def make_etag(version: str, key: str) -> str:
+    """데이터 세대(version)와 쿼리 키로 강한 ETag를 만듭니다. 세대가 바뀌어야만 값이 바뀝니다."""
+    return '"' + hashlib.sha256(f"{version}|{key}".encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def variant_etag(etag: str, encoding: Optional[str]) -> str:
+    """압축 방식별 표현의 ETag입니다. (같은 세대라도 gzip/br 본문은 서로 다른 강한 ETag를 갖습니다.)"""
+    return etag if encoding is None else f'{etag[:-1]}-{encoding}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 헤더에 etag(또는 그 압축 표현)가 들어 있는지 확인합니다. (약한 비교)"""
+    if not if_none_match:
+        return False
+    candidates = {variant_etag(etag, encoding) for encoding in (None, "gzip", "br")}
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag in candidates:
+            return True
+    return False
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Accept-Encoding 헤더에서 서버가 지원하는 압축 방식 중 선호 순서가 가장 앞선 것을 고릅니다."""
+    if not accept_encoding:
+        return None
+    accepted = set()
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip().lower())
+    for encoding in SUPPORTED_ENCODINGS:
+        if encoding in accepted or "*" in accepted:
+            return encoding
+    return None
+
+
+def cache_headers(etag: str, encoding: Optional[str] = None) -> Dict[str, str]:
+    return {
+        "ETag": variant_etag(etag, encoding),
+        "Cache-Control": f"public, max-age={HTTP_CACHE_MAX_AGE}",
+        "Vary": "Accept-Encoding",
+    }
+
+
+def not_modified_response(etag: str, encoding: Optional[str]) -> Response:
+    """본문 없는 304 응답입니다. encoding은 같은 요청에 200으로 보냈을 표현의 압축 방식이어야 합니다."""
+    return Response(status_code=304, headers=cache_headers(etag, encoding))
+
+
+@dataclass
+class CachedResponse:
+    """직렬화한 JSON 본문과, 크기가 충분히 크면 미리 압축한 본문을 보관합니다."""
+    etag: str
+    body: bytes
+    encoded: Dict[str, bytes] = field(default_factory=dict)
+
+    def encoding(self, accept_encoding: Optional[str]) -> Optional[str]:
+        """이 응답을 보낼 압축 방식입니다. 작아서 압축하지 않은 본문은 항상 None입니다."""
+        return choose_encoding(accept_encoding) if self.encoded else None
+
+    def not_modified(self, accept_encoding: Optional[str]) -> Response:
+        """to_response()와 같은 표현의 ETag를 담은 304 응답입니다."""
+        return not_modified_response(self.etag, self.encoding(accept_encoding))
+
+    def to_response(self, accept_encoding: Optional[str]) -> Response:
+        encoding = self.encoding(accept_encoding)
+        headers = cache_headers(self.etag, encoding)
+        if encoding is None:
+            return Response(content=self.body, media_type="application/json", headers=headers)
+        headers["Content-Encoding"] = encoding
+        return Response(content=self.encoded[encoding], media_type="application/json", headers=headers)
+
+
+def compress(body: bytes) -> Dict[str, bytes]:
+    """본문을 지원하는 방식으로 압축합니다. HTTP_COMPRESS_MIN_BYTES보다 작으면 압축하지 않습니다."""
+    if len(body) < HTTP_COMPRESS_MIN_BYTES:
+        return {}
+    encoded = {"gzip": gzip.compress(body, compresslevel=6)}
+    if brotli is not None:
+        encoded["br"] = brotli.compress(body, quality=6)
+    return encoded
+
+
+class ResponseCache:
+    """(엔드포인트, 쿼리 키)별 응답을 ETag와 함께 보관합니다.
+
+    같은 키라도 데이터 세대가 바뀌면 ETag가 달라지므로 get()이 None을 반환하고, 새 응답으로 교체됩니다.
+    최대 max_entries개까지 최근에 사용한 순서로 유지합니다.
+    """
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+
+    def get(self, key: str, etag: str) -> Optional[CachedResponse]:
+        cached = self._entries.get(key)
+        if cached is None or cached.etag != etag:
+            return None
+        self._entries.move_to_end(key)
+        return cached
+
+    def put(self, key: str, etag: str, body: bytes) -> CachedResponse:
+        cached = CachedResponse(etag, body, compress(body))
+        self._entries[key] = cached
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return cached
+
+    def __len__(self) -> int:
+        return len(self._entries)
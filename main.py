@@ -1,13 +1,24 @@
-from card_mcp import card_mcp
-from event_mcp import event_mcp
+import os
+from card_mcp import card_mcp, CARD_WATCHER, log as card_log
+from event_mcp import event_mcp, EVENT_WATCHER, log as event_log
 from fastmcp.server import FastMCP
 
 
+# 공유 MCP 서버 주소 (api_server 워커들은 MCP_BACKEND_URL=http://<host>:<port>/mcp 로 연결)
+MCP_BACKEND_HOST = os.getenv("MCP_BACKEND_HOST", "127.0.0.1")
+MCP_BACKEND_PORT = int(os.getenv("MCP_BACKEND_PORT", "8001"))
+
 main_mcp = FastMCP("MainMCP")
 
 # 새로운 mount 방식 사용
 main_mcp.mount(card_mcp)
 main_mcp.mount(event_mcp)
 
+# 클라이언트의 logging/setLevel 요청은 main_mcp가 받으므로, mount한 서버의 도구 로거도 main_mcp에 설치합니다.
+card_log.install(main_mcp)
+event_log.install(main_mcp)
+
 if __name__ == "__main__":
-    main_mcp.run(transport="http", host="127.0.0.1", port=8000)
\ No newline at end of file
+    CARD_WATCHER.start()
+    EVENT_WATCHER.start()
+    main_mcp.run(transport="http", host=MCP_BACKEND_HOST, port=MCP_BACKEND_PORT)
@@ -0,0 +1,82 @@
+import os
+import sys
+from contextlib import AsyncExitStack
+from pathlib import Path
+from typing import Any, Dict, List
+from langchain_core.tools import BaseTool
+from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.tools import load_mcp_tools
+
+
+# MCP 서버 스크립트가 있는 디렉터리
+BASE_DIR = Path(__file__).parent
+
+# MCP 서버별 세션을 열어 두고 모든 도구 호출에 재사용합니다. 0이면 호출마다 새 세션을 엽니다. (stdio는 프로세스 실행)
+MCP_PERSISTENT_SESSIONS = os.getenv("MCP_PERSISTENT_SESSIONS", "1") == "1"
+
+# 운영용 도구 (에이전트에는 노출하지 않음)
+ADMIN_TOOL_NAMES = {
+    "get_card_data_generation",
+    "get_event_data_generation",
+    "get_card_metrics",
+    "get_event_metrics",
+    "get_recent_scrapes",
+    "refresh_card_details",
+    "warm_card_details",
+}
+
+
+def build_mcp_servers() -> Dict[str, Dict[str, Any]]:
+    """MCP 서버 연결 설정을 반환합니다.
+
+    MCP_BACKEND_URL이 있으면 공유 MCP 서버(main.py)에 HTTP로 연결하고, 없으면 카드/이벤트 MCP 서버를
+    stdio 하위 프로세스로 실행합니다. 환경변수는 MCP 서버 프로세스에 그대로 전달합니다.
+    """
+    backend_url = os.getenv("MCP_BACKEND_URL")
+    if backend_url:
+        return {
+            "backend": {
+                "url": backend_url,
+                "transport": "streamable_http",
+            }
+        }
+    return {
+        "event": {
+            "command": sys.executable,
+            "args": [str(BASE_DIR / "event_mcp.py")],
+            "env": dict(os.environ),
+            "transport": "stdio",
+        },
+        "card": {
+            "command": sys.executable,
+            "args": [str(BASE_DIR / "card_mcp.py")],
+            "env": dict(os.environ),
+            "transport": "stdio",
+        }
+    }
+
+
+def mcp_state_available() -> bool:
+    """MCP 서버 프로세스의 상태가 도구 호출 사이에 유지되는지 반환합니다.
+
+    메트릭, 데이터 세대, 최근 스크래핑 기록, 브라우저, 서킷 브레이커는 MCP 서버 프로세스 안에 있으므로
+    세션을 열어 두거나(MCP_PERSISTENT_SESSIONS) 공유 MCP 서버(MCP_BACKEND_URL)에 연결해야 유지됩니다.
+    호출마다 stdio 프로세스를 새로 띄우면 매번 빈 상태를 읽게 됩니다.
+    """
+    return MCP_PERSISTENT_SESSIONS or bool(os.getenv("MCP_BACKEND_URL"))
+
+
+async def resolve_tools(client: MultiServerMCPClient, sessions: AsyncExitStack) -> List[BaseTool]:
+    """MCP 도구를 불러옵니다.
+
+    MCP_PERSISTENT_SESSIONS이면 서버별 세션을 sessions에 열어 두고 그 세션에 묶인 도구를 반환하므로,
+    도구를 호출할 때마다 MCP 서버 프로세스(또는 HTTP 세션)를 새로 만들지 않습니다. sessions를 닫으면 세션도 닫힙니다.
+    """
+    if not MCP_PERSISTENT_SESSIONS:
+        return await client.get_tools()
+
+    tools = []
+    for server_name in client.connections:
+        session = await sessions.enter_async_context(client.session(server_name))
+        tools.extend(await load_mcp_tools(session))
+    return tools
@@ -0,0 +1,98 @@
+import logging
+import os
+import random
+import sys
+import weakref
+from typing import Optional
+from fastmcp.server import FastMCP, Context
+
+
+# 서버 로그 레벨 (stderr로 출력)
+LOG_LEVEL = os.getenv("MCP_LOG_LEVEL", "INFO").upper()
+
+# 도구 진입/완료 같은 hot-path DEBUG 로그의 샘플링 비율 (0.0 ~ 1.0)
+LOG_SAMPLE_RATE = float(os.getenv("MCP_LOG_SAMPLE_RATE", "1.0"))
+
+# MCP 클라이언트 로그 레벨 우선순위 (RFC 5424)
+CLIENT_LEVELS = ["debug", "info", "notice", "warning", "error", "critical", "alert", "emergency"]
+
+# stdio 전송에서는 stdout이 프로토콜 채널이므로 로그는 반드시 stderr로만 보냅니다.
+logging.basicConfig(
+    level=LOG_LEVEL,
+    stream=sys.stderr,
+    format="%(asctime)s %(levelname)s [%(name)s] %(message)s",
+)
+
+# MCP SDK와 httpx가 요청마다 남기는 INFO 로그("Processing request of type ...", "HTTP Request: ...")는
+# DEBUG 모드에서만 출력합니다.
+if LOG_LEVEL != "DEBUG":
+    logging.getLogger("mcp.server.lowlevel.server").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+# 서버별로 logging/setLevel 요청을 함께 받는 로거 목록 (서버 하나에는 핸들러를 하나만 등록할 수 있습니다)
+_installed_loggers: "weakref.WeakKeyDictionary[FastMCP, list]" = weakref.WeakKeyDictionary()
+
+
+class ToolLogger:
+    """MCP 도구용 로거입니다.
+
+    - 서버 로그는 stderr로 레벨에 따라 출력하며, 메시지는 실제로 출력될 때만 포맷합니다.
+    - DEBUG 로그는 LOG_SAMPLE_RATE 비율로만 남깁니다.
+    - 클라이언트가 logging/setLevel로 요청한 레벨 이상인 경우에만 ctx 로그 알림을 보냅니다.
+      (클라이언트가 레벨을 설정하지 않았다면 알림을 보내지 않습니다.)
+    """
+
+    def __init__(self, name: str, server: Optional[FastMCP] = None):
+        self.logger = logging.getLogger(name)
+        self.client_level: Optional[str] = os.getenv("MCP_CLIENT_LOG_LEVEL") or None
+        if server is not None:
+            self.install(server)
+
+    def install(self, server: FastMCP):
+        """서버에 logging/setLevel 요청 핸들러를 등록하여 클라이언트가 요청한 레벨을 기억합니다.
+
+        logging/setLevel은 클라이언트가 연결한 서버만 받으므로, 다른 서버에 mount되는 서버의 로거는
+        mount한 서버(main.py의 main_mcp)에도 설치해야 합니다. 한 서버에 설치한 로거들은 같은 요청을 함께 받습니다.
+        """
+        loggers = _installed_loggers.get(server)
+        if loggers is not None:
+            loggers.append(self)
+            return
+        loggers = _installed_loggers[server] = [self]
+
+        @server._mcp_server.set_logging_level()
+        async def set_logging_level(level):
+            for logger in loggers:
+                logger.client_level = level
+                logger.logger.info("클라이언트 로그 레벨 설정: %s", level)
+
+    def _client_enabled(self, level: str) -> bool:
+        if self.client_level not in CLIENT_LEVELS:
+            return False
+        return CLIENT_LEVELS.index(level) >= CLIENT_LEVELS.index(self.client_level)
+
+    async def _log(self, ctx: Optional[Context], level: str, msg: str, args: tuple):
+        log_level = getattr(logging, level.upper())
+        server_enabled = self.logger.isEnabledFor(log_level)
+        if server_enabled and level == "debug" and LOG_SAMPLE_RATE < 1.0:
+            server_enabled = random.random() < LOG_SAMPLE_RATE
+        client_enabled = ctx is not None and self._client_enabled(level)
+        if not server_enabled and not client_enabled:
+            return
+
+        if server_enabled:
+            self.logger.log(log_level, msg, *args)
+        if client_enabled:
+            await ctx.log(msg % args if args else msg, level=level, logger_name=self.logger.name)
+
+    async def debug(self, ctx: Optional[Context], msg: str, *args):
+        await self._log(ctx, "debug", msg, args)
+
+    async def info(self, ctx: Optional[Context], msg: str, *args):
+        await self._log(ctx, "info", msg, args)
+
+    async def warning(self, ctx: Optional[Context], msg: str, *args):
+        await self._log(ctx, "warning", msg, args)
+
+    async def error(self, ctx: Optional[Context], msg: str, *args):
+        await self._log(ctx, "error", msg, args)
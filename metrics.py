@@ -0,0 +1,223 @@
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+# 기본 버킷 (초, 바이트, 개수)
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 500)
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    parts = []
+    for key, value in labels:
+        value = str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """단조 증가 카운터입니다."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        return self._values.get(key, 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(zip(self.labelnames, key))} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Histogram:
+    """누적 버킷 히스토그램입니다."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self.labelnames = labelnames
+        # 라벨 값 -> [버킷별 개수..., 합계, 전체 개수]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        lines = []
+        for key, state in items:
+            labels = list(zip(self.labelnames, key))
+            cumulative = 0
+            for i, bound in enumerate(self.buckets):
+                cumulative += state[i]
+                lines.append(f"{self.name}_bucket{_format_labels(labels + [('le', _format_value(bound))])} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(labels + [('le', '+Inf')])} {_format_value(state[-1])}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {_format_value(state[-1])}")
+        return lines
+
+
+def payload_size(result: Any) -> int:
+    """결과를 JSON으로 직렬화했을 때의 바이트 수를 반환합니다."""
+    if isinstance(result, (bytes, bytearray)):
+        return len(result)
+    if isinstance(result, str):
+        return len(result.encode("utf-8"))
+    if isinstance(getattr(result, "body", None), (bytes, bytearray)):
+        # 이미 직렬화된 HTTP 응답 (압축했으면 압축된 크기)
+        return len(result.body)
+    if hasattr(result, "body_iterator"):
+        # 스트리밍 응답은 핸들러가 반환할 때 크기를 알 수 없습니다.
+        return 0
+    if hasattr(result, "model_dump_json"):
+        return len(result.model_dump_json().encode("utf-8"))
+    try:
+        return len(json.dumps(result, ensure_ascii=False, default=str).encode("utf-8"))
+    except (TypeError, ValueError):
+        return 0
+
+
+def result_count(result: Any) -> int:
+    """결과에 들어있는 항목 수를 반환합니다. 오류 응답은 0개로 셉니다."""
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, dict):
+        if "error" in result:
+            return 0
+        for key in ("cards", "data", "benefits"):
+            if isinstance(result.get(key), list):
+                return len(result[key])
+    return 1
+
+
+class MetricsRegistry:
+    """한 프로세스(서버)의 메트릭을 모아 Prometheus 텍스트 형식으로 내보냅니다.
+
+    메트릭 이름 앞에는 namespace가 붙으므로 여러 서버의 출력을 이어 붙여도 이름이 겹치지 않습니다.
+    """
+
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        full_name = f"{self.namespace}_{name}"
+        with self._lock:
+            metric = self._metrics.get(full_name)
+            if metric is None:
+                metric = self._metrics[full_name] = cls(full_name, *args, **kwargs)
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help, labelnames)
+
+    def histogram(self, name: str, help: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS, labelnames: Tuple[str, ...] = ()) -> Histogram:
+        return self._get_or_create(Histogram, name, help, buckets, labelnames)
+
+    def timed(self, name: str, kind: str = "tool"):
+        """비동기 도구/핸들러의 지연 시간, 응답 크기, 결과 개수를 기록하는 데코레이터입니다.
+
+        - {kind}_latency_seconds{name, status}
+        - {kind}_payload_bytes{name}
+        - {kind}_result_count{name}
+        """
+        latency = self.histogram(f"{kind}_latency_seconds", f"{kind} 처리 시간(초)", LATENCY_BUCKETS, ("name", "status"))
+        payload = self.histogram(f"{kind}_payload_bytes", f"{kind} 응답 크기(바이트)", SIZE_BUCKETS, ("name",))
+        count = self.histogram(f"{kind}_result_count", f"{kind} 결과 항목 수", COUNT_BUCKETS, ("name",))
+
+        def decorator(func: Callable):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception as e:
+                    status = str(getattr(e, "status_code", "exception"))
+                    latency.observe(time.perf_counter() - started, name=name, status=status)
+                    raise
+
+                status = "error" if isinstance(result, dict) and "error" in result else "ok"
+                latency.observe(time.perf_counter() - started, name=name, status=status)
+                payload.observe(payload_size(result), name=name)
+                count.observe(result_count(result), name=name)
+                return result
+            return wrapper
+        return decorator
+
+    @contextmanager
+    def phase(self, group: str, phase: str, timings: Optional[Dict[str, float]] = None):
+        """작업의 세부 단계(예: scrape의 launch/goto/expand/parse) 시간을 기록합니다.
+
+        timings가 주어지면 단계별 시간(밀리초)을 그 dict에도 남깁니다 (요청별 트레이스용).
+        """
+        histogram = self.histogram("phase_seconds", "작업 세부 단계 처리 시간(초)", LATENCY_BUCKETS, ("group", "phase"))
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            histogram.observe(elapsed, group=group, phase=phase)
+            if timings is not None:
+                timings[phase] = round(elapsed * 1000, 3)
+
+    def record_cache(self, cache: str, hit: bool):
+        """캐시 조회 결과(hit/miss)를 기록합니다. 적중률은 hit / (hit + miss)로 계산합니다."""
+        self.counter("cache_requests_total", "캐시 조회 횟수", ("cache", "result")).inc(
+            cache=cache, result="hit" if hit else "miss"
+        )
+
+    def render(self) -> str:
+        """모든 메트릭을 Prometheus 텍스트 형식으로 반환합니다."""
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+        lines = []
+        for name, metric in metrics:
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n" if lines else ""
@@ -1,16 +1,41 @@
+import argparse
 import asyncio
 import os
+import sys
+from contextlib import AsyncExitStack
 from dotenv import load_dotenv
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from langgraph.prebuilt import create_react_agent
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage, AIMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from tool_wrappers import CURRENT_TOOL_MEMO, ToolCallMemo, with_injected_arg, with_memo
+from chat_batch import CHAT_BATCH_CONCURRENCY, batch_answerer, parse_batch_items, run_batch, to_jsonl
+from mcp_connections import ADMIN_TOOL_NAMES, build_mcp_servers, resolve_tools
 
 
 # .env 파일 로드
 load_dotenv()
 
+# 도구 호출 메모 범위: request(질문 하나 안에서만, 기본), session(대화 전체), off
+TOOL_MEMO_SCOPE = os.getenv("TOOL_MEMO_SCOPE", "request")
+TOOL_MEMO_TTL = float(os.getenv("TOOL_MEMO_TTL", "300"))
+
+# 도움말에 보여주는 예시 질문 (--examples로 일괄 실행할 수 있습니다)
+CARD_EXAMPLE_QUESTIONS = [
+    "지하철 카드 추천해줘",
+    "연회비가 낮은 카드 알려줘",
+    "해외여행 카드 추천해줘",
+    "현대카드 중에서 추천해줘",
+    "KT 통신 카드 추천해줘",
+]
+EVENT_EXAMPLE_QUESTIONS = [
+    "현재 진행중인 이벤트 알려줘",
+    "신한카드 이벤트 정보 보여줘",
+    "카드 발급 이벤트 있나요?",
+]
+EXAMPLE_QUESTIONS = CARD_EXAMPLE_QUESTIONS + EVENT_EXAMPLE_QUESTIONS
+
 def print_help():
     """도움말 출력"""
     print("\n" + "="*50)
@@ -21,16 +46,12 @@ def print_help():
     print("  - 'quit' 또는 'exit': 종료")
     print("="*50)
     print("💡 카드 추천 예시:")
-    print("  - '지하철 카드 추천해줘'")
-    print("  - '연회비가 낮은 카드 알려줘'")
-    print("  - '해외여행 카드 추천해줘'")
-    print("  - '현대카드 중에서 추천해줘'")
-    print("  - 'KT 통신 카드 추천해줘'")
+    for question in CARD_EXAMPLE_QUESTIONS:
+        print(f"  - '{question}'")
     print("="*50)
     print("🎁 이벤트 정보 예시:")
-    print("  - '현재 진행중인 이벤트 알려줘'")
-    print("  - '신한카드 이벤트 정보 보여줘'")
-    print("  - '카드 발급 이벤트 있나요?'")
+    for question in EVENT_EXAMPLE_QUESTIONS:
+        print(f"  - '{question}'")
     print("="*50)
 
 def print_history(conversation_history):
@@ -50,7 +71,38 @@ def print_history(conversation_history):
             print(f"{i}. AI: {message.content}")
         print("-" * 30)
 
-async def main():
+async def answer_batch(agent, items, concurrency: int, output):
+    """질문 목록을 동시에 처리하고 결과를 JSONL로 output에 씁니다. 질문마다 이전 대화 없이 답합니다."""
+    async def answer_turn(message, session_id, deadline_ms, tool_memo):
+        memo_token = CURRENT_TOOL_MEMO.set(tool_memo)
+        try:
+            invocation = agent.ainvoke({"messages": [HumanMessage(content=message)]})
+            if deadline_ms is not None:
+                agent_response = await asyncio.wait_for(invocation, timeout=deadline_ms / 1000)
+            else:
+                agent_response = await invocation
+        finally:
+            CURRENT_TOOL_MEMO.reset(memo_token)
+        return agent_response["messages"][-1].content
+
+    answer = batch_answerer(answer_turn, memoize=TOOL_MEMO_SCOPE != "off")
+    summary = None
+    async for record in run_batch(items, answer, concurrency):
+        output.write(to_jsonl(record))
+        output.flush()
+        if record["type"] == "summary":
+            summary = record
+        elif record["status"] == "error":
+            print(f"❌ {record['id']}: {record['error']}", file=sys.stderr)
+    
+    print(
+        f"📦 질문 {summary['total']}개 처리 - 성공 {summary['succeeded']}, 실패 {summary['failed']} "
+        f"({summary['duration_ms']:.0f}ms, {summary['throughput_per_sec']}개/초, "
+        f"p50 {summary['latency_ms']['p50']:.0f}ms, p95 {summary['latency_ms']['p95']:.0f}ms)",
+        file=sys.stderr,
+    )
+
+async def main(args):
 
     google_api_key = os.getenv("GOOGLE_API_KEY")
     if not google_api_key:
@@ -59,22 +111,16 @@ async def main():
         print("   GOOGLE_API_KEY=your-api-key-here")
         return
 
-    client = MultiServerMCPClient(
-        {
-            "event": {
-                "command": "python",
-                "args": ["/Users/a80128121/Desktop/mac_mini/project/aicc/event_mcp.py"],
-                "transport": "stdio",
-            },
-            "card": {
-                "command": "python",
-                "args": ["/Users/a80128121/Desktop/mac_mini/project/aicc/card_mcp.py"],
-                "transport": "stdio",
-            }
-        }
-        )
-
-    tools = await client.get_tools()
+    # 저장소의 card_mcp.py, event_mcp.py를 실행합니다. (MCP_BACKEND_URL이 있으면 공유 MCP 서버에 연결)
+    client = MultiServerMCPClient(build_mcp_servers())
+
+    # MCP 서버 세션을 열어 두고 대화와 일괄 실행의 모든 도구 호출이 같은 연결을 사용합니다.
+    async with AsyncExitStack() as sessions:
+        tools = await resolve_tools(client, sessions)
+        await run_assistant(args, tools, google_api_key)
+
+async def run_assistant(args, tools, google_api_key: str):
+    """불러온 MCP 도구로 에이전트를 만들고 대화(또는 일괄 실행)를 진행합니다."""
 
     prompt = '''당신은 신한카드 전문 어시스턴트입니다. 사용자 질문에 대한 친절하고 정확한 답변을 해야합니다.
     
@@ -99,9 +145,33 @@ async def main():
         google_api_key=google_api_key,
         temperature=0.1
     )
-    agent = create_react_agent(llm, tools, prompt=prompt)
+    # 운영용 도구(데이터 세대, 메트릭 조회)는 에이전트에 노출하지 않습니다.
+    # get_card_info의 deadline_ms는 API 서버가 채우는 인자이므로 에이전트에는 숨깁니다. (CLI는 기본 한도 사용)
+    # 같은 인자의 반복 호출은 메모된 결과(또는 이전 결과 참조)로 응답합니다.
+    agent_tools = [
+        with_memo(with_injected_arg(tool, "deadline_ms", lambda: None))
+        for tool in tools if tool.name not in ADMIN_TOOL_NAMES
+    ]
+    agent = create_react_agent(llm, agent_tools, prompt=prompt)
+
+    # 일괄 실행 모드: JSONL 파일(또는 예시 질문)을 처리하고 종료합니다.
+    if args.batch or args.examples:
+        if args.examples:
+            items = parse_batch_items("\n".join(EXAMPLE_QUESTIONS))
+        elif args.batch == "-":
+            items = parse_batch_items(sys.stdin.read())
+        else:
+            with open(args.batch, "r", encoding="utf-8") as f:
+                items = parse_batch_items(f.read())
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as output:
+                await answer_batch(agent, items, args.concurrency, output)
+        else:
+            await answer_batch(agent, items, args.concurrency, sys.stdout)
+        return
 
     conversation_history = []
+    session_memo = ToolCallMemo(ttl=TOOL_MEMO_TTL) if TOOL_MEMO_SCOPE == "session" else None
     
     print("🎉 안녕하세요! 신한카드 전문 어시스턴트입니다.")
     print("💳 다양한 카드 정보를 검색하고 추천받을 수 있습니다.")
@@ -132,6 +202,7 @@ async def main():
                     # 대화 히스토리 초기화
                     if user_input.lower() in ['clear', '초기화']:
                         conversation_history = []
+                        session_memo = ToolCallMemo(ttl=TOOL_MEMO_TTL) if TOOL_MEMO_SCOPE == "session" else None
                         print("\n🗑️ 대화 히스토리가 초기화되었습니다.")
                         continue
                     
@@ -143,8 +214,12 @@ async def main():
                     
                     print("🤔 AI가 생각하고 있습니다...")
                     
-                    # 에이전트에 전체 대화 히스토리 전달
-                    agent_response = await agent.ainvoke({"messages": conversation_history})
+                    # 에이전트에 전체 대화 히스토리 전달 (질문마다 새 도구 호출 메모 사용)
+                    memo_token = CURRENT_TOOL_MEMO.set(ToolCallMemo(session_memo) if TOOL_MEMO_SCOPE != "off" else None)
+                    try:
+                        agent_response = await agent.ainvoke({"messages": conversation_history})
+                    finally:
+                        CURRENT_TOOL_MEMO.reset(memo_token)
                     
                     # AI 응답을 대화 히스토리에 추가
                     ai_message = agent_response["messages"][-1]  # 마지막 메시지가 AI 응답
@@ -160,5 +235,13 @@ async def main():
                     print(f"\n❌ 오류가 발생했습니다: {e}")
                     print("🔄 다시 시도해주세요.")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="신한카드 전문 어시스턴트 (MCP 클라이언트)")
+    parser.add_argument("--batch", help="질문 JSONL 파일 경로 ('-'이면 표준 입력). 주면 대화 대신 일괄 실행합니다.")
+    parser.add_argument("--examples", action="store_true", help="도움말의 예시 질문을 일괄 실행합니다.")
+    parser.add_argument("--concurrency", type=int, default=CHAT_BATCH_CONCURRENCY, help="동시에 처리할 질문 수")
+    parser.add_argument("--output", help="결과 JSONL을 저장할 파일 경로 (없으면 표준 출력)")
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,147 @@
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+
+def remaining_seconds(deadline_at: Optional[float]) -> float:
+    """time.monotonic() 기준 마감 시각까지 남은 시간(초)을 반환합니다. 마감이 없으면 무한대입니다."""
+    if deadline_at is None:
+        return math.inf
+    return max(0.0, deadline_at - time.monotonic())
+
+
+def clamp_timeout_ms(configured_ms: float, deadline_at: Optional[float]) -> float:
+    """설정된 타임아웃과 남은 예산 중 작은 값을 밀리초로 반환합니다."""
+    return max(1.0, min(configured_ms, remaining_seconds(deadline_at) * 1000))
+
+
+class LatencyTracker:
+    """최근 성공한 호출의 지연 시간을 보관하고 백분위수를 계산합니다."""
+
+    def __init__(self, window: int = 100):
+        self._samples = deque(maxlen=window)
+
+    def observe(self, seconds: float):
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+class CircuitBreakerOpen(Exception):
+    """서킷 브레이커가 열려 있어 요청을 보내지 않았습니다."""
+
+
+class CircuitBreaker:
+    """연속 실패가 threshold번 쌓이면 reset_timeout초 동안 요청을 막습니다(open).
+
+    reset_timeout이 지나면 한 번의 시험 요청만 허용하고(half-open), 성공하면 다시 닫고(closed)
+    실패하면 다시 엽니다. 시험 요청이 결과를 남기지 못하고 취소된 경우를 대비해 reset_timeout이
+    지나면 다음 시험 요청을 허용합니다.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_started: Optional[float] = None
+
+    def allow(self) -> bool:
+        """지금 요청을 보내도 되는지 반환합니다."""
+        if self.state == self.CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state == self.OPEN and now - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._probe_started = None
+        if self.state == self.HALF_OPEN and (
+            self._probe_started is None or now - self._probe_started >= self.reset_timeout
+        ):
+            self._probe_started = now
+            return True
+        return False
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_started = None
+
+    def record_failure(self):
+        self.failures += 1
+        self._probe_started = None
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def record_inconclusive(self):
+        """성공/실패를 판단할 수 없는 결과(호출한 쪽 마감으로 잘린 요청 등)입니다. 시험 요청이었다면 다음 요청이 다시 시험합니다."""
+        self._probe_started = None
+
+    def status(self) -> dict:
+        return {"state": self.state, "failures": self.failures}
+
+
+async def hedged(
+    make_attempt: Callable[[], Awaitable[T]],
+    hedge_after: float,
+    timeout: float,
+    max_attempts: int = 2,
+    on_hedge: Optional[Callable[[], None]] = None,
+) -> T:
+    """make_attempt()를 실행하고, hedge_after초 안에 끝나지 않거나 실패하면 다음 시도를 함께 시작합니다.
+
+    가장 먼저 성공한 결과를 반환하고 나머지 시도는 취소합니다. timeout초 안에 성공한 시도가 없으면
+    asyncio.TimeoutError를, 모든 시도가 실패하면 마지막 예외를 발생시킵니다.
+    """
+    deadline = time.monotonic() + timeout
+    tasks = [asyncio.create_task(make_attempt())]
+    launched_at = time.monotonic()
+    last_error: Optional[BaseException] = None
+    try:
+        while True:
+            now = time.monotonic()
+            if now >= deadline:
+                raise asyncio.TimeoutError()
+
+            pending = [task for task in tasks if not task.done()]
+            can_hedge = len(tasks) < max_attempts
+            if not pending and not can_hedge:
+                raise last_error
+
+            # 진행 중인 시도가 모두 실패했거나 헤지 대기 시간이 지났으면 다음 시도를 시작합니다.
+            if can_hedge and (not pending or now - launched_at >= hedge_after):
+                if on_hedge is not None:
+                    on_hedge()
+                tasks.append(asyncio.create_task(make_attempt()))
+                launched_at = now
+                continue
+
+            wait = deadline - now
+            if can_hedge:
+                wait = min(wait, launched_at + hedge_after - now)
+            done, _ = await asyncio.wait(pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                last_error = task.exception()
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
@@ -0,0 +1,124 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+
+logger = logging.getLogger("resource_watcher")
+
+# 리소스 파일이 있는 디렉터리
+RESOURCE_DIR = Path(__file__).parent / "resource"
+
+# 파일 변경 감시 주기 (초). 0 이하이면 감시하지 않습니다.
+DEFAULT_RELOAD_INTERVAL = float(os.getenv("RESOURCE_RELOAD_INTERVAL", "2.0"))
+
+
+class ResourceWatcher:
+    """리소스 JSON 파일을 감시하다가 변경되면 스냅샷을 다시 빌드하여 교체합니다.
+
+    - build(paths)는 파일을 읽어 데이터와 파생 인덱스를 모두 담은 스냅샷을 반환해야 하며,
+      데이터가 올바르지 않으면 예외를 발생시켜야 합니다.
+    - 빌드는 백그라운드 스레드에서 수행되고, 검증을 통과한 경우에만 참조 하나를 바꿔치기하여
+      교체합니다. 진행 중인 도구 호출은 자신이 읽어둔 이전 스냅샷을 끝까지 사용합니다.
+    - 빌드에 실패하면 이전 스냅샷을 그대로 유지합니다.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        paths: List[Path],
+        build: Callable[[List[Path]], Any],
+        interval: float = DEFAULT_RELOAD_INTERVAL,
+    ):
+        self.name = name
+        self.paths = list(paths)
+        self.build = build
+        self.interval = interval
+
+        self.snapshot: Any = None
+        self.generation = 0
+        self.loaded_at: Optional[float] = None
+        self.build_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        # 적용된 스냅샷을 만든 파일들의 수정 시각 해시. 같은 파일을 읽은 프로세스라면 모두 같은 값입니다.
+        self.fingerprint: Optional[str] = None
+
+        self._mtimes: Dict[Path, Optional[int]] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def _read_mtimes(self) -> Dict[Path, Optional[int]]:
+        mtimes = {}
+        for path in self.paths:
+            try:
+                mtimes[path] = os.stat(path).st_mtime_ns
+            except OSError:
+                mtimes[path] = None
+        return mtimes
+
+    def reload(self) -> bool:
+        """스냅샷을 다시 빌드하고, 성공하면 세대 번호를 올려 교체합니다."""
+        with self._lock:
+            mtimes = self._read_mtimes()
+            started = time.perf_counter()
+            try:
+                snapshot = self.build(self.paths)
+            except Exception as e:
+                # 파일이 바뀐 것은 기록해 두어 같은 잘못된 파일을 계속 다시 빌드하지 않도록 합니다.
+                self._mtimes = mtimes
+                self.last_error = str(e)
+                logger.error("❌ %s 리소스 빌드 실패 - 이전 세대 %d 유지: %s", self.name, self.generation, e)
+                return False
+
+            self.build_ms = (time.perf_counter() - started) * 1000
+            self._mtimes = mtimes
+            self.snapshot = snapshot
+            self.generation += 1
+            self.loaded_at = time.time()
+            self.fingerprint = hashlib.sha256(
+                repr(sorted((path.name, mtime) for path, mtime in mtimes.items())).encode("utf-8")
+            ).hexdigest()[:16]
+            self.last_error = None
+            logger.info("✅ %s 리소스 세대 %d 적용 (%.1fms)", self.name, self.generation, self.build_ms)
+            return True
+
+    def check(self) -> bool:
+        """파일의 수정 시각이 바뀌었으면 다시 빌드합니다."""
+        if self._read_mtimes() == self._mtimes:
+            return False
+        return self.reload()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error("❌ %s 리소스 감시 오류: %s", self.name, e)
+
+    def start(self):
+        """백그라운드 감시 스레드를 시작합니다."""
+        if self.interval <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"{self.name}-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def status(self) -> Dict[str, Any]:
+        """현재 적용된 세대 정보를 반환합니다."""
+        return {
+            "name": self.name,
+            "generation": self.generation,
+            "fingerprint": self.fingerprint,
+            "loaded_at": self.loaded_at,
+            "build_ms": round(self.build_ms, 3) if self.build_ms is not None else None,
+            "files": [path.name for path in self.paths],
+            "watching": self._thread is not None and self._thread.is_alive(),
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,223 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, messages_from_dict, messages_to_dict
+
+
+# 세션 저장소 종류: memory(프로세스 메모리, 기본) 또는 sqlite(여러 워커가 공유)
+SESSION_STORE = os.getenv("SESSION_STORE", "memory")
+
+# sqlite 세션 저장소 파일 경로
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", str(Path(__file__).parent / "sessions.db"))
+
+
+def display_entry(message: BaseMessage) -> Optional[Dict[str, Any]]:
+    """응답에 보여줄 히스토리 항목({"role", "content"})을 반환합니다. 사용자/AI 메시지가 아니면 None입니다."""
+    if isinstance(message, HumanMessage):
+        return {"role": "user", "content": message.content}
+    if isinstance(message, AIMessage):
+        return {"role": "assistant", "content": message.content}
+    return None
+
+
+class MemorySessionStore:
+    """프로세스 메모리에 세션별 대화 메시지를 보관합니다. 워커가 하나일 때만 사용할 수 있습니다.
+
+    응답용 히스토리 항목(role, content)은 메시지를 저장할 때 함께 만들어 두므로, 조회할 때 다시 변환하지 않습니다.
+    """
+
+    def __init__(self):
+        self._sessions: Dict[str, List[BaseMessage]] = {}
+        self._display: Dict[str, List[Dict[str, Any]]] = {}
+        self._last_activity: Dict[str, float] = {}
+
+    async def load(self, session_id: str) -> List[BaseMessage]:
+        return list(self._sessions.get(session_id, []))
+
+    async def append(self, session_id: str, messages: List[BaseMessage]):
+        self._sessions.setdefault(session_id, []).extend(messages)
+        display = self._display.setdefault(session_id, [])
+        display.extend(entry for entry in map(display_entry, messages) if entry is not None)
+        self._last_activity[session_id] = time.time()
+
+    async def history_page(self, session_id: str, cursor: int = 0, limit: Optional[int] = None) -> Dict[str, Any]:
+        """cursor 다음부터 최대 limit개의 히스토리 항목을 반환합니다. 더 남아 있으면 next_cursor가 채워집니다.
+
+        cursor는 불투명한 값입니다. (이 저장소에서는 히스토리 항목의 위치, SqliteSessionStore에서는 메시지 seq)
+        0(처음) 또는 이전 페이지의 next_cursor만 넘겨야 하며, 저장소 종류가 바뀌면 처음부터 다시 조회해야 합니다.
+        """
+        entries = self._display.get(session_id, [])
+        page = entries[cursor:] if limit is None else entries[cursor:cursor + limit]
+        end = cursor + len(page)
+        return {
+            "conversation_history": page,
+            "message_count": len(entries),
+            "next_cursor": end if end < len(entries) else None,
+        }
+
+    async def delete(self, session_id: str) -> bool:
+        self._last_activity.pop(session_id, None)
+        self._display.pop(session_id, None)
+        return self._sessions.pop(session_id, None) is not None
+
+    async def sessions(self) -> List[Dict[str, Any]]:
+        return [
+            {"session_id": session_id, "message_count": len(history), "last_activity": self._last_activity.get(session_id)}
+            for session_id, history in self._sessions.items()
+        ]
+
+
+class SqliteSessionStore:
+    """SQLite(WAL 모드) 파일에 세션별 대화 메시지를 저장합니다.
+
+    여러 워커 프로세스가 같은 파일을 공유하므로 어느 워커가 요청을 받아도 같은 대화를 이어갈 수 있습니다.
+    메시지는 langchain의 messages_to_dict 형식(JSON)으로 저장하며, DB 작업은 별도 스레드에서 수행합니다.
+    응답용 히스토리 항목은 display 열에 따로 저장하여, 히스토리 조회 시 메시지 전체를 역직렬화하지 않습니다.
+    """
+
+    def __init__(self, path: str = SESSION_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS messages (
+                session_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                message TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                display TEXT,
+                PRIMARY KEY (session_id, seq)
+            )
+            """
+        )
+        self._migrate(conn)
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 연결은 스레드 간에 공유하지 않고 스레드마다 하나씩 엽니다.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _migrate(self, conn: sqlite3.Connection):
+        # display 열이 없던 이전 파일이면 열을 추가하고, 저장된 메시지로 히스토리 항목을 채워 넣습니다.
+        if any(row[1] == "display" for row in conn.execute("PRAGMA table_info(messages)")):
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # 다른 워커가 먼저 옮겼을 수 있으므로 잠금을 잡은 뒤 다시 확인합니다.
+            if not any(row[1] == "display" for row in conn.execute("PRAGMA table_info(messages)")):
+                conn.execute("ALTER TABLE messages ADD COLUMN display TEXT")
+                rows = conn.execute("SELECT session_id, seq, message FROM messages").fetchall()
+                for session_id, seq, message in rows:
+                    entry = display_entry(messages_from_dict([json.loads(message)])[0])
+                    if entry is not None:
+                        conn.execute(
+                            "UPDATE messages SET display = ? WHERE session_id = ? AND seq = ?",
+                            (json.dumps(entry, ensure_ascii=False), session_id, seq),
+                        )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _load(self, session_id: str) -> List[BaseMessage]:
+        rows = self._connect().execute(
+            "SELECT message FROM messages WHERE session_id = ? ORDER BY seq", (session_id,)
+        ).fetchall()
+        return messages_from_dict([json.loads(row[0]) for row in rows])
+
+    def _append(self, session_id: str, messages: List[BaseMessage]):
+        conn = self._connect()
+        now = time.time()
+        payloads = [json.dumps(message, ensure_ascii=False) for message in messages_to_dict(messages)]
+        displays = [
+            json.dumps(entry, ensure_ascii=False) if entry is not None else None
+            for entry in map(display_entry, messages)
+        ]
+        # 같은 세션에 여러 워커가 동시에 쓰더라도 seq가 겹치지 않도록 쓰기 잠금을 먼저 잡습니다.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            (last_seq,) = conn.execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM messages WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            conn.executemany(
+                "INSERT INTO messages (session_id, seq, message, created_at, display) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (session_id, last_seq + i, payload, now, display)
+                    for i, (payload, display) in enumerate(zip(payloads, displays), 1)
+                ],
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _history_page(self, session_id: str, cursor: int, limit: Optional[int]) -> Dict[str, Any]:
+        # cursor는 마지막으로 받은 메시지의 seq입니다. 다음 페이지가 있는지 보려고 한 개 더 읽습니다.
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT seq, display FROM messages WHERE session_id = ? AND seq > ? AND display IS NOT NULL "
+            "ORDER BY seq LIMIT ?",
+            (session_id, cursor, limit + 1 if limit is not None else -1),
+        ).fetchall()
+        (count,) = conn.execute(
+            "SELECT COUNT(*) FROM messages WHERE session_id = ? AND display IS NOT NULL", (session_id,)
+        ).fetchone()
+        has_more = limit is not None and len(rows) > limit
+        page = rows[:limit] if has_more else rows
+        return {
+            "conversation_history": [json.loads(display) for _, display in page],
+            "message_count": count,
+            "next_cursor": page[-1][0] if has_more else None,
+        }
+
+    def _delete(self, session_id: str) -> bool:
+        cursor = self._connect().execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+        return cursor.rowcount > 0
+
+    def _sessions(self) -> List[Dict[str, Any]]:
+        rows = self._connect().execute(
+            "SELECT session_id, COUNT(*), MAX(created_at) FROM messages GROUP BY session_id"
+        ).fetchall()
+        return [
+            {"session_id": session_id, "message_count": count, "last_activity": last_activity}
+            for session_id, count, last_activity in rows
+        ]
+
+    async def load(self, session_id: str) -> List[BaseMessage]:
+        return await asyncio.to_thread(self._load, session_id)
+
+    async def append(self, session_id: str, messages: List[BaseMessage]):
+        await asyncio.to_thread(self._append, session_id, messages)
+
+    async def history_page(self, session_id: str, cursor: int = 0, limit: Optional[int] = None) -> Dict[str, Any]:
+        """cursor 다음부터 최대 limit개의 히스토리 항목을 반환합니다. 더 남아 있으면 next_cursor가 채워집니다.
+
+        cursor는 불투명한 값(마지막으로 받은 메시지의 seq)입니다. 0(처음) 또는 이전 페이지의 next_cursor만 넘겨야 합니다.
+        """
+        return await asyncio.to_thread(self._history_page, session_id, cursor, limit)
+
+    async def delete(self, session_id: str) -> bool:
+        return await asyncio.to_thread(self._delete, session_id)
+
+    async def sessions(self) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self._sessions)
+
+
+def build_session_store():
+    """SESSION_STORE 환경변수에 따라 세션 저장소를 생성합니다."""
+    if SESSION_STORE == "sqlite":
+        return SqliteSessionStore(SESSION_DB_PATH)
+    if SESSION_STORE != "memory":
+        raise ValueError(f"지원하지 않는 SESSION_STORE입니다: {SESSION_STORE} (memory 또는 sqlite)")
+    return MemorySessionStore()
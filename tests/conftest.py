@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# 저장소 최상위 모듈(resilience, tool_wrappers 등)을 테스트에서 바로 import할 수 있게 합니다.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
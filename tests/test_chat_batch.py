@@ -0,0 +1,119 @@
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage
+from langchain_core.tools import StructuredTool
+
+import api_server
+from chat_batch import batch_answerer, parse_batch_items, run_batch
+from tool_wrappers import CURRENT_TOOL_MEMO, with_memo
+
+
+def test_parse_batch_items_accepts_objects_strings_and_reports_errors():
+    items = parse_batch_items('\n'.join([
+        '{"id": "a", "message": "주유 카드", "session_id": "s1", "deadline_ms": 500}',
+        '"연회비 없는 카드"',
+        '연회비 1만원 이하',
+        '{"id": "empty"}',
+        '[1, 2]',
+    ]))
+
+    assert [item["id"] for item in items] == ["a", 1, 2, "empty", 4]
+    assert items[0]["session_id"] == "s1" and items[0]["deadline_ms"] == 500
+    assert items[2]["message"] == "연회비 1만원 이하"
+    assert "error" in items[3] and "error" in items[4]
+
+
+async def collect(items, answer, concurrency=4):
+    return [record async for record in run_batch(items, answer, concurrency)]
+
+
+def test_batch_answerer_shares_tool_calls_across_items():
+    calls = []
+
+    async def search(keyword: str) -> str:
+        calls.append(keyword)
+        await asyncio.sleep(0.02)
+        return f"{keyword} 결과"
+
+    tool = with_memo(StructuredTool.from_function(coroutine=search, name="search", description="검색"))
+
+    async def answer_turn(message, session_id, deadline_ms, tool_memo):
+        CURRENT_TOOL_MEMO.set(tool_memo)
+        return await tool.ainvoke({"keyword": "주유"})
+
+    records = asyncio.run(collect(parse_batch_items("질문 1\n질문 2\n질문 3"), batch_answerer(answer_turn)))
+
+    assert calls == ["주유"]
+    assert [record["status"] for record in records[:-1]] == ["ok"] * 3
+    assert records[-1]["succeeded"] == 3
+
+
+def test_batch_answerer_without_memo_calls_every_time():
+    memos = []
+
+    async def answer_turn(message, session_id, deadline_ms, tool_memo):
+        memos.append(tool_memo)
+        return message
+
+    asyncio.run(collect(parse_batch_items("a\nb"), batch_answerer(answer_turn, memoize=False)))
+
+    assert memos == [None, None]
+
+
+def test_batch_answerer_runs_one_session_in_input_order():
+    running, order = set(), []
+
+    async def answer_turn(message, session_id, deadline_ms, tool_memo):
+        assert session_id not in running
+        running.add(session_id)
+        await asyncio.sleep(0.01)
+        order.append(message)
+        running.discard(session_id)
+        return message
+
+    lines = [json.dumps({"message": f"질문 {index}", "session_id": "s1"}, ensure_ascii=False) for index in range(5)]
+    asyncio.run(collect(parse_batch_items("\n".join(lines)), batch_answerer(answer_turn), concurrency=5))
+
+    assert order == [f"질문 {index}" for index in range(5)]
+
+
+def test_cancelled_item_does_not_break_the_batch_sharing_its_tool_call():
+    async def slow_search(keyword: str) -> str:
+        await asyncio.sleep(0.1)
+        return f"{keyword} 결과"
+
+    tool = with_memo(StructuredTool.from_function(coroutine=slow_search, name="search", description="검색"))
+
+    async def answer_turn(message, session_id, deadline_ms, tool_memo):
+        CURRENT_TOOL_MEMO.set(tool_memo)
+        invocation = tool.ainvoke({"keyword": "주유"})
+        if deadline_ms is not None:
+            return await asyncio.wait_for(invocation, timeout=deadline_ms / 1000)
+        return await invocation
+
+    items = parse_batch_items('{"message": "급함", "deadline_ms": 20}\n{"message": "여유"}')
+    records = asyncio.run(collect(items, batch_answerer(answer_turn)))
+
+    results = {record["id"]: record for record in records if record["type"] == "result"}
+    assert results[0]["status"] == "error"
+    assert results[1] == {**results[1], "status": "ok", "response": "주유 결과"}
+    assert records[-1]["type"] == "summary"
+
+
+def test_chat_batch_endpoint_streams_results_and_is_timed(monkeypatch):
+    async def run_chat_turn(message, session_id, deadline_ms, tool_memo=None):
+        return AIMessage(content=f"{message} 답변"), None
+
+    monkeypatch.setattr(api_server, "agent", object())
+    monkeypatch.setattr(api_server, "run_chat_turn", run_chat_turn)
+    client = TestClient(api_server.app)
+
+    response = client.post("/chat/batch", content="질문 1\n질문 2".encode("utf-8"))
+
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert response.status_code == 200
+    assert sorted(record["response"] for record in records[:-1]) == ["질문 1 답변", "질문 2 답변"]
+    assert records[-1]["type"] == "summary"
+    assert 'name="POST /chat/batch"' in api_server.METRICS.render()
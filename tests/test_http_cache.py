@@ -0,0 +1,194 @@
+import gzip
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api_server
+from http_cache import (
+    HTTP_COMPRESS_MIN_BYTES,
+    CachedResponse,
+    ResponseCache,
+    choose_encoding,
+    compress,
+    etag_matches,
+    make_etag,
+    variant_etag,
+)
+
+
+SMALL_BODY = json.dumps({"type": "events", "data": []}).encode("utf-8")
+LARGE_BODY = json.dumps({"type": "events", "data": ["이벤트"] * HTTP_COMPRESS_MIN_BYTES}).encode("utf-8")
+
+
+def cached(body: bytes) -> CachedResponse:
+    return CachedResponse(make_etag("v1", "events:"), body, compress(body))
+
+
+@pytest.mark.parametrize("body", [SMALL_BODY, LARGE_BODY], ids=["small", "large"])
+@pytest.mark.parametrize("accept_encoding", [None, "gzip", "gzip, deflate, br", "identity", "gzip;q=0"])
+def test_not_modified_etag_matches_the_200_etag(body, accept_encoding):
+    response = cached(body)
+
+    ok = response.to_response(accept_encoding)
+    not_modified = response.not_modified(accept_encoding)
+
+    assert not_modified.status_code == 304
+    assert not_modified.body == b""
+    assert not_modified.headers["etag"] == ok.headers["etag"]
+    assert not_modified.headers["vary"] == "Accept-Encoding"
+
+
+def test_small_bodies_are_never_compressed():
+    response = cached(SMALL_BODY)
+
+    ok = response.to_response("gzip, br")
+
+    assert "content-encoding" not in ok.headers
+    assert ok.headers["etag"] == response.etag
+    assert ok.body == SMALL_BODY
+
+
+def test_large_bodies_are_sent_with_a_variant_etag():
+    response = cached(LARGE_BODY)
+
+    ok = response.to_response("gzip")
+
+    assert ok.headers["content-encoding"] == "gzip"
+    assert ok.headers["etag"] == variant_etag(response.etag, "gzip")
+    assert gzip.decompress(ok.body) == LARGE_BODY
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("gzip;q=0", None),
+    ("gzip; q=0.0", None),
+    ("gzip;q=0, identity", None),
+    ("*;q=0", None),
+    ("gzip;q=0.5", "gzip"),
+    ("GZIP", "gzip"),
+    ("*", "gzip"),
+    ("deflate", None),
+    ("gzip;q=abc", None),
+    ("", None),
+])
+def test_choose_encoding_honours_q_values(monkeypatch, accept_encoding, expected):
+    monkeypatch.setattr("http_cache.SUPPORTED_ENCODINGS", ("gzip",))
+    assert choose_encoding(accept_encoding) == expected
+
+
+def test_choose_encoding_prefers_br_when_available(monkeypatch):
+    monkeypatch.setattr("http_cache.SUPPORTED_ENCODINGS", ("br", "gzip"))
+    assert choose_encoding("gzip, br") == "br"
+    assert choose_encoding("gzip, br;q=0") == "gzip"
+
+
+@pytest.mark.parametrize("if_none_match", [
+    '"{etag}"',
+    'W/"{etag}"',
+    '"{etag}-gzip"',
+    'W/"{etag}-br"',
+    '"other", W/"{etag}"',
+    "*",
+])
+def test_etag_matches_weak_and_variant_tags(if_none_match):
+    etag = make_etag("v1", "events:")
+    assert etag_matches(if_none_match.format(etag=etag[1:-1]), etag)
+
+
+@pytest.mark.parametrize("if_none_match", [None, "", '"other"', 'W/"other"'])
+def test_etag_does_not_match_other_tags(if_none_match):
+    assert not etag_matches(if_none_match, make_etag("v1", "events:"))
+
+
+def test_etag_changes_only_with_version_or_key():
+    assert make_etag("v1", "events:") == make_etag("v1", "events:")
+    assert make_etag("v1", "events:") != make_etag("v2", "events:")
+    assert make_etag("v1", "events:") != make_etag("v1", "benefit-keywords:")
+
+
+def test_response_cache_replaces_entries_from_an_older_generation():
+    cache = ResponseCache(max_entries=2)
+    cache.put("events:", make_etag("v1", "events:"), SMALL_BODY)
+
+    assert cache.get("events:", make_etag("v2", "events:")) is None
+    assert cache.get("events:", make_etag("v1", "events:")) is not None
+
+
+def test_response_cache_evicts_least_recently_used():
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", '"a"', SMALL_BODY)
+    cache.put("b", '"b"', SMALL_BODY)
+    cache.get("a", '"a"')
+    cache.put("c", '"c"', SMALL_BODY)
+
+    assert len(cache) == 2
+    assert cache.get("b", '"b"') is None
+    assert cache.get("a", '"a"') is not None
+
+
+class FakeCardTool:
+    def __init__(self, count: int):
+        self.cards = [{"name": f"카드 {index}", "url": f"https://example.com/{index}"} for index in range(count)]
+        self.calls = 0
+
+    async def ainvoke(self, arguments):
+        self.calls += 1
+        return self.cards
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """MCP 서버 없이 카드 검색 엔드포인트를 호출하는 TestClient입니다. (데이터 세대는 항상 v1)"""
+    tool = FakeCardTool(count=100)
+
+    async def data_version(kind):
+        return "v1"
+
+    monkeypatch.setattr(api_server, "client", object())
+    monkeypatch.setattr(api_server, "tool_handles", {"get_all_cards_with_name": tool})
+    monkeypatch.setattr(api_server, "data_version", data_version)
+    monkeypatch.setattr(api_server, "RESPONSE_CACHE", ResponseCache())
+    return TestClient(api_server.app), tool
+
+
+@pytest.mark.parametrize("query", ["", "?card_name=카드 7"], ids=["large", "small"])
+@pytest.mark.parametrize("accept_encoding", ["gzip", "identity"])
+def test_get_card_search_answers_304_with_the_200_etag(api, query, accept_encoding):
+    client, tool = api
+    headers = {"Accept-Encoding": accept_encoding}
+
+    ok = client.get(f"/cards/search{query}", headers=headers)
+    not_modified = client.get(f"/cards/search{query}", headers={**headers, "If-None-Match": ok.headers["etag"]})
+
+    assert ok.status_code == 200
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == ok.headers["etag"]
+    assert tool.calls == 1
+
+
+def test_get_card_search_without_a_cached_entry_still_sends_the_200_etag(api):
+    client, _ = api
+    etag = client.get("/cards/search", headers={"Accept-Encoding": "gzip"}).headers["etag"]
+    api_server.RESPONSE_CACHE._entries.clear()
+
+    not_modified = client.get("/cards/search", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == etag
+
+
+@pytest.mark.parametrize("if_none_match", ["*", "{etag}", "W/{etag}"])
+def test_post_card_search_never_returns_304(api, if_none_match):
+    client, tool = api
+    etag = client.get("/cards/search").headers["etag"]
+
+    response = client.post(
+        "/cards/search", json={}, headers={"If-None-Match": if_none_match.format(etag=etag)}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["etag"] == etag
+    assert len(response.json()["data"]) == len(tool.cards)
+    # POST와 GET은 같은 캐시를 공유합니다.
+    assert tool.calls == 1
@@ -0,0 +1,34 @@
+import asyncio
+
+from fastmcp import Client
+from fastmcp.server import FastMCP
+
+from mcp_logging import ToolLogger
+
+
+def test_set_level_reaches_every_logger_installed_on_a_server():
+    server = FastMCP("Test")
+    first = ToolLogger("first", server)
+    second = ToolLogger("second", server)
+
+    async def scenario():
+        async with Client(server) as client:
+            await client.set_logging_level("warning")
+
+    asyncio.run(scenario())
+
+    assert first.client_level == second.client_level == "warning"
+    assert first._client_enabled("error") and not first._client_enabled("info")
+
+
+def test_shared_backend_forwards_set_level_to_mounted_servers():
+    import main
+
+    async def scenario():
+        async with Client(main.main_mcp) as client:
+            await client.set_logging_level("info")
+
+    asyncio.run(scenario())
+
+    assert main.card_log.client_level == "info"
+    assert main.event_log.client_level == "info"
@@ -0,0 +1,207 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import resilience
+from resilience import CircuitBreaker, hedged
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(resilience, "time", SimpleNamespace(monotonic=fake.monotonic))
+    return fake
+
+
+def open_breaker(breaker: CircuitBreaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_breaker_success_resets_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_allows_a_single_probe(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    open_breaker(breaker)
+
+    clock.now += 9.9
+    assert not breaker.allow()
+    clock.now += 0.1
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # 시험 요청이 끝나기 전에는 다른 요청을 막습니다.
+    assert not breaker.allow()
+
+
+def test_half_open_probe_success_closes(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    open_breaker(breaker)
+    clock.now += 10
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow() and breaker.allow()
+
+
+def test_half_open_probe_failure_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10)
+    open_breaker(breaker)
+    clock.now += 10
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.opened_at == clock.now
+    assert not breaker.allow()
+
+
+def test_inconclusive_probe_lets_the_next_request_probe(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    open_breaker(breaker)
+    clock.now += 10
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_inconclusive()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.failures == 1
+    assert breaker.allow()
+
+
+def test_inconclusive_does_not_change_closed_state(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+    breaker.record_failure()
+    breaker.record_inconclusive()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.failures == 1
+
+
+def test_abandoned_probe_is_replaced_after_reset_timeout(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    open_breaker(breaker)
+    clock.now += 10
+    assert breaker.allow()
+    # 시험 요청이 결과를 남기지 못해도 reset_timeout이 지나면 다시 시험합니다.
+    clock.now += 9
+    assert not breaker.allow()
+    clock.now += 1
+    assert breaker.allow()
+
+
+class Attempts:
+    """hedged()에 넘길 시도를 순서대로 만들고, 각 시도의 시작 시각을 기록합니다."""
+
+    def __init__(self, *steps):
+        self.steps = list(steps)
+        self.started_at = []
+        self.cancelled = []
+        self._origin = time.monotonic()
+
+    def __call__(self):
+        index = len(self.started_at)
+        self.started_at.append(time.monotonic() - self._origin)
+        delay, outcome = self.steps[index]
+        return self._run(index, delay, outcome)
+
+    async def _run(self, index, delay, outcome):
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(index)
+            raise
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+
+def test_hedged_returns_without_hedging_when_first_attempt_is_fast():
+    attempts = Attempts((0.01, "first"), (0.01, "second"))
+    hedges = []
+
+    result = asyncio.run(hedged(attempts, hedge_after=0.2, timeout=1, on_hedge=lambda: hedges.append(1)))
+
+    assert result == "first"
+    assert len(attempts.started_at) == 1
+    assert hedges == []
+
+
+def test_hedged_launches_second_attempt_after_hedge_after():
+    attempts = Attempts((1, "slow"), (0.01, "fast"))
+    hedges = []
+
+    result = asyncio.run(hedged(attempts, hedge_after=0.1, timeout=2, on_hedge=lambda: hedges.append(1)))
+
+    assert result == "fast"
+    assert hedges == [1]
+    assert 0.08 <= attempts.started_at[1] < 0.5
+    # 먼저 성공한 결과를 받으면 느린 시도는 취소합니다.
+    assert attempts.cancelled == [0]
+
+
+def test_hedged_launches_next_attempt_immediately_after_failure():
+    attempts = Attempts((0.01, ValueError("first failed")), (0.01, "second"))
+
+    result = asyncio.run(hedged(attempts, hedge_after=1, timeout=2))
+
+    assert result == "second"
+    assert attempts.started_at[1] < 0.5
+
+
+def test_hedged_first_success_wins_even_if_it_started_first():
+    attempts = Attempts((0.15, "first"), (1, "second"))
+
+    result = asyncio.run(hedged(attempts, hedge_after=0.05, timeout=2))
+
+    assert result == "first"
+    assert attempts.cancelled == [1]
+
+
+def test_hedged_raises_last_error_when_all_attempts_fail():
+    attempts = Attempts((0.01, ValueError("first")), (0.05, KeyError("second")))
+
+    with pytest.raises(KeyError, match="second"):
+        asyncio.run(hedged(attempts, hedge_after=1, timeout=2))
+
+
+def test_hedged_raises_timeout_and_cancels_pending_attempts():
+    attempts = Attempts((1, "slow"), (1, "slower"))
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(hedged(attempts, hedge_after=0.05, timeout=0.2))
+
+    assert sorted(attempts.cancelled) == [0, 1]
+
+
+def test_hedged_respects_max_attempts():
+    attempts = Attempts((0.3, "first"), (0.3, "second"), (0.01, "third"))
+
+    result = asyncio.run(hedged(attempts, hedge_after=0.05, timeout=2, max_attempts=2))
+
+    assert result == "first"
+    assert len(attempts.started_at) == 2
@@ -0,0 +1,186 @@
+import asyncio
+import json
+import sqlite3
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage, messages_to_dict
+
+import api_server
+from session_store import MemorySessionStore, SqliteSessionStore
+
+
+def conversation(turns: int):
+    """히스토리에 보이지 않는 메시지(도구 결과, 시스템 메시지)가 섞인 대화입니다."""
+    messages = [SystemMessage(content="시스템 안내")]
+    for turn in range(turns):
+        messages.append(HumanMessage(content=f"질문 {turn}"))
+        if turn % 2 == 0:
+            messages.append(ToolMessage(content=f"도구 결과 {turn}", tool_call_id=f"call-{turn}"))
+        messages.append(AIMessage(content=f"답변 {turn}"))
+    return messages
+
+
+async def read_all_pages(store, session_id: str, limit: int):
+    entries, cursor, pages = [], 0, 0
+    while True:
+        page = await store.history_page(session_id, cursor, limit)
+        entries.extend(page["conversation_history"])
+        pages += 1
+        if page["next_cursor"] is None:
+            return entries, page["message_count"], pages
+        cursor = page["next_cursor"]
+
+
+@pytest.fixture
+def stores(tmp_path):
+    return {"memory": MemorySessionStore(), "sqlite": SqliteSessionStore(str(tmp_path / "sessions.db"))}
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 7, 100])
+def test_paging_to_the_end_returns_the_same_entries_in_both_stores(stores, limit):
+    messages = conversation(turns=7)
+
+    async def scenario():
+        results = {}
+        for name, store in stores.items():
+            # 여러 번 나누어 저장해도 같은 순서로 읽혀야 합니다.
+            await store.append("s1", messages[:4])
+            await store.append("s1", messages[4:])
+            results[name] = await read_all_pages(store, "s1", limit)
+        return results
+
+    results = asyncio.run(scenario())
+
+    memory_entries, memory_count, memory_pages = results["memory"]
+    sqlite_entries, sqlite_count, sqlite_pages = results["sqlite"]
+    assert memory_entries == sqlite_entries
+    assert memory_entries[0] == {"role": "user", "content": "질문 0"}
+    assert memory_entries[-1] == {"role": "assistant", "content": "답변 6"}
+    assert len(memory_entries) == memory_count == sqlite_count == 14
+    assert memory_pages == sqlite_pages == max(1, -(-14 // limit))
+
+
+def test_paging_without_limit_returns_everything(stores):
+    async def scenario():
+        pages = {}
+        for name, store in stores.items():
+            await store.append("s1", conversation(turns=3))
+            pages[name] = await store.history_page("s1")
+        return pages
+
+    pages = asyncio.run(scenario())
+
+    assert pages["memory"] == pages["sqlite"]
+    assert pages["memory"]["next_cursor"] is None
+    assert len(pages["memory"]["conversation_history"]) == 6
+
+
+def test_unknown_session_returns_an_empty_page(stores):
+    async def scenario():
+        return {name: await store.history_page("missing", 0, 10) for name, store in stores.items()}
+
+    for page in asyncio.run(scenario()).values():
+        assert page == {"conversation_history": [], "message_count": 0, "next_cursor": None}
+
+
+def test_history_endpoint_rejects_a_negative_cursor(monkeypatch):
+    monkeypatch.setattr(api_server, "session_store", MemorySessionStore())
+    client = TestClient(api_server.app)
+
+    assert client.get("/chat/history/s1", params={"cursor": -1}).status_code == 422
+    assert client.get("/chat/history/s1").json()["next_cursor"] is None
+
+
+def test_two_sqlite_stores_append_concurrently_without_seq_collisions(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    workers = [SqliteSessionStore(path), SqliteSessionStore(path)]
+    threads_per_worker = 2
+    appends_per_thread = 25
+    start = threading.Barrier(len(workers) * threads_per_worker)
+    errors = []
+
+    def write(worker: int, thread: int, store: SqliteSessionStore):
+        start.wait()
+        try:
+            for turn in range(appends_per_thread):
+                asyncio.run(store.append("shared", [
+                    HumanMessage(content=f"w{worker}t{thread}-질문 {turn}"),
+                    AIMessage(content=f"w{worker}t{thread}-답변 {turn}"),
+                ]))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [
+        threading.Thread(target=write, args=(worker, thread, store))
+        for worker, store in enumerate(workers)
+        for thread in range(threads_per_worker)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    messages = asyncio.run(workers[0].load("shared"))
+    rows = workers[1]._connect().execute(
+        "SELECT seq FROM messages WHERE session_id = ? ORDER BY seq", ("shared",)
+    ).fetchall()
+    seqs = [seq for (seq,) in rows]
+    assert seqs == list(range(1, len(threads) * appends_per_thread * 2 + 1))
+
+    # 한 번에 저장한 질문/답변 쌍은 다른 워커의 메시지와 섞이지 않고, 워커별 순서도 유지됩니다.
+    contents = [message.content for message in messages]
+    for index in range(0, len(contents), 2):
+        question, answer = contents[index], contents[index + 1]
+        assert question.replace("질문", "답변") == answer
+    for worker in range(len(workers)):
+        for thread in range(threads_per_worker):
+            writer = f"w{worker}t{thread}-질문"
+            own = [content for content in contents if content.startswith(writer)]
+            assert own == [f"{writer} {turn}" for turn in range(appends_per_thread)]
+
+
+def test_migrate_backfills_display_for_an_old_database(tmp_path):
+    path = str(tmp_path / "old.db")
+    old = sqlite3.connect(path)
+    old.execute(
+        """
+        CREATE TABLE messages (
+            session_id TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            message TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            PRIMARY KEY (session_id, seq)
+        )
+        """
+    )
+    messages = conversation(turns=2)
+    old.executemany(
+        "INSERT INTO messages (session_id, seq, message, created_at) VALUES (?, ?, ?, ?)",
+        [("s1", seq, json.dumps(payload, ensure_ascii=False), 0.0)
+         for seq, payload in enumerate(messages_to_dict(messages), 1)],
+    )
+    old.commit()
+    old.close()
+
+    store = SqliteSessionStore(path)
+    # 이미 옮긴 파일을 다시 열어도 그대로 사용합니다.
+    SqliteSessionStore(path)
+
+    rows = store._connect().execute("SELECT seq, display FROM messages ORDER BY seq").fetchall()
+    displays = {seq: json.loads(display) if display is not None else None for seq, display in rows}
+    assert displays == {
+        1: None,
+        2: {"role": "user", "content": "질문 0"},
+        3: None,
+        4: {"role": "assistant", "content": "답변 0"},
+        5: {"role": "user", "content": "질문 1"},
+        6: {"role": "assistant", "content": "답변 1"},
+    }
+
+    page = asyncio.run(store.history_page("s1", 0, 10))
+    assert page["message_count"] == 4
+    assert [entry["content"] for entry in page["conversation_history"]] == ["질문 0", "답변 0", "질문 1", "답변 1"]
+    assert [message.content for message in asyncio.run(store.load("s1"))] == [message.content for message in messages]
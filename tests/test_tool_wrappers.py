@@ -0,0 +1,241 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from langchain_core.tools import StructuredTool
+
+import tool_wrappers
+from tool_wrappers import (
+    CURRENT_TOOL_MEMO,
+    MEMO_MISS,
+    MEMO_REQUEST_HIT,
+    MEMO_SESSION_HIT,
+    ToolCallMemo,
+    memo_key,
+    with_memo,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class CountingTool:
+    """호출 횟수를 세고, results에 정해 둔 결과(없으면 기본 결과)를 반환하는 MCP 도구 대역입니다."""
+
+    def __init__(self, delay: float = 0.0, results=None):
+        self.delay = delay
+        self.results = list(results or [])
+        self.calls = 0
+        self.lookups = []
+
+    async def search(self, keyword: str) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.results:
+            return self.results.pop(0)
+        return json.dumps({"keyword": keyword, "call": self.calls})
+
+    def wrapped(self):
+        tool = StructuredTool.from_function(coroutine=self.search, name="search", description="검색")
+        return with_memo(tool, on_lookup=lambda name, outcome: self.lookups.append(outcome))
+
+
+async def call(tool, memo: ToolCallMemo, keyword: str = "주유"):
+    CURRENT_TOOL_MEMO.set(memo)
+    return await tool.ainvoke({"keyword": keyword})
+
+
+def test_memo_key_normalizes_argument_order():
+    assert memo_key("search", {"a": 1, "b": "x"}) == memo_key("search", {"b": "x", "a": 1})
+    assert memo_key("search", {"a": 1}) != memo_key("other", {"a": 1})
+
+
+def test_ttl_expires_entries(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(tool_wrappers, "time", SimpleNamespace(monotonic=clock.monotonic))
+
+    async def scenario():
+        memo = ToolCallMemo(ttl=10)
+        future = asyncio.get_running_loop().create_future()
+        future.set_result("result")
+        memo.put("key", future)
+
+        clock.now += 10
+        assert memo.get("key") is future
+        clock.now += 0.1
+        assert memo.get("key") is None
+        assert len(memo) == 0
+
+    asyncio.run(scenario())
+
+
+def test_request_hit_returns_reference_and_session_hit_returns_result():
+    counting = CountingTool()
+    tool = counting.wrapped()
+
+    async def scenario():
+        session = ToolCallMemo(ttl=60)
+        first = await call(tool, ToolCallMemo(session))
+        request = ToolCallMemo(session)
+        again = await call(tool, request)
+        repeated = await call(tool, request)
+        return first, again, repeated
+
+    first, again, repeated = asyncio.run(scenario())
+
+    assert counting.calls == 1
+    assert counting.lookups == [MEMO_MISS, MEMO_SESSION_HIT, MEMO_REQUEST_HIT]
+    assert again == first
+    assert "앞서 호출한 search" in repeated
+
+
+def test_concurrent_calls_share_one_tool_call():
+    counting = CountingTool(delay=0.05)
+    tool = counting.wrapped()
+
+    async def scenario():
+        memo = ToolCallMemo()
+        return await asyncio.gather(call(tool, memo), call(tool, memo))
+
+    asyncio.run(scenario())
+
+    assert counting.calls == 1
+    assert sorted(counting.lookups) == sorted([MEMO_MISS, MEMO_REQUEST_HIT])
+
+
+def test_failed_calls_are_forgotten():
+    counting = CountingTool()
+
+    async def failing(keyword: str) -> str:
+        counting.calls += 1
+        raise RuntimeError("MCP 서버 오류")
+
+    tool = with_memo(StructuredTool.from_function(coroutine=failing, name="search", description="검색"))
+
+    async def scenario():
+        memo = ToolCallMemo()
+        for _ in range(2):
+            try:
+                await call(tool, memo)
+            except RuntimeError:
+                pass
+        await asyncio.sleep(0)
+        return memo
+
+    memo = asyncio.run(scenario())
+
+    assert counting.calls == 2
+    assert len(memo) == 0
+
+
+def test_error_and_stale_results_are_not_memoized():
+    counting = CountingTool(results=[
+        json.dumps({"error": "timeout"}),
+        json.dumps({"name": "카드", "stale": True}),
+        json.dumps({"name": "카드"}),
+    ])
+    tool = counting.wrapped()
+
+    async def scenario():
+        session = ToolCallMemo(ttl=60)
+        results = []
+        for _ in range(4):
+            results.append(await call(tool, ToolCallMemo(session)))
+            await asyncio.sleep(0)
+        return results
+
+    results = asyncio.run(scenario())
+
+    assert counting.calls == 3
+    assert counting.lookups == [MEMO_MISS, MEMO_MISS, MEMO_MISS, MEMO_SESSION_HIT]
+    assert results[3] == json.dumps({"name": "카드"})
+
+
+def test_waiter_receives_error_result_in_full():
+    counting = CountingTool(delay=0.05, results=[json.dumps({"error": "timeout"})])
+    tool = counting.wrapped()
+
+    async def scenario():
+        memo = ToolCallMemo()
+        return await asyncio.gather(call(tool, memo), call(tool, memo))
+
+    first, second = asyncio.run(scenario())
+
+    # 실패한 결과를 함께 기다린 경우에는 참조 문구 대신 결과 전체를 받습니다.
+    assert first == second == json.dumps({"error": "timeout"})
+
+
+def test_cancelling_the_first_caller_does_not_cancel_other_waiters():
+    counting = CountingTool(delay=0.1)
+    tool = counting.wrapped()
+
+    async def scenario():
+        session = ToolCallMemo(ttl=60)
+        first = asyncio.create_task(call(tool, ToolCallMemo(session)))
+        await asyncio.sleep(0.02)
+        second = asyncio.create_task(call(tool, ToolCallMemo(session)))
+        await asyncio.sleep(0.02)
+        first.cancel()
+        result = await second
+        return first, result, session
+
+    first, result, session = asyncio.run(scenario())
+
+    assert first.cancelled()
+    assert json.loads(result)["call"] == 1
+    assert counting.calls == 1
+    # 원래 호출은 끝까지 실행되어 세션 메모에 남습니다.
+    assert len(session) == 1
+
+
+def test_cancelled_shared_call_is_retried_as_a_miss():
+    counting = CountingTool()
+    tool = counting.wrapped()
+
+    async def scenario():
+        session = ToolCallMemo(ttl=60)
+        shared = asyncio.get_running_loop().create_future()
+        session.put(memo_key("search", {"keyword": "주유"}), shared)
+
+        waiter = asyncio.create_task(call(tool, ToolCallMemo(session)))
+        await asyncio.sleep(0.01)
+        shared.cancel()
+        return await waiter
+
+    result = asyncio.run(scenario())
+
+    assert json.loads(result)["call"] == 1
+    assert counting.lookups == [MEMO_MISS]
+
+
+def test_cancelled_entries_are_dropped_on_lookup():
+    async def scenario():
+        memo = ToolCallMemo()
+        future = asyncio.get_running_loop().create_future()
+        memo.put("key", future)
+        future.cancel()
+        # done 콜백이 실행되기 전에도 취소된 호출은 돌려주지 않습니다.
+        assert memo.get("key") is None
+        assert len(memo) == 0
+
+    asyncio.run(scenario())
+
+
+def test_without_memo_every_call_reaches_the_tool():
+    counting = CountingTool()
+    tool = counting.wrapped()
+
+    async def scenario():
+        CURRENT_TOOL_MEMO.set(None)
+        await tool.ainvoke({"keyword": "주유"})
+        await tool.ainvoke({"keyword": "주유"})
+
+    asyncio.run(scenario())
+
+    assert counting.calls == 2
+    assert counting.lookups == []
@@ -0,0 +1,166 @@
+import asyncio
+import copy
+import json
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional, Tuple
+from langchain_core.tools import BaseTool
+
+
+# 현재 요청(에이전트 실행)에 적용할 도구 호출 메모. 설정되지 않았으면 메모하지 않습니다.
+CURRENT_TOOL_MEMO: ContextVar[Optional["ToolCallMemo"]] = ContextVar("current_tool_memo", default=None)
+
+# 메모 조회 결과
+MEMO_MISS = "miss"
+MEMO_REQUEST_HIT = "request_hit"
+MEMO_SESSION_HIT = "session_hit"
+
+
+def _schema_dict(tool: BaseTool) -> Dict[str, Any]:
+    """도구의 입력 스키마를 JSON Schema dict로 반환합니다."""
+    schema = tool.args_schema
+    if isinstance(schema, dict):
+        return copy.deepcopy(schema)
+    return schema.model_json_schema()
+
+
+def with_injected_arg(tool: BaseTool, param: str, value: Callable[[], Optional[Any]]) -> BaseTool:
+    """에이전트(LLM)에게는 param 인자를 숨기고, 호출할 때마다 value()의 값을 채워 넣는 도구를 반환합니다.
+
+    value()가 None을 반환하면 인자를 넘기지 않으므로 MCP 도구의 기본값이 사용됩니다.
+    도구에 param 인자가 없으면 원래 도구를 그대로 반환합니다.
+    """
+    schema = _schema_dict(tool)
+    if param not in schema.get("properties", {}):
+        return tool
+
+    del schema["properties"][param]
+    if param in schema.get("required", []):
+        schema["required"] = [name for name in schema["required"] if name != param]
+
+    coroutine = tool.coroutine
+
+    async def call_tool(**arguments):
+        injected = value()
+        if injected is not None:
+            arguments[param] = injected
+        return await coroutine(**arguments)
+
+    return tool.model_copy(update={"args_schema": schema, "coroutine": call_tool})
+
+
+def memo_key(name: str, arguments: Dict[str, Any]) -> str:
+    """도구 이름과 정규화한 인자(키 정렬, 공백 제거)로 메모 키를 만듭니다."""
+    return name + ":" + json.dumps(arguments, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def _result_text(result: Any) -> str:
+    """도구 결과의 본문을 문자열로 반환합니다. (content_and_artifact면 content, 텍스트 블록 목록이면 이어 붙입니다.)"""
+    if isinstance(result, tuple):
+        result = result[0]
+    if isinstance(result, str):
+        return result
+    if isinstance(result, list):
+        return "".join(block.get("text", "") if isinstance(block, dict) else str(block) for block in result)
+    return str(result)
+
+
+def is_memoizable(result: Any) -> bool:
+    """결과를 기억해도 되는지 반환합니다. error나 stale 표시가 있는 결과는 다시 호출하면 달라질 수 있으므로 기억하지 않습니다."""
+    try:
+        value = json.loads(_result_text(result))
+    except ValueError:
+        return True
+    return not (isinstance(value, dict) and ("error" in value or value.get("stale")))
+
+
+class ToolCallMemo:
+    """도구 호출 결과를 (도구 이름, 정규화한 인자)별로 기억합니다.
+
+    요청마다 새 메모를 만들고, 세션 범위 메모를 parent로 두면 같은 세션의 이전 요청 결과도 재사용합니다.
+    결과는 진행 중인 호출(Future)로 저장하므로 동시에 들어온 같은 호출도 MCP 서버를 한 번만 호출합니다.
+    실패하거나 취소된 호출, error나 stale 표시가 있는 결과는 기억하지 않습니다.
+    """
+
+    def __init__(self, parent: Optional["ToolCallMemo"] = None, ttl: Optional[float] = None):
+        self.parent = parent
+        self.ttl = ttl
+        self._calls: Dict[str, Tuple[float, asyncio.Future]] = {}
+
+    def get(self, key: str) -> Optional[asyncio.Future]:
+        entry = self._calls.get(key)
+        if entry is None:
+            return None
+        stored_at, future = entry
+        # 취소된 호출은 done 콜백(_forget_failed)이 실행되기 전이라도 바로 잊습니다.
+        if future.cancelled() or (self.ttl is not None and time.monotonic() - stored_at > self.ttl):
+            del self._calls[key]
+            return None
+        return future
+
+    def put(self, key: str, future: asyncio.Future):
+        self._calls[key] = (time.monotonic(), future)
+        future.add_done_callback(lambda done: self._forget_failed(key, done))
+
+    def _forget_failed(self, key: str, future: asyncio.Future):
+        if future.cancelled() or future.exception() is not None or not is_memoizable(future.result()):
+            entry = self._calls.get(key)
+            if entry is not None and entry[1] is future:
+                del self._calls[key]
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+
+def with_memo(tool: BaseTool, on_lookup: Optional[Callable[[str, str], None]] = None) -> BaseTool:
+    """CURRENT_TOOL_MEMO가 설정된 동안 같은 인자의 반복 호출을 MCP 서버로 보내지 않는 도구를 반환합니다.
+
+    - 같은 요청에서 이미 호출한 경우: 이전 결과가 대화 문맥에 있으므로 짧은 참조 문구만 반환합니다.
+    - 같은 세션의 이전 요청에서 호출한 경우: 문맥에 없으므로 저장된 결과 전체를 반환합니다.
+    on_lookup(도구 이름, MEMO_MISS/MEMO_REQUEST_HIT/MEMO_SESSION_HIT)으로 조회 결과를 알려줍니다.
+    """
+    coroutine = tool.coroutine
+    reference = f"동일한 인자로 앞서 호출한 {tool.name}의 결과와 같습니다. 대화에 있는 이전 결과를 사용하세요."
+    if tool.response_format == "content_and_artifact":
+        reference = (reference, None)
+
+    async def call_tool(**arguments):
+        memo = CURRENT_TOOL_MEMO.get()
+        if memo is None:
+            return await coroutine(**arguments)
+
+        key = memo_key(tool.name, arguments)
+        while True:
+            earlier = memo.get(key)
+            if earlier is not None:
+                outcome = MEMO_REQUEST_HIT
+            else:
+                earlier = memo.parent.get(key) if memo.parent is not None else None
+                if earlier is not None:
+                    memo.put(key, earlier)
+                    outcome = MEMO_SESSION_HIT
+                else:
+                    # 별도 태스크로 호출하므로, 처음 호출한 요청이 취소되어도 함께 기다리는 다른 요청은 결과를 받습니다.
+                    earlier = asyncio.ensure_future(coroutine(**arguments))
+                    memo.put(key, earlier)
+                    if memo.parent is not None:
+                        memo.parent.put(key, earlier)
+                    outcome = MEMO_MISS
+            try:
+                # 기다리던 쪽이 취소되어도 공유 중인 원래 호출은 취소되지 않도록 shield합니다.
+                result = await asyncio.shield(earlier)
+                break
+            except asyncio.CancelledError:
+                # 원래 호출이 취소된 경우에만 (메모에서 지우고) 새로 호출합니다. 이 요청이 취소된 경우는 그대로 전파합니다.
+                if asyncio.current_task().cancelling() or not earlier.cancelled():
+                    raise
+
+        # 같은 요청의 반복 호출은 참조 문구로 답합니다. 실패한 결과(error/stale)를 함께 기다린 경우에는 결과 전체를 반환합니다.
+        if outcome == MEMO_REQUEST_HIT and is_memoizable(result):
+            result = reference
+
+        if on_lookup is not None:
+            on_lookup(tool.name, outcome)
+        return result
+
+    return tool.model_copy(update={"coroutine": call_tool})
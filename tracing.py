@@ -0,0 +1,235 @@
+import argparse
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+from langchain_core.callbacks import AsyncCallbackHandler
+
+
+# 요청별 트레이스를 JSONL로 남길 파일 경로 (비어 있으면 기록하지 않음)
+TRACE_LOG_PATH = os.getenv("CHAT_TRACE_LOG", "")
+
+_log_lock = threading.Lock()
+
+
+class Span:
+    """트레이스의 한 구간입니다. 시작 시각은 epoch 초, 길이는 밀리초 단위로 기록합니다."""
+
+    def __init__(self, name: str, kind: str, parent: Optional["Span"] = None, **attrs):
+        self.name = name
+        self.kind = kind
+        self.attrs: Dict[str, Any] = dict(attrs)
+        self.children: List["Span"] = []
+        self.started_at = time.time()
+        self.duration_ms: Optional[float] = None
+        self._started = time.perf_counter()
+        if parent is not None:
+            parent.children.append(self)
+
+    def end(self, **attrs):
+        self.attrs.update(attrs)
+        if self.duration_ms is None:
+            self.duration_ms = (time.perf_counter() - self._started) * 1000
+
+    @property
+    def ended_at(self) -> float:
+        return self.started_at + (self.duration_ms or 0) / 1000
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration_ms, 3) if self.duration_ms is not None else None,
+            "attrs": self.attrs,
+            "children": [child.to_dict() for child in self.children],
+        }
+
+
+class Trace:
+    """/chat 요청 하나의 span 트리입니다."""
+
+    def __init__(self, name: str, **attrs):
+        self.trace_id = uuid.uuid4().hex
+        self.root = Span(name, "request", **attrs)
+
+    @contextmanager
+    def span(self, name: str, kind: str, parent: Optional[Span] = None, **attrs):
+        span = Span(name, kind, parent or self.root, **attrs)
+        try:
+            yield span
+        except Exception as e:
+            span.end(error=str(e))
+            raise
+        finally:
+            span.end()
+
+    def spans(self, kind: Optional[str] = None) -> List[Span]:
+        """트리의 모든 span을 (kind가 주어지면 해당 종류만) 반환합니다."""
+        result = []
+        stack = [self.root]
+        while stack:
+            span = stack.pop()
+            if kind is None or span.kind == kind:
+                result.append(span)
+            stack.extend(span.children)
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        self.root.end()
+        return {"trace_id": self.trace_id, **self.root.to_dict()}
+
+
+def _token_usage(response) -> Dict[str, int]:
+    """LLM 응답에서 토큰 사용량을 꺼냅니다. 모델/버전별로 위치가 달라 가능한 곳을 모두 확인합니다."""
+    usage = {}
+    llm_output = getattr(response, "llm_output", None) or {}
+    for key in ("token_usage", "usage_metadata", "usage"):
+        if isinstance(llm_output.get(key), dict):
+            usage.update(llm_output[key])
+
+    for generations in getattr(response, "generations", None) or []:
+        for generation in generations:
+            message = getattr(generation, "message", None)
+            usage_metadata = getattr(message, "usage_metadata", None)
+            if isinstance(usage_metadata, dict):
+                usage.update(usage_metadata)
+            generation_info = getattr(generation, "generation_info", None) or {}
+            if isinstance(generation_info.get("usage_metadata"), dict):
+                usage.update(generation_info["usage_metadata"])
+
+    return {key: value for key, value in usage.items() if isinstance(value, int)}
+
+
+class TraceCallbackHandler(AsyncCallbackHandler):
+    """에이전트 실행 중의 LLM 호출과 도구 호출을 span으로 기록하는 콜백입니다."""
+
+    def __init__(self, trace: Trace, parent: Span):
+        self.trace = trace
+        self.parent = parent
+        self._spans: Dict[Any, Span] = {}
+
+    def _start(self, run_id, name: str, kind: str, **attrs):
+        self._spans[run_id] = Span(name, kind, self.parent, **attrs)
+
+    def _end(self, run_id, **attrs):
+        span = self._spans.pop(run_id, None)
+        if span is not None:
+            span.end(**attrs)
+
+    async def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        model = (kwargs.get("invocation_params") or {}).get("model") or (serialized or {}).get("name", "llm")
+        self._start(run_id, model, "llm", message_count=sum(len(batch) for batch in messages))
+
+    async def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        model = (kwargs.get("invocation_params") or {}).get("model") or (serialized or {}).get("name", "llm")
+        self._start(run_id, model, "llm", message_count=len(prompts))
+
+    async def on_llm_end(self, response, *, run_id, **kwargs):
+        self._end(run_id, **_token_usage(response))
+
+    async def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error=str(error))
+
+    async def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        name = (serialized or {}).get("name", "tool")
+        inputs = kwargs.get("inputs")
+        self._start(
+            run_id, name, "tool",
+            args_bytes=len((input_str or "").encode("utf-8")),
+            args=inputs if isinstance(inputs, dict) else None,
+        )
+
+    async def on_tool_end(self, output, *, run_id, **kwargs):
+        content = getattr(output, "content", output)
+        self._end(run_id, result_bytes=len(str(content).encode("utf-8")))
+
+    async def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error=str(error))
+
+
+def attach_scrape_phases(trace: Trace, scrapes: List[Dict[str, Any]]):
+    """카드 MCP 서버가 기록한 스크래핑 단계 시간을 해당 get_card_info span 아래에 붙입니다.
+
+    MCP 서버는 별도 프로세스이므로 url과 시작 시각이 도구 span 구간에 들어오는지로 짝을 맞춥니다.
+    """
+    tool_spans = [span for span in trace.spans("tool") if span.name == "get_card_info"]
+    for scrape in scrapes:
+        for span in tool_spans:
+            args = span.attrs.get("args") or {}
+            if args.get("url") not in (None, scrape.get("url")):
+                continue
+            if span.started_at <= scrape.get("started_at", 0) <= span.ended_at:
+                offset = scrape["started_at"]
+                for phase, duration_ms in scrape.get("phases", {}).items():
+                    child = Span(phase, "scrape", span, path=scrape.get("path"))
+                    child.started_at = offset
+                    child.duration_ms = duration_ms
+                    offset += duration_ms / 1000
+                break
+
+
+def write_trace(trace_dict: Dict[str, Any], path: str = TRACE_LOG_PATH):
+    """트레이스 한 건을 JSONL 파일에 추가합니다."""
+    if not path:
+        return
+    line = json.dumps(trace_dict, ensure_ascii=False, default=str)
+    with _log_lock:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    index = max(0, math.ceil(q * len(ordered)) - 1)
+    return ordered[index]
+
+
+def summarize(path: str, by_name: bool = False) -> List[Dict[str, Any]]:
+    """트레이스 로그의 span 길이를 종류별(또는 종류:이름별)로 집계합니다."""
+    durations: Dict[str, List[float]] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            stack = [json.loads(line)]
+            while stack:
+                span = stack.pop()
+                stack.extend(span.get("children", []))
+                if span.get("duration_ms") is None:
+                    continue
+                key = f"{span['kind']}:{span['name']}" if by_name else span["kind"]
+                durations.setdefault(key, []).append(span["duration_ms"])
+
+    return [
+        {
+            "span": key,
+            "count": len(values),
+            "p50_ms": round(_percentile(values, 0.50), 1),
+            "p95_ms": round(_percentile(values, 0.95), 1),
+            "max_ms": round(max(values), 1),
+            "total_ms": round(sum(values), 1),
+        }
+        for key, values in sorted(durations.items())
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/chat 트레이스 로그(JSONL)의 span 종류별 p50/p95를 요약합니다.")
+    parser.add_argument("path", help="CHAT_TRACE_LOG로 기록한 JSONL 파일")
+    parser.add_argument("--by-name", action="store_true", help="span 종류와 이름(모델명, 도구명)별로 집계")
+    args = parser.parse_args()
+
+    rows = summarize(args.path, by_name=args.by_name)
+    width = max([len(row["span"]) for row in rows] + [4])
+    print(f"{'span':<{width}} {'count':>7} {'p50_ms':>10} {'p95_ms':>10} {'max_ms':>10} {'total_ms':>12}")
+    for row in rows:
+        print(f"{row['span']:<{width}} {row['count']:>7} {row['p50_ms']:>10} {row['p95_ms']:>10} {row['max_ms']:>10} {row['total_ms']:>12}")
+
+
+if __name__ == "__main__":
+    main()